@@ -0,0 +1,100 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Text
+
+import numpy as np
+
+# From the leave policies (docs/leave_and_time_off_policies.txt, docs/policies/)
+MONTHLY_ACCRUAL = {"annual": 1.25, "sick": 0.83}
+BALANCE_CAP = {"annual": 30.0}
+ROLLOVER_CAP = {"annual": 30.0, "sick": 5.0}
+LEAVE_TYPES = ("annual", "sick", "personal")
+
+
+class LeaveBalanceView(Mapping):
+    """Read-only per-employee view onto one row of the engine's balance columns."""
+
+    __slots__ = ("_engine", "_row")
+
+    def __init__(self, engine: "AccrualEngine", row: int):
+        self._engine = engine
+        self._row = row
+
+    def __getitem__(self, leave_type: Text):
+        value = float(self._engine.balances[leave_type][self._row])
+        return int(value) if value.is_integer() else round(value, 2)
+
+    def __iter__(self):
+        return iter(self._engine.leave_types)
+
+    def __len__(self):
+        return len(self._engine.leave_types)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class AccrualEngine:
+    """Every employee's leave balances as columnar arrays, one per leave type.
+
+    Month-end accrual, the balance cap, year-end rollover capping and
+    pending-leave deductions each run as a single vectorized pass over the
+    whole workforce. Employee records read their balances through a
+    `LeaveBalanceView`, so results are visible without copying back.
+    """
+
+    def __init__(self, employee_ids: List[Text], balances: Dict[Text, np.ndarray]):
+        self.employee_ids = employee_ids
+        self.rows = {employee_id: row for row, employee_id in enumerate(employee_ids)}
+        self.leave_types = tuple(balances)
+        self.balances = balances
+        # Pending deductions per leave type, allocated once something is pending
+        self.pending: Dict[Text, np.ndarray] = {}
+
+    def _pending(self, leave_type: Text) -> np.ndarray:
+        pending = self.pending.get(leave_type)
+        if pending is None:
+            pending = self.pending[leave_type] = np.zeros(len(self.employee_ids))
+        return pending
+
+    @classmethod
+    def from_employees(cls, employees: Dict[Text, Dict[Text, Any]], leave_types: Iterable[Text] = LEAVE_TYPES):
+        employee_ids = list(employees)
+        balances = {}
+        for leave_type in leave_types:
+            balances[leave_type] = np.fromiter(
+                (float(employees[employee_id]["leave_balance"].get(leave_type, 0)) for employee_id in employee_ids),
+                dtype=np.float64, count=len(employee_ids),
+            )
+        return cls(employee_ids, balances)
+
+    def add_pending(self, employee_id: Text, leave_type: Text, days: float) -> bool:
+        row = self.rows.get(employee_id)
+        if row is None or leave_type not in self.balances:
+            return False
+        self._pending(leave_type)[row] += days
+        return True
+
+    def add_pending_bulk(self, employee_ids: Iterable[Text], leave_type: Text, days: Iterable[float]) -> None:
+        rows = np.fromiter((self.rows[employee_id] for employee_id in employee_ids), dtype=np.int64)
+        # `add.at` so repeated employees accumulate instead of overwriting
+        np.add.at(self._pending(leave_type), rows, np.asarray(list(days), dtype=np.float64))
+
+    def run_month_end(self, month: int) -> None:
+        """Deduct pending leave, accrue a month, then apply rollover caps if `month` closes the year."""
+        for leave_type, pending in self.pending.items():
+            self.balances[leave_type] -= pending
+            pending.fill(0.0)
+        for leave_type, rate in MONTHLY_ACCRUAL.items():
+            balance = self.balances.get(leave_type)
+            if balance is None:
+                continue
+            cap = BALANCE_CAP.get(leave_type)
+            if cap is None:
+                balance += rate
+            else:
+                # Balances at or over the cap stop accruing but aren't cut
+                np.copyto(balance, np.minimum(balance + rate, cap), where=balance < cap)
+        if month == 12:
+            for leave_type, cap in ROLLOVER_CAP.items():
+                if leave_type in self.balances:
+                    np.minimum(self.balances[leave_type], cap, out=self.balances[leave_type])
@@ -1,14 +1,34 @@
 from typing import Any, Dict, List, Text
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
-from rasa_sdk.events import SlotSet
-import datetime
+from rasa_sdk.events import SlotSet, SessionStarted
+import asyncio
+import logging
+import os
 import random
+import threading
+
+from .base import AsyncAction, now
+from .batching import BatchLoader
+from .cache import TTLCache
+from .content import content_registry
+from .expenses import RECEIPT_REQUIRED_OVER, UNASSIGNED, ExpenseError, ExpenseLedger
+from .jobs import JobIndex
+from .leave_requests import LeaveRequestStore, idempotency_key, leave_days
+from .metrics import configure_from_env, instrument_actions, instrument_methods, registry
+from .routing import router
+from .storage import StorageBackend, backend_from_env
+
+logger = logging.getLogger(__name__)
+
+# Distinct question words a policy passage must share before it is used as an answer
+POLICY_MIN_TERMS = int(os.environ.get("HR_POLICY_MIN_TERMS", "2"))
 
 # Simulated database for demonstration purposes
 # In a real implementation, these would be API calls to backend systems
+@instrument_methods
 class HRDatabase:
-    def __init__(self):
+    def __init__(self, backend: StorageBackend = None):
         # Sample employee data
         self.employees = {
             "EMP001": {
@@ -41,15 +61,6 @@ class HRDatabase:
             }
         }
         
-        # Sample policies database
-        self.policies = {
-            "remote work": "Employees may work remotely up to 3 days per week with manager approval. Remote work requests should be submitted at least 48 hours in advance through the HR portal.",
-            "sick leave": "Full-time employees receive 10 paid sick days annually, accrued at a rate of 0.83 days per month. Up to 5 unused sick days may roll over to the following year.",
-            "annual leave": "Full-time employees receive 15 paid annual leave days per year, accrued at a rate of 1.25 days per month. Unused annual leave may roll over with a maximum cap of 30 days.",
-            "benefits": "Full-time employees are eligible for health insurance (medical, dental, vision), 401(k) with 4% company match, life insurance, and wellness program. Enrollment must be completed within 30 days of start date.",
-            "expense": "Expenses must be submitted within 30 days of incurring them. Receipts are required for all expenses over $25. Manager approval is needed for expenses over $100."
-        }
-        
         # Sample job openings
         self.job_openings = [
             {
@@ -87,71 +98,362 @@ class HRDatabase:
             }
         }
 
-    def get_employee(self, employee_id):
-        return self.employees.get(employee_id, None)
+        # Employees, balances and onboarding state live behind a storage
+        # backend; the sample data above only seeds it. Nothing below is
+        # built until the first action needs it, so importing the actions
+        # (and scaling out a new action server) stays cheap.
+        self._backend = backend
+        self._employee_loader = None
+        self._leave_requests = None
+        self._expenses = None
+        self._documents = None
+        self._snapshot_handle = None
+        self._snapshot_generation = None
+        self._init_lock = threading.Lock()
+
+        self._policy_index = None
+        self._job_index = None
+
+        # Answers to free-form policy questions, keyed on the normalized
+        # question and dropped when a document they came from changes. The
+        # generator writes answers from retrieved passages (extractive by
+        # default; swap in an LLM-backed one)
+        self._answer_cache = None
+        self.answer_generator = None
+
+        # Columnar balances for bulk month-end accrual, built on first use
+        self.accrual = None
+        # Leave requests already deducted at a month-end run
+        self._deducted_leave = set()
+
+        # Read-through cache for the records a session looks up repeatedly
+        # (session start, expense manager lookup, payslip); writes invalidate
+        self.employee_cache = TTLCache(
+            maxsize=int(os.environ.get("HR_DB_CACHE_SIZE", "50000")),
+            ttl=float(os.environ.get("HR_DB_CACHE_TTL_S", "300")),
+        )
+
+    async def get_employee(self, employee_id):
+        self._follow_snapshot()
+        employee = self.employee_cache.get(employee_id)
+        if employee is None:
+            generation = self.employee_cache.generation
+            backend = self.backend
+            if backend.in_process:
+                # A dict or mmap lookup; waiting for a batch would only add latency
+                employee = await backend.get_employee(employee_id)
+            else:
+                employee = await self.employee_loader.load(employee_id)
+            if employee is not None:
+                self.employee_cache.set(employee_id, employee, generation)
+        return employee
 
-    def get_leave_balance(self, employee_id):
-        employee = self.get_employee(employee_id)
+    async def get_leave_balance(self, employee_id):
+        employee = await self.get_employee(employee_id)
         if employee:
             return employee["leave_balance"]
         return None
 
-    def submit_leave_request(self, employee_id, leave_type, start_date, end_date, reason):
-        # In a real implementation, this would update a database or call an API
-        return {
-            "status": "submitted",
-            "leave_id": f"LR{random.randint(1000, 9999)}",
-            "approval_status": "pending"
-        }
-
-    def get_onboarding_status(self, employee_id):
-        employee = self.get_employee(employee_id)
+    async def submit_leave_request(self, employee_id, leave_type, start_date, end_date, reason, request_key=None):
+        # Retries of the same submission (same key) return the original request
+        if request_key is None:
+            request_key = idempotency_key(employee_id, leave_type, start_date, end_date, reason)
+        record, created = await self.leave_requests.submit(
+            request_key,
+            employee_id=employee_id,
+            leave_type=leave_type,
+            start_date=start_date,
+            end_date=end_date,
+            reason=reason,
+        )
+        if created:
+            self.employee_cache.invalidate(employee_id)
+        return record
+
+    def load_employees(self, employees):
+        self.backend.load_employees(employees)
+        self.accrual = None
+        self.employee_cache.clear()
+
+    def build_accrual_engine(self):
+        self.accrual = self.backend.accrual_engine()
+        return self.accrual
+
+    def _queue_leave_deductions(self, engine):
+        # Pending days come from the request store rather than being queued at
+        # submission, so requests made before the engine was built, or
+        # replayed from the log after a restart, are still deducted. One the
+        # engine can't take stays undeducted and is retried at the next run
+        for leave_id, record in self.leave_requests.requests.items():
+            if leave_id in self._deducted_leave or record.get("approval_status") == "rejected":
+                continue
+            days = leave_days(record["start_date"], record["end_date"])
+            if not days:
+                logger.warning("Leave request %s has no valid date range (%s to %s); not deducted.",
+                               leave_id, record["start_date"], record["end_date"])
+                continue
+            if not engine.add_pending(record["employee_id"], record["leave_type"], days):
+                logger.warning("Leave request %s is for an unknown employee or leave type (%s, %s); not deducted.",
+                               leave_id, record["employee_id"], record["leave_type"])
+                continue
+            self._deducted_leave.add(leave_id)
+
+    def run_month_end_accrual(self, month):
+        engine = self.accrual if self.accrual is not None else self.build_accrual_engine()
+        self._queue_leave_deductions(engine)
+        engine.run_month_end(month)
+        self.employee_cache.clear()
+
+    async def get_onboarding_status(self, employee_id):
+        employee = await self.get_employee(employee_id)
         if employee:
             return employee["onboarding"]
         return None
 
-    def update_onboarding_task(self, employee_id, task):
-        employee = self.get_employee(employee_id)
-        if employee and task in employee["onboarding"]["pending"]:
-            employee["onboarding"]["pending"].remove(task)
-            employee["onboarding"]["progress"].append(task)
-            return True
-        return False
-
-    def get_policy(self, policy_topic):
-        # Simplified policy lookup - in a real RAG implementation, 
-        # this would use vector search against policy documents
-        for key, value in self.policies.items():
-            if policy_topic and policy_topic.lower() in key:
-                return value
-        return "I couldn't find specific information on that policy. Please contact HR for more details."
-
-    def search_jobs(self, title=None, department=None, location=None):
-        results = []
-        for job in self.job_openings:
-            match = True
-            if title and title.lower() not in job["title"].lower():
-                match = False
-            if department and department.lower() not in job["department"].lower():
-                match = False
-            if location and location.lower() not in job["location"].lower():
-                match = False
-            
-            if match:
-                results.append(job)
-        
-        return results
+    async def update_onboarding_task(self, employee_id, task):
+        try:
+            return await self.backend.update_onboarding_task(employee_id, task)
+        finally:
+            self.employee_cache.invalidate(employee_id)
+
+    async def submit_expense(self, employee_id, amount, category, date=None, description=None, receipt=None,
+                             request_key=None):
+        # Raises ExpenseError with a user-facing reason if the claim breaks the policy
+        employee = await self.get_employee(employee_id)
+        claim = {"employee_id": employee_id, "amount": amount, "category": category, "date": date,
+                 "description": description, "receipt": receipt}
+        record, _ = await self.expenses.submit(claim, employee["manager"] if employee else None, request_key,
+                                               today=now().date())
+        return record
+
+    async def ingest_expenses(self, claims, today=None):
+        async def get_managers(employee_ids):
+            employees = await self.backend.get_employees(employee_ids)
+            return {employee_id: employee["manager"] for employee_id, employee in employees.items()}
+
+        return await self.expenses.ingest(claims, get_managers, today or now().date())
+
+    def pending_expenses(self, manager):
+        return self.expenses.pending_for(manager), self.expenses.pending_summary(manager)
+
+    def _attach_backend(self):
+        backend = backend_from_env(self.employees)
+        self._snapshot_handle = getattr(backend, "handle", None)
+        if self._snapshot_handle is not None:
+            self._load_snapshot_data(self._snapshot_handle.current)
+        self._backend = backend
+
+    def _load_snapshot_data(self, snapshot):
+        # A shared snapshot also carries the reference data it was published
+        # with; policy text always comes from the hot-reloaded content file
+        self._snapshot_generation = snapshot.generation
+        self.job_openings = list(snapshot.job_openings)
+        self.required_documents = snapshot.required_documents
+        self._job_index = None
+        if self._documents is not None:
+            self._documents.required_documents = self.required_documents
+
+    def _follow_snapshot(self):
+        # Picks up a newly published generation: reference data is reloaded
+        # and records cached from the previous one are dropped
+        if self._snapshot_handle is None:
+            if self._backend is not None or not os.environ.get("HR_SNAPSHOT_DIR"):
+                return
+            # A published snapshot carries the reference data too, so it is
+            # attached before the first read of jobs or required documents.
+            # Not at construction: importing the actions (or the publish
+            # command) must work before anything has been published
+            self.backend
+        snapshot = self._snapshot_handle.current
+        if snapshot.generation != self._snapshot_generation:
+            with self._init_lock:
+                if snapshot.generation != self._snapshot_generation:
+                    self._load_snapshot_data(snapshot)
+                    self.employee_cache.clear()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._init_lock:
+                if self._backend is None:
+                    self._attach_backend()
+        return self._backend
+
+    @property
+    def employee_loader(self):
+        # Lookups from concurrent conversations are coalesced into one bulk
+        # backend call per window (for backends with a round trip)
+        if self._employee_loader is None:
+            with self._init_lock:
+                if self._employee_loader is None:
+                    self._employee_loader = BatchLoader(
+                        lambda employee_ids: self.backend.get_employees(employee_ids),
+                        window=float(os.environ.get("HR_DB_BATCH_WINDOW_MS", "2")) / 1000,
+                    )
+        return self._employee_loader
+
+    @property
+    def leave_requests(self):
+        # Submitted leave requests, durable when HR_LEAVE_WAL names a log file
+        if self._leave_requests is None:
+            with self._init_lock:
+                if self._leave_requests is None:
+                    self._leave_requests = LeaveRequestStore(os.environ.get("HR_LEAVE_WAL"))
+        return self._leave_requests
+
+    @property
+    def expenses(self):
+        # Expense claims and approval queues, durable when HR_EXPENSE_LOG names a log file
+        if self._expenses is None:
+            with self._init_lock:
+                if self._expenses is None:
+                    self._expenses = ExpenseLedger(os.environ.get("HR_EXPENSE_LOG"))
+        return self._expenses
+
+    @property
+    def documents(self):
+        # Uploaded onboarding documents, verified against required_documents
+        if self._documents is None:
+            with self._init_lock:
+                if self._documents is None:
+                    from .documents import DocumentPipeline
+
+                    self._documents = DocumentPipeline(self.required_documents)
+        self._follow_snapshot()
+        return self._documents
+
+    def warm_up(self, employee_ids=()):
+        """Build the stores and indexes, and pull `employee_ids` into the cache.
+
+        Meant to run off the event loop (see `start_warm_up`); every piece is
+        also built on demand, so a request that arrives first just builds it
+        itself.
+        """
+        self.backend
+        self.leave_requests
+        self.expenses
+        self.job_index
+        self.policy_index
+        self.answer_cache
+        employee_ids = list(employee_ids)
+        if employee_ids:
+            generation = self.employee_cache.generation
+            employees = asyncio.run(self.backend.get_employees(employee_ids))
+            for employee_id, employee in employees.items():
+                self.employee_cache.set(employee_id, employee, generation)
+
+    @property
+    def policy_index(self):
+        # Built on first use so importing the actions stays cheap
+        if self._policy_index is None:
+            from .retrieval import PolicyIndex
+
+            self._policy_index = PolicyIndex.from_directory()
+        return self._policy_index
+
+    @property
+    def answer_cache(self):
+        if self._answer_cache is None:
+            from .answer_cache import AnswerCache, DocVersions, ExtractiveGenerator
+
+            if self.answer_generator is None:
+                self.answer_generator = ExtractiveGenerator()
+            self._answer_cache = AnswerCache(
+                maxsize=int(os.environ.get("HR_ANSWER_CACHE_SIZE", "10000")),
+                similarity=float(os.environ.get("HR_ANSWER_CACHE_SIMILARITY", "0.8")),
+                versions=DocVersions(check_interval=float(os.environ.get("HR_POLICY_DOCS_CHECK_S", "5"))),
+                on_docs_changed=self._reset_policy_index,
+            )
+        return self._answer_cache
+
+    def _reset_policy_index(self):
+        self._policy_index = None
+
+    def search_policies(self, query, k=3):
+        return self.policy_index.search(query, k)
+
+    @property
+    def policies(self):
+        # Curated answers come from the hot-reloaded content file
+        return content_registry.current.policies
+
+    async def get_policy(self, policy_topic):
+        content = content_registry.current
+        if not policy_topic:
+            return content.template("policy_unknown").text
+        answer = content.policy(policy_topic)
+        if answer is not None:
+            return answer
+        # Anything that isn't one of the curated topics is answered from the
+        # best-ranked passages in the policy documents
+        answer = self.answer_cache.get(policy_topic)
+        if answer is not None:
+            return answer
+        # A passage sharing a single common word ("company", "policy") with
+        # the question is no answer; below the floor, say we don't know
+        results = self.policy_index.search(policy_topic, k=3, min_terms=POLICY_MIN_TERMS)
+        answer = await self.answer_generator.generate(policy_topic, results) if results else None
+        if answer:
+            self.answer_cache.set(policy_topic, answer, {result.passage.source for result in results})
+            return answer
+        return content.template("policy_unknown").text
+
+    @property
+    def job_index(self):
+        self._follow_snapshot()
+        if self._job_index is None:
+            self._job_index = JobIndex(self.job_openings)
+        return self._job_index
+
+    def load_job_openings(self, jobs):
+        self.job_openings = list(jobs)
+        self._job_index = None
+
+    def add_job_opening(self, job):
+        self.job_openings.append(job)
+        self._job_index = None
+
+    def close_job_opening(self, title):
+        remaining = [job for job in self.job_openings if job["title"] != title]
+        closed = len(remaining) != len(self.job_openings)
+        if closed:
+            self.job_openings = remaining
+            self._job_index = None
+        return closed
+
+    def search_jobs(self, title=None, department=None, location=None, offset=0, limit=None):
+        return self.job_index.search(title, department, location, offset, limit)
 
 # Initialize the simulated database
 hr_db = HRDatabase()
+registry.register_cache("employees", lambda: hr_db.employee_cache.stats())
+registry.register_cache("policy_answers", lambda: hr_db._answer_cache.stats() if hr_db._answer_cache else None)
+
+
+def start_warm_up(employee_ids=()) -> threading.Thread:
+    """Run `hr_db.warm_up` on a daemon thread while the server starts taking requests."""
+    def warm_up():
+        try:
+            hr_db.warm_up(employee_ids)
+            content_registry.current
+            router("policy")
+            router("it_support")
+        except Exception:
+            logger.exception("HR data warm-up failed; stores will be built on first use.")
+
+    thread = threading.Thread(target=warm_up, name="hr-warm-up", daemon=True)
+    thread.start()
+    return thread
 
-class ActionGreetUser(Action):
+JOBS_PER_PAGE = 5
+
+class ActionGreetUser(AsyncAction):
     def name(self) -> Text:
         return "action_greet_user"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         user_name = tracker.get_slot("user_name")
         
@@ -163,11 +465,7 @@ class ActionGreetUser(Action):
         return []
 
 
-from typing import Any, Text, Dict, List
-from rasa_sdk import Action, Tracker
-from rasa_sdk.events import SlotSet, SessionStarted, ActionExecuted, FollowupAction
-
-class ActionSessionStart(Action):
+class ActionSessionStart(AsyncAction):
     def name(self) -> Text:
         return "action_session_start"
 
@@ -180,7 +478,7 @@ class ActionSessionStart(Action):
         employee_id = tracker.get_slot("employee_id")
         
         if employee_id:
-            employee = hr_db.get_employee(employee_id)
+            employee = await hr_db.get_employee(employee_id)
             if employee:
                 events += [SlotSet("user_name", employee["name"]), 
                         SlotSet("department", employee["department"]),
@@ -201,38 +499,39 @@ class ActionSessionStart(Action):
 
 
 
-class ActionGetLeaveBalance(Action):
+class ActionGetLeaveBalance(AsyncAction):
     def name(self) -> Text:
         return "action_get_leave_balance"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         employee_id = tracker.get_slot("employee_id")
+        templates = content_registry.current.templates
         
         if not employee_id:
-            dispatcher.utter_message(text="I need your employee ID to check your leave balance. Could you please provide it?")
+            dispatcher.utter_message(text=templates["leave_balance_needs_id"].text)
             return []
         
-        leave_balance = hr_db.get_leave_balance(employee_id)
+        leave_balance = await hr_db.get_leave_balance(employee_id)
         
         if leave_balance:
-            balance_text = f"Your current leave balances are:\n- Annual Leave: {leave_balance['annual']} days\n- Sick Leave: {leave_balance['sick']} days\n- Personal Leave: {leave_balance['personal']} days"
+            balance_text = templates["leave_balance"].render_map(leave_balance)
             dispatcher.utter_message(text=balance_text)
             return [SlotSet("leave_balance", balance_text)]
         else:
-            dispatcher.utter_message(text="I couldn't find your leave balance information. Please contact HR for assistance.")
+            dispatcher.utter_message(text=templates["leave_balance_not_found"].text)
             
         return []
 
-class ActionSubmitLeaveRequest(Action):
+class ActionSubmitLeaveRequest(AsyncAction):
     def name(self) -> Text:
         return "action_submit_leave_request"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         employee_id = tracker.get_slot("employee_id")
         leave_type = tracker.get_slot("leave_type")
@@ -256,8 +555,12 @@ class ActionSubmitLeaveRequest(Action):
             dispatcher.utter_message(text=f"I need your {', '.join(missing)} to submit your leave request.")
             return []
         
-        # Submit the leave request to the backend
-        result = hr_db.submit_leave_request(employee_id, leave_type, leave_start_date, leave_end_date, leave_reason)
+        # Submit the leave request to the backend; the key makes a re-triggered
+        # action for the same conversation and details a no-op
+        request_key = idempotency_key(tracker.sender_id, employee_id, leave_type,
+                                      leave_start_date, leave_end_date, leave_reason)
+        result = await hr_db.submit_leave_request(employee_id, leave_type, leave_start_date, leave_end_date,
+                                                  leave_reason, request_key=request_key)
         
         if result["status"] == "submitted":
             return [SlotSet("leave_status", "pending")]
@@ -266,13 +569,13 @@ class ActionSubmitLeaveRequest(Action):
             
         return []
 
-class ActionGetPolicyInformation(Action):
+class ActionGetPolicyInformation(AsyncAction):
     def name(self) -> Text:
         return "action_get_policy_information"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         # Extract the policy topic from the conversation
         last_message = tracker.latest_message.get("text", "")
@@ -283,26 +586,20 @@ class ActionGetPolicyInformation(Action):
         # 3. Retrieve relevant passages
         # 4. Use an LLM to generate a response based on those passages
         
-        # Simple keyword detection for demo
-        policy_topics = ["remote work", "sick leave", "annual leave", "benefits", "expense"]
-        detected_topic = None
-        
-        for topic in policy_topics:
-            if topic in last_message.lower():
-                detected_topic = topic
-                break
+        # Curated topics are detected from the keyword table in one pass
+        match = router("policy").route(last_message)
         
-        policy_answer = hr_db.get_policy(detected_topic if detected_topic else last_message)
+        policy_answer = await hr_db.get_policy(match.topic if match else last_message)
         
         return [SlotSet("policy_answer", policy_answer)]
 
-class ActionGetOnboardingStatus(Action):
+class ActionGetOnboardingStatus(AsyncAction):
     def name(self) -> Text:
         return "action_get_onboarding_status"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         employee_id = tracker.get_slot("employee_id")
         
@@ -310,38 +607,27 @@ class ActionGetOnboardingStatus(Action):
             dispatcher.utter_message(text="I need your employee ID to check your onboarding status. Could you please provide it?")
             return []
         
-        onboarding_status = hr_db.get_onboarding_status(employee_id)
+        onboarding_status = await hr_db.get_onboarding_status(employee_id)
         
         if onboarding_status:
-            # Format the progress and pending tasks
-            completed = ", ".join(onboarding_status["progress"])
-            pending = ", ".join(onboarding_status["pending"])
-            
-            if pending:
-                next_task = onboarding_status["pending"][0] if onboarding_status["pending"] else "All tasks completed"
-                progress_text = f"Completed tasks: {completed}\nPending tasks: {pending}\nNext task to focus on: {next_task}"
-                return [
-                    SlotSet("onboarding_progress", progress_text),
-                    SlotSet("onboarding_next_task", next_task)
-                ]
-            else:
-                progress_text = f"Congratulations! You have completed all onboarding tasks: {completed}"
-                return [
-                    SlotSet("onboarding_progress", progress_text),
-                    SlotSet("onboarding_next_task", "All tasks completed")
-                ]
+            # The progress text is rendered once per change, not per call
+            summary = onboarding_status.summary()
+            return [
+                SlotSet("onboarding_progress", summary.progress_text),
+                SlotSet("onboarding_next_task", summary.next_task)
+            ]
         else:
             dispatcher.utter_message(text="I couldn't find your onboarding information. Please contact HR for assistance.")
             
         return []
 
-class ActionUpdateOnboardingTask(Action):
+class ActionUpdateOnboardingTask(AsyncAction):
     def name(self) -> Text:
         return "action_update_onboarding_task"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         employee_id = tracker.get_slot("employee_id")
         task = tracker.get_slot("onboarding_next_task")
@@ -351,15 +637,16 @@ class ActionUpdateOnboardingTask(Action):
             return []
         
         # Update the task status
-        success = hr_db.update_onboarding_task(employee_id, task)
+        success = await hr_db.update_onboarding_task(employee_id, task)
         
         if success:
             dispatcher.utter_message(text=f"Great job! I've marked '{task}' as completed.")
             
             # Get the updated status to find the next task
-            onboarding_status = hr_db.get_onboarding_status(employee_id)
-            if onboarding_status and onboarding_status["pending"]:
-                next_task = onboarding_status["pending"][0]
+            onboarding_status = await hr_db.get_onboarding_status(employee_id)
+            summary = onboarding_status.summary() if onboarding_status else None
+            if summary and summary.has_pending:
+                next_task = summary.next_task
                 dispatcher.utter_message(text=f"Your next task is: {next_task}")
                 return [SlotSet("onboarding_next_task", next_task)]
             else:
@@ -370,39 +657,34 @@ class ActionUpdateOnboardingTask(Action):
             
         return []
 
-class ActionGetBenefitsInformation(Action):
+class ActionGetBenefitsInformation(AsyncAction):
     def name(self) -> Text:
         return "action_get_benefits_information"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         selected_benefit = tracker.get_slot("selected_benefit")
+        content = content_registry.current
+        details = content.benefit(selected_benefit)
         
-        benefit_details = {
-            "health insurance": "Our health insurance plans include three options (Basic, Standard, Premium) with varying coverage levels and premiums. All plans include medical, dental, and vision coverage with different deductibles and co-pays.",
-            "401k": "Our 401(k) plan includes a 4% company match. You can contribute up to the annual IRS limit, and are fully vested in company contributions after 3 years of service.",
-            "life insurance": "All full-time employees receive basic life insurance coverage equal to one year's salary at no cost. Additional voluntary coverage can be purchased for yourself and dependents.",
-            "wellness program": "Our wellness program includes gym membership discounts, wellness challenges with rewards, and annual health screenings. Participation can earn you up to $500 in health insurance premium discounts."
-        }
-        
-        if selected_benefit and selected_benefit.lower() in benefit_details:
-            dispatcher.utter_message(text=benefit_details[selected_benefit.lower()])
+        if details is not None:
+            dispatcher.utter_message(text=details)
         elif not selected_benefit:
-            dispatcher.utter_message(text="Please select a specific benefit you'd like to learn more about, such as health insurance, 401(k), life insurance, or wellness program.")
+            dispatcher.utter_message(text=content.template("benefit_prompt").text)
         else:
-            dispatcher.utter_message(text="I don't have specific information about that benefit. Please contact HR for more details.")
+            dispatcher.utter_message(text=content.template("benefit_unknown").text)
             
         return []
 
-class ActionSubmitExpense(Action):
+class ActionSubmitExpense(AsyncAction):
     def name(self) -> Text:
         return "action_submit_expense"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         employee_id = tracker.get_slot("employee_id")
         expense_amount = tracker.get_slot("expense_amount")
@@ -422,44 +704,87 @@ class ActionSubmitExpense(Action):
             dispatcher.utter_message(text=f"I need your {', '.join(missing)} to submit your expense claim.")
             return []
         
-        # Determine if manager approval is needed (for expenses over $100)
-        needs_approval = float(expense_amount) > 100
+        # Record the claim; ones over $100 go to the manager's approval queue
+        request_key = idempotency_key(tracker.sender_id, employee_id, expense_amount, expense_category,
+                                      expense_date, expense_description)
+        try:
+            claim = await hr_db.submit_expense(employee_id, expense_amount, expense_category, expense_date,
+                                               expense_description, request_key=request_key)
+        except ExpenseError as exc:
+            dispatcher.utter_message(text=f"I couldn't submit your expense claim: {exc}.")
+            return []
         
-        if needs_approval:
-            employee = hr_db.get_employee(employee_id)
-            manager = employee["manager"] if employee else "your manager"
-            dispatcher.utter_message(text=f"Your expense claim of ${expense_amount} for {expense_category} has been submitted. It requires approval from {manager}.")
+        amount = claim["amount"]
+        if claim["status"] == "pending":
+            manager = claim["manager"] if claim["manager"] != UNASSIGNED else "your manager"
+            message = f"Your expense claim of ${amount} for {expense_category} has been submitted (reference {claim['expense_id']}). It requires approval from {manager}."
         else:
-            dispatcher.utter_message(text=f"Your expense claim of ${expense_amount} for {expense_category} has been successfully submitted and auto-approved.")
+            message = f"Your expense claim of ${amount} for {expense_category} has been successfully submitted and auto-approved (reference {claim['expense_id']})."
+        if claim["receipt_required"]:
+            message += f" Please upload the receipt in the TechCorp Expense app, as receipts are required for expenses over ${RECEIPT_REQUIRED_OVER}."
+        dispatcher.utter_message(text=message)
             
         return []
 
-class ActionVerifyDocuments(Action):
+class ActionVerifyDocuments(AsyncAction):
     def name(self) -> Text:
         return "action_verify_documents"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         document_type = tracker.get_slot("document_type")
         
+        # Cleared on early exits so a status from an earlier check isn't reused
         if not document_type:
             dispatcher.utter_message(text="Please specify what type of document you're uploading.")
-            return []
+            return [SlotSet("document_status", None)]
+        
+        employee_id = tracker.get_slot("employee_id")
+        if not employee_id:
+            dispatcher.utter_message(text="Please provide your employee ID so I can check your uploaded documents.")
+            return [SlotSet("document_status", None)]
+        
+        # The ID is free text from the chat and names an upload folder, so only
+        # a known employee's folder is ever looked at
+        if await hr_db.get_employee(employee_id) is None:
+            dispatcher.utter_message(text="I couldn't find your employee record. Please check your employee ID or contact HR for assistance.")
+            return [SlotSet("document_status", None)]
+        
+        # Verify whatever arrived through the document portal since the last check
+        role = tracker.get_slot("employee_role")
+        country = tracker.get_slot("employee_country")
+        await hr_db.documents.refresh([employee_id])
+        record = hr_db.documents.find(employee_id, document_type, role, country)
+        if record is None:
+            dispatcher.utter_message(text=f"I haven't received your {document_type} yet. Please upload it through the secure document portal (PDF, JPG, PNG; max 5MB).")
+            status = "not_received"
+        elif record.check.problems:
+            dispatcher.utter_message(text=f"I couldn't verify your {document_type}: {'; '.join(record.check.problems)}. Please upload it again.")
+            status = "rejected"
+        elif record.duplicate_of:
+            dispatcher.utter_message(text=f"Your {document_type} is the same file as one already uploaded. Please upload the correct document.")
+            status = "duplicate"
+        else:
+            dispatcher.utter_message(text=f"I've verified your {document_type}. The document appears to be in the correct format and is complete.")
+            status = "verified"
         
-        # Simulate document verification
-        dispatcher.utter_message(text=f"I've verified your {document_type}. The document appears to be in the correct format and is complete.")
+        report = hr_db.documents.completeness(employee_id, role, country) if role and country else None
+        if report and report.missing:
+            dispatcher.utter_message(text=f"Documents still needed for {role} in {country}: {', '.join(report.missing)}.")
+        elif report:
+            dispatcher.utter_message(text=f"You've submitted all required documents for {role} in {country}.")
         
-        return [SlotSet("document_status", "verified")]
+        return [SlotSet("document_status", status)]
 
-class ActionGetPayslip(Action):
+class ActionGetPayslip(AsyncAction):
     def name(self) -> Text:
         return "action_get_payslip"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         employee_id = tracker.get_slot("employee_id")
         
@@ -468,65 +793,105 @@ class ActionGetPayslip(Action):
             return []
         
         # In a real implementation, this would securely retrieve payslip data from a payroll system
-        employee = hr_db.get_employee(employee_id)
+        employee = await hr_db.get_employee(employee_id)
         if employee:
-            current_month = datetime.datetime.now().strftime("%B %Y")
+            current_month = now().strftime("%B %Y")
             dispatcher.utter_message(text=f"I've located your payslip for {current_month}. For security reasons, I can only provide limited information here. Your net pay has been transferred to your registered bank account. You can view your full payslip with all deductions and calculations by logging into the payroll portal at payroll.techcorp.com.")
         else:
             dispatcher.utter_message(text="I couldn't find your payslip information. Please contact HR or Payroll for assistance.")
             
         return []
 
-class ActionSearchJobs(Action):
+class ActionSearchJobs(AsyncAction):
     def name(self) -> Text:
         return "action_search_jobs"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         job_title = tracker.get_slot("job_title")
         job_location = tracker.get_slot("job_location")
         job_department = tracker.get_slot("job_department")
         
-        # Search for matching jobs
-        jobs = hr_db.search_jobs(job_title, job_department, job_location)
-        
-        if jobs:
-            response = "I found the following job openings that match your criteria:\n\n"
-            for job in jobs:
-                response += f"**{job['title']}** - {job['department']}\n"
-                response += f"Location: {job['location']}\n"
-                response += f"Requirements: {job['requirements']}\n"
-                response += f"Application Deadline: {job['deadline']}\n\n"
-                
-            response += "To apply, please visit careers.techcorp.com and search for these positions."
-            dispatcher.utter_message(text=response)
+        page = int(tracker.get_slot("job_search_page") or 0)
+
+        # Search for matching jobs, one page at a time
+        result = hr_db.search_jobs(job_title, job_department, job_location,
+                                   offset=page * JOBS_PER_PAGE, limit=JOBS_PER_PAGE)
+
+        templates = content_registry.current.templates
+        if result.jobs:
+            listing = templates["job_listing"]
+            lines = [templates["job_results_header"].text]
+            lines.extend(listing.render_map(job) for job in result.jobs)
+
+            shown = page * JOBS_PER_PAGE + len(result.jobs)
+            if result.total > JOBS_PER_PAGE:
+                lines.append(templates["job_page_summary"].render(first=page * JOBS_PER_PAGE + 1, last=shown,
+                                                                  total=result.total))
+                facet = templates["job_location_facet"]
+                locations = ", ".join(facet.render(name=name, count=count)
+                                      for name, count in result.facets["location"].items())
+                lines.append(templates["job_location_facets"].render(locations=locations))
+                if shown < result.total:
+                    lines.append(templates["job_next_page"].text)
+            lines.append(templates["job_apply"].text)
+            dispatcher.utter_message(text="\n".join(lines))
+            return [SlotSet("job_search_page", page + 1 if shown < result.total else 0)]
+        elif result.total:
+            dispatcher.utter_message(text=templates["job_no_more"].text)
+            return [SlotSet("job_search_page", 0)]
         else:
-            dispatcher.utter_message(text="I couldn't find any job openings matching your criteria. Try broadening your search parameters or check back later as new positions are posted regularly.")
+            dispatcher.utter_message(text=templates["job_none"].text)
             
         return []
 
-class ActionITSupport(Action):
+class ActionITSupport(AsyncAction):
     def name(self) -> Text:
         return "action_it_support"
 
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher,
+                  tracker: Tracker,
+                  domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         # Get the latest user message to determine what IT support is needed
-        last_message = tracker.latest_message.get("text", "").lower()
+        last_message = tracker.latest_message.get("text", "")
+        match = router("it_support").route(last_message)
+        
+        content = content_registry.current
         
         # Check for specific IT setup needs
-        if "email" in last_message or "mail" in last_message:
-            dispatcher.utter_message(text="To set up your email: 1) Visit portal.techcorp.com, 2) Use your employee ID as your username and the temporary password from your welcome email, 3) Follow the prompts to create a permanent password.")
-        elif "vpn" in last_message:
-            dispatcher.utter_message(text="To set up VPN access: 1) Download the TechCorp VPN client from it.techcorp.com/downloads, 2) Install the software, 3) Launch the application, 4) Log in with your email credentials, 5) Use the verification code sent to your registered mobile number.")
-        elif "multi-factor" in last_message or "mfa" in last_message or "authentication" in last_message:
-            dispatcher.utter_message(text="To set up multi-factor authentication: 1) Download the TechCorp Authenticator app from your device's app store, 2) Open the app and scan the QR code from portal.techcorp.com/mfa, 3) Enter the verification code on the portal to complete setup.")
+        instructions = content.it_support.get(match.topic) if match else None
+        if instructions is not None:
+            dispatcher.utter_message(text=instructions)
         else:
             # Create a general IT support ticket
-            dispatcher.utter_message(text="I've created an IT support ticket for your issue. An IT support specialist will contact you within 24 hours. Your ticket number is IT-" + str(random.randint(10000, 99999)) + ".")
+            dispatcher.utter_message(text=content.template("it_ticket").render(ticket=random.randint(10000, 99999)))
             
         return []
+
+
+# Record latency, call/error counts and slot-read/event sizes for every action
+# defined above, and start whichever exporters the environment asks for
+action_classes = [
+    obj for obj in list(globals().values())
+    if isinstance(obj, type) and issubclass(obj, Action) and obj.__module__ == __name__
+]
+instrument_actions(action_classes)
+configure_from_env()
+
+if os.environ.get("HR_RECORD_TURNS"):
+    # Capture live traffic for offline replay (python -m actions.replay)
+    from .replay import TurnRecorder, record_actions
+
+    record_actions(action_classes, TurnRecorder(os.environ["HR_RECORD_TURNS"]))
+
+if os.environ.get("HR_WARM_UP"):
+    # Optional file of hot employee IDs, one per line, to preload into the cache
+    hot_ids_path = os.environ.get("HR_WARM_UP_EMPLOYEES")
+    hot_ids = []
+    if hot_ids_path:
+        with open(hot_ids_path, encoding="utf-8") as f:
+            hot_ids = [line.strip() for line in f if line.strip()]
+    start_warm_up(hot_ids)
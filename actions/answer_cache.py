@@ -0,0 +1,207 @@
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Text, Tuple
+import glob
+import os
+import time
+
+from .retrieval import DOCS_DIR, SearchResult, tokenize
+
+
+def query_signature(query: Text) -> FrozenSet[Text]:
+    """Case-, punctuation-, stopword- and word-order-insensitive form of a question."""
+    return frozenset(tokenize(query))
+
+
+class AnswerGenerator:
+    """Writes the answer to a question from retrieved passages; subclass to call an LLM.
+
+    `generate` is a coroutine awaited on the action server's event loop, so
+    a model call must be awaited (an async client) or handed to an executor
+    rather than made inline.
+    """
+
+    async def generate(self, question: Text, results: List[SearchResult]) -> Optional[Text]:
+        raise NotImplementedError
+
+
+class ExtractiveGenerator(AnswerGenerator):
+    """Local, deterministic stand-in for an LLM: answers with the best passage and its source."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, question, results):
+        self.calls += 1
+        if not results:
+            return None
+        best = results[0].passage
+        return f"{best.text} (Source: {best.source})"
+
+
+class DocVersions:
+    """Current version (mtime, size) of every policy document, re-scanned at most every `check_interval` seconds."""
+
+    def __init__(self, docs_dir: Text = DOCS_DIR, check_interval: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.docs_dir = docs_dir
+        self.check_interval = check_interval
+        self.clock = clock
+        self.versions = self._scan()
+        self._checked_at = clock()
+
+    def _scan(self) -> Dict[Text, Tuple[int, int]]:
+        versions = {}
+        for pattern in ("**/*.txt", "**/*.md"):
+            for file_path in glob.glob(os.path.join(self.docs_dir, pattern), recursive=True):
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                versions[os.path.relpath(file_path, self.docs_dir)] = (stat.st_mtime_ns, stat.st_size)
+        return versions
+
+    def changes(self) -> Tuple[Set[Text], bool]:
+        """Sources edited or removed since the last scan, and whether any were added."""
+        now = self.clock()
+        if now - self._checked_at < self.check_interval:
+            return set(), False
+        self._checked_at = now
+        versions = self._scan()
+        changed = {source for source, version in self.versions.items() if versions.get(source) != version}
+        added = any(source not in self.versions for source in versions)
+        self.versions = versions
+        return changed, added
+
+
+class _Entry(NamedTuple):
+    answer: Text
+    signature: FrozenSet[Text]
+    sources: FrozenSet[Text]
+
+
+class AnswerCache:
+    """LRU cache of policy answers keyed on the normalized question.
+
+    Questions with the same token set share an entry. With `similarity`
+    below 1, a miss also accepts the cached question with the highest
+    Jaccard similarity at or above it. Each answer is tagged with the
+    documents its passages came from. Editing or removing one of them drops
+    exactly those answers. Adding a document can change the best answer to
+    anything, so it drops them all. `on_docs_changed` is called whenever
+    either happens, so the caller can rebuild its index.
+    """
+
+    def __init__(self, maxsize: int = 10000, similarity: float = 0.8, versions: Optional[DocVersions] = None,
+                 on_docs_changed: Optional[Callable[[], Any]] = None):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.similarity = similarity
+        self.versions = versions if versions is not None else DocVersions()
+        self.on_docs_changed = on_docs_changed
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[FrozenSet[Text], _Entry]" = OrderedDict()
+        self._by_token: Dict[Text, Set[FrozenSet[Text]]] = {}
+        self._by_source: Dict[Text, Set[FrozenSet[Text]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync(self) -> None:
+        changed, added = self.versions.changes()
+        if added:
+            self.clear()
+        else:
+            for source in changed:
+                for signature in list(self._by_source.get(source, ())):
+                    self._remove(signature)
+                    self.invalidations += 1
+        if (changed or added) and self.on_docs_changed is not None:
+            self.on_docs_changed()
+
+    def _remove(self, signature: FrozenSet[Text]) -> None:
+        entry = self._entries.pop(signature)
+        for token in signature:
+            keys = self._by_token[token]
+            keys.discard(signature)
+            if not keys:
+                del self._by_token[token]
+        for source in entry.sources:
+            keys = self._by_source[source]
+            keys.discard(signature)
+            if not keys:
+                del self._by_source[source]
+
+    def _nearest(self, signature: FrozenSet[Text]) -> Optional[FrozenSet[Text]]:
+        overlaps = Counter()
+        for token in signature:
+            overlaps.update(self._by_token.get(token, ()))
+        best, best_score = None, self.similarity
+        for candidate, overlap in overlaps.items():
+            score = overlap / (len(signature) + len(candidate) - overlap)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def get(self, query: Text) -> Optional[Text]:
+        self._sync()
+        signature = query_signature(query)
+        entry = self._entries.get(signature)
+        if entry is None and signature and self.similarity < 1:
+            nearest = self._nearest(signature)
+            if nearest is not None:
+                entry = self._entries[nearest]
+                signature = nearest
+                self.near_hits += 1
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(signature)
+        self.hits += 1
+        return entry.answer
+
+    def set(self, query: Text, answer: Text, sources: Iterable[Text]) -> bool:
+        signature = query_signature(query)
+        if not signature:
+            # Nothing but stopwords and punctuation; too vague to share
+            return False
+        if signature in self._entries:
+            self._remove(signature)
+        entry = self._entries[signature] = _Entry(answer, signature, frozenset(sources))
+        for token in signature:
+            self._by_token.setdefault(token, set()).add(signature)
+        for source in entry.sources:
+            self._by_source.setdefault(source, set()).add(signature)
+        if len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return True
+
+    def invalidate_source(self, source: Text) -> int:
+        signatures = list(self._by_source.get(source, ()))
+        for signature in signatures:
+            self._remove(signature)
+        self.invalidations += len(signatures)
+        return len(signatures)
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._by_token.clear()
+        self._by_source.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Text
+import abc
+import asyncio
+import datetime
+import functools
+import logging
+import os
+
+from rasa_sdk import Action
+
+logger = logging.getLogger(__name__)
+
+# Sync `run` methods are legacy handlers that may block; they get their own
+# pool so they can't starve the default executor the SDK and backends use
+LEGACY_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("HR_LEGACY_ACTION_WORKERS", "8")),
+    thread_name_prefix="hr-legacy-action",
+)
+
+# What actions take as the current time. The replay harness sets it to when
+# each turn was recorded, so dates the actions generate match the recording
+action_clock: ContextVar[Callable[[], datetime.datetime]] = ContextVar("action_clock", default=datetime.datetime.now)
+
+
+def now() -> datetime.datetime:
+    return action_clock.get()()
+
+
+class AsyncAction(Action, metaclass=abc.ABCMeta):
+    """Base for actions that run natively on the action server's event loop.
+
+    Every subclass's `run` is wrapped so that at most `max_in_flight` calls of
+    that action run at once, and a call that takes longer than `timeout`
+    seconds (including time spent waiting for a slot) is cancelled and
+    answered with `timeout_message`. A subclass that still defines a
+    synchronous `run` gets it executed on `LEGACY_EXECUTOR` under the same
+    limits instead of blocking the loop.
+    """
+
+    timeout: float = float(os.environ.get("HR_ACTION_TIMEOUT_S", "10"))
+    max_in_flight: int = int(os.environ.get("HR_ACTION_MAX_IN_FLIGHT", "256"))
+    timeout_message: Text = "Sorry, that took longer than expected. Please try again in a moment."
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        run = vars(cls).get("run")
+        if run is not None and not getattr(run, "_bounded", False):
+            cls.run = _bounded(run)
+
+    @abc.abstractmethod
+    def name(self) -> Text:
+        pass
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per action class and event loop
+        cls = type(self)
+        loop = asyncio.get_running_loop()
+        limit = cls.__dict__.get("_limit")
+        if limit is None or limit[0] is not loop:
+            limit = (loop, asyncio.Semaphore(cls.max_in_flight))
+            cls._limit = limit
+        return limit[1]
+
+    async def _run_bounded(self, call: Callable[[], Awaitable[List[Dict[Text, Any]]]], dispatcher) -> List[Dict[Text, Any]]:
+        async def limited():
+            async with self._semaphore():
+                return await call()
+
+        try:
+            return await asyncio.wait_for(limited(), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Action '{self.name()}' timed out after {self.timeout}s and was cancelled.")
+            dispatcher.utter_message(text=self.timeout_message)
+            return []
+
+
+def _bounded(run):
+    if asyncio.iscoroutinefunction(run):
+        @functools.wraps(run)
+        async def wrapper(self, dispatcher, tracker, domain):
+            return await self._run_bounded(lambda: run(self, dispatcher, tracker, domain), dispatcher)
+    else:
+        @functools.wraps(run)
+        async def wrapper(self, dispatcher, tracker, domain):
+            loop = asyncio.get_running_loop()
+            return await self._run_bounded(
+                lambda: loop.run_in_executor(LEGACY_EXECUTOR, run, self, dispatcher, tracker, domain), dispatcher
+            )
+    wrapper._bounded = True
+    return wrapper
@@ -0,0 +1,87 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+import asyncio
+
+
+class BatchLoader:
+    """DataLoader-style coalescing of single-key lookups into bulk calls.
+
+    Every `load(key)` made within `window` seconds of the first pending one
+    is sent to `batch_fn` as a single list of unique keys. `batch_fn` returns
+    a mapping of key to value; keys missing from it resolve to `None`.
+    A batch is sent early once it holds `max_batch_size` keys.
+
+    Values are not memoized across batches, so a write is visible to the
+    next batch without any invalidation.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        window: float = 0.002,
+        max_batch_size: int = 500,
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.loads = 0
+        self.batches = 0
+        self.keys_dispatched = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight = set()
+
+    async def load(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures are bound to a loop; start fresh if we've been moved
+            # to another one (e.g. successive `asyncio.run` calls)
+            self._loop = loop
+            self._pending = {}
+            self._timer = None
+        self.loads += 1
+
+        future = self._pending.get(key)
+        if future is None:
+            future = loop.create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+        # Shielded so one cancelled caller doesn't cancel the shared result
+        # for everyone else waiting on the same key
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        self.batches += 1
+        self.keys_dispatched += len(batch)
+        task = self._loop.create_task(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        try:
+            results = await self.batch_fn(list(batch))
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loads": self.loads,
+            "batches": self.batches,
+            "keys_dispatched": self.keys_dispatched,
+            "avg_batch_size": self.keys_dispatched / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import time
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire `ttl` seconds after being stored.
+
+    `generation` is bumped on every invalidation. A caller that reads from
+    the backend on a miss should take `generation` before the read and pass
+    it to `set`, so a value fetched before a concurrent write is dropped
+    instead of being cached stale.
+    """
+
+    def __init__(self, maxsize: int = 50000, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> bool:
+        if generation is not None and generation != self.generation:
+            return False
+        self._entries[key] = (value, self.clock() + self.ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        self.generation += 1
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,196 @@
+"""Response content loaded from `content.yml` and hot-swapped when the file changes.
+
+Benefit descriptions, curated policy answers, IT setup instructions and
+message templates live in `content.yml` (or the file named by `HR_CONTENT`).
+They are parsed and validated once into an immutable `Content`, so an
+action's lookup is a dict access returning a prebuilt string. A template
+with no placeholders renders to that same string.
+
+`ContentRegistry.current` re-checks the file at most every
+`check_interval` seconds. When the file changes, the new version is loaded
+aside and swapped in with a single reference assignment, so a call sees
+either the old content or the new, never a mix. An edit that doesn't parse
+or validate is logged, and the previous content stays live.
+"""
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Mapping, NamedTuple, Optional, Text, Tuple
+import logging
+import os
+import string
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CONTENT_PATH = os.environ.get(
+    "HR_CONTENT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "content.yml")
+)
+SECTIONS = ("benefits", "policies", "it_support", "templates")
+# The templates the actions render and the fields each one is given
+TEMPLATE_FIELDS: Dict[Text, FrozenSet[Text]] = {
+    "benefit_prompt": frozenset(),
+    "benefit_unknown": frozenset(),
+    "policy_unknown": frozenset(),
+    "it_ticket": frozenset({"ticket"}),
+    "leave_balance": frozenset({"annual", "sick", "personal"}),
+    "leave_balance_needs_id": frozenset(),
+    "leave_balance_not_found": frozenset(),
+    "job_results_header": frozenset(),
+    "job_listing": frozenset({"title", "department", "location", "requirements", "deadline"}),
+    "job_page_summary": frozenset({"first", "last", "total"}),
+    "job_location_facet": frozenset({"name", "count"}),
+    "job_location_facets": frozenset({"locations"}),
+    "job_next_page": frozenset(),
+    "job_apply": frozenset(),
+    "job_no_more": frozenset(),
+    "job_none": frozenset(),
+}
+
+
+class ContentError(ValueError):
+    """Raised when a content file is missing a section or template, or a template is malformed."""
+
+
+class Template:
+    """A message template parsed and checked once at load time."""
+
+    __slots__ = ("name", "text", "fields")
+
+    def __init__(self, name: Text, text: Text):
+        try:
+            fields = [field for _, field, _, _ in string.Formatter().parse(text) if field is not None]
+        except ValueError as exc:
+            raise ContentError(f"template '{name}': {exc}")
+        for field in fields:
+            # Only plain names; no positional, attribute or index lookups
+            if not field.isidentifier():
+                raise ContentError(f"template '{name}': placeholder '{{{field}}}' must be a plain name")
+        self.name = name
+        # Interned so every render of a constant template returns the same object
+        self.text = sys.intern(text)
+        self.fields = frozenset(fields)
+
+    def render(self, **values: Any) -> Text:
+        return self.render_map(values)
+
+    def render_map(self, values: Mapping[Text, Any]) -> Text:
+        if not self.fields:
+            return self.text
+        return self.text.format_map(values)
+
+    def __repr__(self) -> Text:
+        return f"Template({self.name!r}, {self.text!r})"
+
+
+class Content(NamedTuple):
+    version: Tuple[int, int]
+    benefits: Mapping[Text, Text]
+    policies: Mapping[Text, Text]
+    it_support: Mapping[Text, Text]
+    templates: Mapping[Text, Template]
+
+    def template(self, name: Text) -> Template:
+        return self.templates[name]
+
+    def benefit(self, name: Optional[Text]) -> Optional[Text]:
+        return self.benefits.get(name.lower()) if name else None
+
+    def policy(self, topic: Text) -> Optional[Text]:
+        """The curated answer for `topic`, or for the first topic containing it."""
+        topic = topic.lower()
+        answer = self.policies.get(topic)
+        if answer is None:
+            answer = next((text for key, text in self.policies.items() if topic in key), None)
+        return answer
+
+
+def _strings(section: Text, raw: Any) -> Dict[Text, Text]:
+    if not isinstance(raw, dict):
+        raise ContentError(f"section '{section}' must be a mapping of names to text")
+    for key, value in raw.items():
+        if not isinstance(value, str):
+            raise ContentError(f"'{section}.{key}' must be text")
+    return {sys.intern(str(key).lower()): sys.intern(value) for key, value in raw.items()}
+
+
+def parse_content(raw: Any, version: Tuple[int, int] = (0, 0)) -> Content:
+    """Validate the parsed YAML and build the immutable `Content`."""
+    if not isinstance(raw, dict):
+        raise ContentError("content file must be a mapping")
+    missing = [section for section in SECTIONS if section not in raw]
+    if missing:
+        raise ContentError(f"missing section(s): {', '.join(missing)}")
+    templates = {name: Template(name, text) for name, text in _strings("templates", raw["templates"]).items()}
+    for name, allowed in TEMPLATE_FIELDS.items():
+        template = templates.get(name)
+        if template is None:
+            raise ContentError(f"missing template '{name}'")
+        unknown = template.fields - allowed
+        if unknown:
+            raise ContentError(f"template '{name}' uses unknown field(s): {', '.join(sorted(unknown))}")
+    return Content(
+        version=version,
+        benefits=MappingProxyType(_strings("benefits", raw["benefits"])),
+        policies=MappingProxyType(_strings("policies", raw["policies"])),
+        it_support=MappingProxyType(_strings("it_support", raw["it_support"])),
+        templates=MappingProxyType(templates),
+    )
+
+
+def load_content(path: Text, version: Tuple[int, int] = (0, 0)) -> Content:
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        try:
+            raw = yaml.safe_load(f)
+        except yaml.YAMLError as exc:
+            raise ContentError(f"{path} is not valid YAML: {exc}")
+    return parse_content(raw, version)
+
+
+class ContentRegistry:
+    """Holds the live `Content` and swaps in a new version when the file changes."""
+
+    def __init__(self, path: Text = CONTENT_PATH, check_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.check_interval = check_interval
+        self.clock = clock
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._content: Optional[Content] = None
+        self._version: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Content:
+        content = self._content
+        if content is None or self.clock() - self._checked_at >= self.check_interval:
+            content = self.refresh()
+        return content
+
+    def refresh(self) -> Content:
+        """Reload the file if its (mtime, size) changed; the first load raises on a bad file."""
+        with self._lock:
+            self._checked_at = self.clock()
+            try:
+                stat = os.stat(self.path)
+                version = (stat.st_mtime_ns, stat.st_size)
+                if version != self._version:
+                    # Remembered even if the load fails, so a bad edit is
+                    # reported once rather than re-parsed on every check
+                    self._version = version
+                    self._content = load_content(self.path, version)
+                    self.reloads += 1
+            except (OSError, ContentError) as exc:
+                if self._content is None:
+                    self._version = None
+                    raise
+                self.failed_reloads += 1
+                logger.error("Keeping the previous content; %s could not be loaded: %s", self.path, exc)
+            return self._content
+
+
+content_registry = ContentRegistry(CONTENT_PATH, check_interval=float(os.environ.get("HR_CONTENT_CHECK_S", "1")))
@@ -0,0 +1,278 @@
+"""Streaming verification of onboarding document uploads.
+
+The upload portal stores each hire's files under
+`HR_DOCUMENT_UPLOADS/<employee_id>/`, named after the document type
+(e.g. `ID proof.pdf`). `DocumentPipeline` checks new or changed files there:
+size limit, format sniffed from the content, a structural end-of-file check
+and a SHA-256 for deduplication. It then matches them to
+`required_documents[role][country]`.
+
+Files are read in fixed-size chunks into one reused buffer. With at most
+`max_in_flight` files open at a time, memory stays bounded however large
+the uploads are. Files above `inline_limit` are hashed in a process pool,
+so a wave of large scans doesn't hold the GIL the event loop needs.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Text, Tuple
+import asyncio
+import hashlib
+import os
+import re
+
+UPLOADS_DIR = os.environ.get("HR_DOCUMENT_UPLOADS", "uploads")
+# What the upload instructions promise (utter_document_upload_instructions)
+MAX_DOCUMENT_BYTES = 5 * 1024 * 1024
+CHUNK_BYTES = 256 * 1024
+
+_SIGNATURES = (
+    (b"%PDF-", "pdf"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+)
+# A complete file of each format ends with its trailer
+_TRAILERS = {
+    "pdf": b"%%EOF",
+    "jpg": b"\xff\xd9",
+    "png": b"IEND\xaeB`\x82",
+}
+_WORD = re.compile(r"[a-z0-9]+")
+# Path separators (either platform's), drive colons and NUL can't appear in
+# an employee ID
+_UNSAFE_ID = re.compile(r"[/\\:\x00]")
+
+
+class FileCheck(NamedTuple):
+    path: Text
+    size: int
+    format: Optional[Text]
+    sha256: Optional[Text]
+    problems: Tuple[Text, ...]
+    # False when the file couldn't be read at all, e.g. it was removed mid-scan
+    readable: bool = True
+
+
+def inspect_file(path: Text, max_bytes: int = MAX_DOCUMENT_BYTES, chunk_bytes: int = CHUNK_BYTES) -> FileCheck:
+    """Size, format and integrity checks plus a content hash, reading `chunk_bytes` at a time.
+
+    Module-level so it can run in a worker process.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return FileCheck(path, size, None, None, ("file is empty",))
+    if size > max_bytes:
+        # Rejected without reading it
+        return FileCheck(path, size, None, None, (f"file is larger than {max_bytes // (1024 * 1024)}MB",))
+
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_bytes)
+    view = memoryview(buffer)
+    file_format = None
+    tail = b""
+    with open(path, "rb", buffering=0) as f:
+        first = True
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            chunk = view[:read]
+            if first:
+                head = bytes(chunk[:16])
+                file_format = next((name for magic, name in _SIGNATURES if head.startswith(magic)), None)
+                first = False
+            digest.update(chunk)
+            # Keep just enough of the end of the file for the trailer check
+            tail = (tail + bytes(chunk[-1024:]))[-1024:]
+
+    problems = []
+    if file_format is None:
+        problems.append("not a PDF, JPG or PNG file")
+    else:
+        # PDF writers commonly leave a newline after the trailer
+        end = tail.rstrip(b"\r\n\t \x00") if file_format == "pdf" else tail
+        if not end.endswith(_TRAILERS[file_format]):
+            problems.append(f"{file_format.upper()} file is truncated or corrupted")
+    return FileCheck(path, size, file_format, digest.hexdigest(), tuple(problems))
+
+
+def _words(text: Text) -> List[Text]:
+    # Plurals folded so "certificate" matches "certificates"
+    return [word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+            for word in _WORD.findall(text.lower())]
+
+
+def match_requirement(document_type: Text, required: Sequence[Text]) -> Optional[Text]:
+    """The required document that `document_type` names, e.g. "passport" -> "ID proof (Aadhaar or passport)".
+
+    A requirement is matched by its own name or by any of the alternatives
+    listed in its parentheses, whichever shares the most words.
+    """
+    words = set(_words(document_type))
+    if not words:
+        return None
+    best, best_score = None, 0.0
+    for requirement in required:
+        name, _, alternatives = requirement.partition("(")
+        names = [name] + re.split(r",|\bor\b", alternatives.rstrip(")"))
+        for candidate in names:
+            candidate_words = set(_words(candidate))
+            if not candidate_words:
+                continue
+            score = len(words & candidate_words) / len(words | candidate_words)
+            if score > best_score:
+                best, best_score = requirement, score
+    return best if best_score >= 0.5 else None
+
+
+class DocumentRecord(NamedTuple):
+    employee_id: Text
+    document_type: Text
+    check: FileCheck
+    duplicate_of: Optional[Text]
+
+    @property
+    def accepted(self) -> bool:
+        return not self.check.problems and self.duplicate_of is None
+
+
+class CompletenessReport(NamedTuple):
+    employee_id: Text
+    role: Text
+    country: Text
+    received: List[Text]
+    rejected: Dict[Text, Tuple[Text, ...]]
+    missing: List[Text]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+
+class DocumentPipeline:
+    """Verifies uploads as they arrive and tracks each hire's documents."""
+
+    def __init__(self, required_documents: Dict[Text, Dict[Text, List[Text]]], uploads_dir: Text = UPLOADS_DIR,
+                 executor: Optional[Executor] = None, inline_limit: int = 512 * 1024,
+                 max_in_flight: Optional[int] = None):
+        self.required_documents = required_documents
+        self.uploads_dir = uploads_dir
+        self.inline_limit = inline_limit
+        self._executor = executor
+        self.max_in_flight = max_in_flight or 2 * (os.cpu_count() or 1)
+        # employee_id -> document type -> record
+        self.documents: Dict[Text, Dict[Text, DocumentRecord]] = {}
+        # content hash -> "employee_id/document type" that first uploaded it
+        self.by_hash: Dict[Text, Text] = {}
+        # path -> (mtime_ns, size) at the last check, so unchanged files are skipped
+        self._seen: Dict[Text, Tuple[int, int]] = {}
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=int(os.environ.get("HR_DOCUMENT_WORKERS", "2")))
+        return self._executor
+
+    async def _inspect(self, path: Text, semaphore: asyncio.Semaphore) -> FileCheck:
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            # Small files aren't worth the round trip to another process
+            try:
+                executor = None if os.path.getsize(path) <= self.inline_limit else self.executor
+                return await loop.run_in_executor(executor, inspect_file, path)
+            except OSError as exc:
+                return FileCheck(path, 0, None, None, (f"file could not be read ({exc.strerror or exc})",), False)
+
+    def _record(self, employee_id: Text, document_type: Text, check: FileCheck) -> DocumentRecord:
+        owner = f"{employee_id}/{document_type}"
+        previous = self.documents.get(employee_id, {}).get(document_type)
+        if previous is not None and previous.check.sha256 != check.sha256:
+            # The file was replaced, so its old content is no longer this
+            # document's and a later upload of it isn't a duplicate
+            if self.by_hash.get(previous.check.sha256) == owner:
+                del self.by_hash[previous.check.sha256]
+        duplicate_of = None
+        if check.sha256 is not None:
+            first = self.by_hash.setdefault(check.sha256, owner)
+            if first != owner:
+                duplicate_of = first
+        record = DocumentRecord(employee_id, document_type, check, duplicate_of)
+        self.documents.setdefault(employee_id, {})[document_type] = record
+        return record
+
+    async def verify(self, uploads: Iterable[Tuple[Text, Text, Text]]) -> List[DocumentRecord]:
+        """Check `(employee_id, document_type, path)` uploads concurrently, at most `max_in_flight` at a time."""
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        uploads = list(uploads)
+        checks = await asyncio.gather(*(self._inspect(path, semaphore) for _, _, path in uploads))
+        return [self._record(employee_id, document_type, check)
+                for (employee_id, document_type, _), check in zip(uploads, checks)]
+
+    def _scan(self, employee_id: Text) -> List[Tuple[Tuple[Text, Text, Text], Tuple[int, int]]]:
+        # The ID must name a folder directly under uploads_dir
+        if not employee_id.strip(".") or ".." in employee_id or _UNSAFE_ID.search(employee_id):
+            raise ValueError(f"invalid employee ID {employee_id!r}")
+        folder = os.path.join(self.uploads_dir, employee_id)
+        try:
+            entries = list(os.scandir(folder))
+        except FileNotFoundError:
+            return []
+        uploads = []
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            version = (stat.st_mtime_ns, stat.st_size)
+            if self._seen.get(entry.path) != version:
+                uploads.append(((employee_id, os.path.splitext(entry.name)[0], entry.path), version))
+        return uploads
+
+    def pending_uploads(self, employee_id: Text) -> List[Tuple[Text, Text, Text]]:
+        """New or changed files in the hire's upload folder."""
+        return [upload for upload, _ in self._scan(employee_id)]
+
+    async def refresh(self, employee_ids: Iterable[Text]) -> List[DocumentRecord]:
+        """Verify whatever the given hires uploaded since the last refresh, e.g. a whole onboarding wave."""
+        scanned = [item for employee_id in employee_ids for item in self._scan(employee_id)]
+        if not scanned:
+            return []
+        records = await self.verify([upload for upload, _ in scanned])
+        for (upload, version), record in zip(scanned, records):
+            # Only files that were actually read are skipped next time; an
+            # unreadable one is retried on the next refresh
+            if record.check.readable:
+                self._seen[upload[2]] = version
+        return records
+
+    def find(self, employee_id: Text, document_type: Text, role: Optional[Text] = None,
+             country: Optional[Text] = None) -> Optional[DocumentRecord]:
+        """The hire's upload for `document_type`; with a role and country, any upload meeting the same requirement."""
+        documents = self.documents.get(employee_id, {})
+        record = documents.get(document_type)
+        if record is not None:
+            return record
+        wanted = set(_words(document_type))
+        record = next((r for name, r in documents.items() if set(_words(name)) == wanted), None)
+        required = self.required_documents.get(role, {}).get(country)
+        if record is None and required:
+            requirement = match_requirement(document_type, required)
+            if requirement is not None:
+                record = next((r for name, r in documents.items() if match_requirement(name, required) == requirement), None)
+        return record
+
+    def completeness(self, employee_id: Text, role: Text, country: Text) -> Optional[CompletenessReport]:
+        required = self.required_documents.get(role, {}).get(country)
+        if required is None:
+            return None
+        received, rejected = [], {}
+        for document_type, record in self.documents.get(employee_id, {}).items():
+            requirement = match_requirement(document_type, required)
+            if requirement is None:
+                continue
+            if record.accepted:
+                received.append(requirement)
+            else:
+                rejected[requirement] = record.check.problems or (f"duplicate of {record.duplicate_of}",)
+        missing = [requirement for requirement in required if requirement not in received]
+        return CompletenessReport(employee_id, role, country, received, rejected, missing)
@@ -0,0 +1,351 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Text, Tuple
+import asyncio
+import datetime
+import re
+
+from .jsonlog import JsonLinesLog
+from .leave_requests import MonotonicULID
+
+# From the expense policy (docs/employee_benefits_and_expenses_policies.txt)
+SUBMISSION_WINDOW_DAYS = 30
+RECEIPT_REQUIRED_OVER = Decimal("25")
+APPROVAL_REQUIRED_OVER = Decimal("100")
+CENT = Decimal("0.01")
+# Queue for claims over the threshold from employees without a manager on record
+UNASSIGNED = "unassigned"
+
+_MONTHS = {name: number for number, names in enumerate(
+    (("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+     ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"),
+     ("dec", "december")), start=1) for name in names}
+_WEEKDAYS = {name: number for number, names in enumerate(
+    (("mon", "monday"), ("tue", "tues", "tuesday"), ("wed", "wednesday"), ("thu", "thur", "thurs", "thursday"),
+     ("fri", "friday"), ("sat", "saturday"), ("sun", "sunday"))) for name in names}
+_DAYS_AGO = re.compile(r"^(\d+|a|one|two|three|four|five|six|seven) (day|week)s? ago$")
+_SMALL_NUMBERS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+_MONTH_DAY = re.compile(r"^(?:([a-z]+) (\d{1,2})|(\d{1,2}) (?:of )?([a-z]+))(?: (\d{4}))?$")
+_NUMERIC = re.compile(r"^(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?$")
+
+
+class ExpenseError(ValueError):
+    """Raised for an expense claim that can't be accepted; the message says why."""
+
+
+def parse_amount(value: Any) -> Decimal:
+    """Exact amount in dollars and cents from a slot value, card-feed string or number."""
+    try:
+        amount = Decimal(str(value).strip().lstrip("$").replace(",", ""))
+    except InvalidOperation:
+        raise ExpenseError(f"'{value}' is not a valid amount")
+    if not amount.is_finite() or amount <= 0:
+        raise ExpenseError(f"'{value}' is not a valid amount")
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _past_date(year: Optional[int], month: int, day: int, today: datetime.date) -> datetime.date:
+    # Without a year, the most recent such date on or before today
+    if year is not None:
+        return datetime.date(year, month, day)
+    candidate = datetime.date(today.year, month, day) if (month, day) != (2, 29) else None
+    if candidate is None or candidate > today:
+        candidate = datetime.date(today.year - 1, month, day)
+    return candidate
+
+
+def parse_expense_date(value: Any, today: datetime.date) -> datetime.date:
+    """The date an expense slot or feed row refers to.
+
+    Accepts ISO dates and the ways people write a recent date in chat:
+    "today", "yesterday", "3 days ago", "friday", "last friday", "March 3", "3rd of
+    March 2025", "3/3" (month first). A date without a year is the most
+    recent one that isn't in the future.
+    """
+    if isinstance(value, datetime.date):
+        return value
+    text = str(value).strip()
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        pass
+    text = re.sub(r"[,.]", " ", text.lower())
+    text = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", " ".join(text.split()))
+    text = re.sub(r"^(on|last|this past|past) ", lambda m: "last " if m.group(1) != "on" else "", text)
+    try:
+        if text == "today":
+            return today
+        if text == "yesterday":
+            return today - datetime.timedelta(days=1)
+        if text == "day before yesterday" or text == "the day before yesterday":
+            return today - datetime.timedelta(days=2)
+        match = _DAYS_AGO.match(text)
+        if match:
+            count = _SMALL_NUMBERS.get(match.group(1)) or int(match.group(1))
+            return today - datetime.timedelta(days=count * (7 if match.group(2) == "week" else 1))
+        last = text.startswith("last ")
+        weekday = _WEEKDAYS.get(text[5:] if last else text)
+        if weekday is not None:
+            # The most recent such weekday: today counts, unless it says "last"
+            days_back = (today.weekday() - weekday) % 7
+            return today - datetime.timedelta(days=days_back or (7 if last else 0))
+        match = _MONTH_DAY.match(text)
+        if match:
+            month = _MONTHS.get(match.group(1) or match.group(4))
+            if month is not None:
+                year = int(match.group(5)) if match.group(5) else None
+                return _past_date(year, month, int(match.group(2) or match.group(3)), today)
+        match = _NUMERIC.match(text)
+        if match:
+            year = match.group(3)
+            year = None if year is None else int(year) + (2000 if len(year) == 2 else 0)
+            return _past_date(year, int(match.group(1)), int(match.group(2)), today)
+    except ValueError:
+        pass
+    raise ExpenseError(f"the date '{value}' isn't one I recognise; please give it like 'March 3' or YYYY-MM-DD")
+
+
+def validate_claim(claim: Mapping[Text, Any], today: datetime.date) -> Dict[Text, Any]:
+    """Check one claim against the expense policy and return its normalized fields.
+
+    `receipt` may be True, False or missing. A missing receipt on a claim
+    that needs one is accepted but flagged with `receipt_required`, while an
+    explicit False rejects it.
+    """
+    employee_id = claim.get("employee_id")
+    if not employee_id:
+        raise ExpenseError("employee ID is missing")
+    amount = parse_amount(claim.get("amount"))
+    expense_date = claim.get("date")
+    expense_date = parse_expense_date(expense_date, today) if expense_date else today
+    if expense_date > today:
+        raise ExpenseError("expense date is in the future")
+    if (today - expense_date).days > SUBMISSION_WINDOW_DAYS:
+        raise ExpenseError(f"expenses must be submitted within {SUBMISSION_WINDOW_DAYS} days")
+    receipt = claim.get("receipt")
+    needs_receipt = amount > RECEIPT_REQUIRED_OVER
+    if needs_receipt and receipt is False:
+        raise ExpenseError(f"a receipt is required for expenses over ${RECEIPT_REQUIRED_OVER}")
+    return {
+        "employee_id": employee_id,
+        "amount": amount,
+        "category": claim.get("category") or "other",
+        "date": expense_date.isoformat(),
+        "description": claim.get("description") or "",
+        "receipt_required": needs_receipt and not receipt,
+    }
+
+
+class ApprovalQueue:
+    """One manager's pending claims in submission order, with their running total."""
+
+    __slots__ = ("claims", "total")
+
+    def __init__(self):
+        self.claims: Dict[Text, Dict[Text, Any]] = {}
+        self.total = Decimal("0.00")
+
+    def __len__(self) -> int:
+        return len(self.claims)
+
+    def add(self, record: Dict[Text, Any]) -> None:
+        self.claims[record["expense_id"]] = record
+        self.total += record["amount"]
+
+    def remove(self, expense_id: Text) -> None:
+        record = self.claims.pop(expense_id, None)
+        if record is not None:
+            self.total -= record["amount"]
+
+
+class IngestReport(NamedTuple):
+    accepted: int
+    duplicates: int
+    rejected: List[Tuple[int, Text]]
+    total: Decimal
+
+
+class ExpenseLedger:
+    """Append-only ledger of expense claims and approval decisions.
+
+    Amounts are `Decimal`s, written to the log as strings. Claims over
+    $100 wait in their manager's `ApprovalQueue`. Reading a manager's
+    pending claims, count or total is a single dict lookup, never a scan of
+    the ledger. Every claim and decision is appended to `events` and, with a
+    `path`, to a JSON-lines log that is replayed on start-up. As with leave
+    requests, an `idempotency_key` makes a resubmitted claim return the
+    original.
+    """
+
+    def __init__(self, path: Optional[Text] = None, fsync: bool = True):
+        self.path = path
+        self.events: List[Dict[Text, Any]] = []
+        self.claims: Dict[Text, Dict[Text, Any]] = {}
+        self.by_key: Dict[Text, Text] = {}
+        self.queues: Dict[Text, ApprovalQueue] = {}
+        self.ids = MonotonicULID()
+        # Submissions being written, so a concurrent retry waits for the original
+        self._inflight: Dict[Text, asyncio.Future] = {}
+        self._log = None
+        if path:
+            self._log = JsonLinesLog(path, fsync)
+            self._log.replay(self._replay_event)
+
+    def _replay_event(self, event: Dict[Text, Any]) -> None:
+        if "amount" in event:
+            event["amount"] = Decimal(event["amount"])
+        self._apply(event)
+
+    def _apply(self, event: Dict[Text, Any]) -> None:
+        self.events.append(event)
+        if event["event"] == "claim":
+            record = dict(event)
+            del record["event"]
+            self.claims[record["expense_id"]] = record
+            if record.get("idempotency_key"):
+                self.by_key[record["idempotency_key"]] = record["expense_id"]
+            if record["status"] == "pending":
+                self._queue(record["manager"]).add(record)
+        else:
+            record = self.claims[event["expense_id"]]
+            record["status"] = event["status"]
+            record["decided_by"] = event["by"]
+            self._queue(record["manager"]).remove(record["expense_id"])
+
+    def _queue(self, manager: Text) -> ApprovalQueue:
+        queue = self.queues.get(manager)
+        if queue is None:
+            queue = self.queues[manager] = ApprovalQueue()
+        return queue
+
+    async def _append(self, events: List[Dict[Text, Any]]) -> None:
+        # Durable first, then visible; the index is only touched on the loop
+        if self._log is not None and events:
+            payload = JsonLinesLog.encode(events, default=str)
+            await asyncio.get_running_loop().run_in_executor(None, self._log.write, payload)
+        for event in events:
+            self._apply(event)
+
+    def _claim_event(self, fields: Dict[Text, Any], manager: Optional[Text], key: Optional[Text]) -> Dict[Text, Any]:
+        needs_approval = fields["amount"] > APPROVAL_REQUIRED_OVER
+        return {
+            "event": "claim",
+            "expense_id": f"EX{self.ids.new()}",
+            "idempotency_key": key,
+            **fields,
+            "manager": manager or UNASSIGNED,
+            "status": "pending" if needs_approval else "approved",
+            "submitted_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+
+    def get(self, expense_id: Text) -> Optional[Dict[Text, Any]]:
+        return self.claims.get(expense_id)
+
+    def pending_for(self, manager: Text) -> Iterable[Dict[Text, Any]]:
+        """Live view of a manager's pending claims, oldest first."""
+        queue = self.queues.get(manager)
+        return queue.claims.values() if queue is not None else ()
+
+    def pending_summary(self, manager: Text) -> Tuple[int, Decimal]:
+        queue = self.queues.get(manager)
+        return (len(queue), queue.total) if queue is not None else (0, Decimal("0.00"))
+
+    async def submit(self, claim: Mapping[Text, Any], manager: Optional[Text], key: Optional[Text] = None,
+                     today: Optional[datetime.date] = None) -> Tuple[Dict[Text, Any], bool]:
+        """Validate and record one claim; returns the record and whether it was new."""
+        if key is not None:
+            if key in self.by_key:
+                return self.claims[self.by_key[key]], False
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                return await asyncio.shield(inflight), False
+        fields = validate_claim(claim, today or datetime.date.today())
+        event = self._claim_event(fields, manager, key)
+        if key is None:
+            await self._append([event])
+            return self.claims[event["expense_id"]], True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            await self._append([event])
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(self.claims[event["expense_id"]])
+        finally:
+            self._inflight.pop(key, None)
+        return await asyncio.shield(future), True
+
+    async def decide(self, expense_id: Text, approved: bool, by: Text) -> bool:
+        record = self.claims.get(expense_id)
+        if record is None or record["status"] != "pending":
+            return False
+        event = {
+            "event": "decision",
+            "expense_id": expense_id,
+            "status": "approved" if approved else "rejected",
+            "by": by,
+            "at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        await self._append([event])
+        return True
+
+    async def ingest(self, claims: Iterable[Mapping[Text, Any]],
+                     get_managers: Callable[[List[Text]], Awaitable[Dict[Text, Optional[Text]]]],
+                     today: Optional[datetime.date] = None, batch_size: int = 1000) -> IngestReport:
+        """Bulk-record claims (e.g. a card-feed import), validating them as they stream in.
+
+        Claims are consumed `batch_size` at a time. Each batch costs one
+        manager lookup for its distinct employees and one log write, so the
+        input can be a generator over a file of any size. A claim's optional
+        `external_id` makes re-importing the same feed a no-op for it.
+        Rejected claims are reported by their position in the input.
+        """
+        today = today or datetime.date.today()
+        accepted = duplicates = 0
+        rejected: List[Tuple[int, Text]] = []
+        total = Decimal("0.00")
+        batch: List[Tuple[Dict[Text, Any], Optional[Text]]] = []
+        seen = set()
+
+        async def flush():
+            nonlocal accepted, total
+            managers = await get_managers(list({fields["employee_id"] for fields, _ in batch}))
+            events = []
+            for fields, key in batch:
+                if fields["employee_id"] not in managers:
+                    rejected.append((fields.pop("_position"), f"unknown employee '{fields['employee_id']}'"))
+                    continue
+                del fields["_position"]
+                events.append(self._claim_event(fields, managers[fields["employee_id"]], key))
+                total += fields["amount"]
+            await self._append(events)
+            accepted += len(events)
+            batch.clear()
+
+        for position, claim in enumerate(claims):
+            external_id = claim.get("external_id")
+            key = f"feed:{external_id}" if external_id is not None else None
+            if key is not None and (key in self.by_key or key in self._inflight or key in seen):
+                duplicates += 1
+                continue
+            try:
+                fields = validate_claim(claim, today)
+            except ExpenseError as exc:
+                rejected.append((position, str(exc)))
+                continue
+            if key is not None:
+                seen.add(key)
+            fields["_position"] = position
+            batch.append((fields, key))
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+        return IngestReport(accepted, duplicates, rejected, total)
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
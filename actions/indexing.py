@@ -0,0 +1,207 @@
+"""Incremental, persisted vector index over the `docs/` knowledge base.
+
+Only files whose content hash changed are re-chunked, and only chunks whose
+hash has never been embedded before are sent to the embedder. The index is
+written next to a manifest and memory-mapped on load, so a restart doesn't
+rebuild anything.
+
+    python -m actions.indexing [--docs docs] [--index .docs_index]
+"""
+from typing import Any, Dict, List, Optional, Sequence, Text, Tuple
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .retrieval import DOCS_DIR, Passage, SearchResult, chunk_document, tokenize
+
+INDEX_DIR = os.environ.get("HR_POLICY_INDEX", os.path.join(os.path.dirname(DOCS_DIR), ".docs_index"))
+MANIFEST = "manifest.json"
+
+
+def content_hash(data: Text) -> Text:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class Embedder:
+    """Turns passages into fixed-size vectors. `name` must change whenever the vectors would."""
+
+    name: Text = ""
+    dim: int = 0
+
+    def embed(self, texts: Sequence[Text]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic, offline stand-in embedder based on feature hashing of tokens."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class VectorIndex:
+    """A built index: passages plus their (usually memory-mapped) vectors."""
+
+    def __init__(self, passages: List[Passage], vectors: np.ndarray, embedder: Embedder):
+        self.passages = passages
+        self.vectors = vectors
+        self.embedder = embedder
+
+    def search(self, query: Text, k: int = 3) -> List[SearchResult]:
+        if not self.passages:
+            return []
+        scores = self.vectors @ self.embedder.embed([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [SearchResult(float(scores[i]), self.passages[i]) for i in top]
+
+
+class IncrementalIndexer:
+    def __init__(self, docs_dir: Text = DOCS_DIR, index_dir: Text = INDEX_DIR,
+                 embedder: Optional[Embedder] = None, max_words: int = 80, batch_size: int = 64):
+        self.docs_dir = docs_dir
+        self.index_dir = index_dir
+        self.embedder = embedder or HashingEmbedder()
+        self.max_words = max_words
+        self.batch_size = batch_size
+
+    def _read_manifest(self) -> Optional[Dict[Text, Any]]:
+        try:
+            with open(os.path.join(self.index_dir, MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("embedder") != self.embedder.name or manifest.get("max_words") != self.max_words:
+            # Vectors or chunk boundaries would differ; start over
+            return None
+        return manifest
+
+    def _source_files(self) -> List[Text]:
+        files = []
+        for pattern in ("**/*.txt", "**/*.md"):
+            files.extend(glob.glob(os.path.join(self.docs_dir, pattern), recursive=True))
+        return sorted(os.path.relpath(path, self.docs_dir) for path in files)
+
+    def load(self) -> Optional[VectorIndex]:
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        vectors = np.load(os.path.join(self.index_dir, manifest["vectors"]), mmap_mode="r")
+        passages = [Passage(*chunk["passage"]) for entry in manifest["files"].values() for chunk in entry["chunks"]]
+        return VectorIndex(passages, vectors, self.embedder)
+
+    def update(self) -> Tuple[VectorIndex, Dict[Text, int]]:
+        """Bring the persisted index in line with `docs_dir` and return it with change counts."""
+        manifest = self._read_manifest()
+        old_files = manifest["files"] if manifest else {}
+        old_vectors = np.load(os.path.join(self.index_dir, manifest["vectors"]), mmap_mode="r") if manifest else None
+        # Any chunk embedded before is reused by content, even if it moved
+        # to another file or position
+        known_rows = {
+            chunk["hash"]: chunk["row"] for entry in old_files.values() for chunk in entry["chunks"]
+        }
+
+        stats = {"files_unchanged": 0, "files_changed": 0, "files_removed": 0,
+                 "chunks_reused": 0, "chunks_embedded": 0}
+        files = {}
+        to_embed: Dict[Text, Text] = {}
+        for relpath in self._source_files():
+            with open(os.path.join(self.docs_dir, relpath), encoding="utf-8") as f:
+                text = f.read()
+            file_hash = content_hash(text)
+            old = old_files.get(relpath)
+            if old and old["hash"] == file_hash:
+                stats["files_unchanged"] += 1
+                files[relpath] = old
+                continue
+            stats["files_changed"] += 1
+            chunks = []
+            for passage in chunk_document(relpath, text, self.max_words):
+                chunk_hash = content_hash(f"{passage.section}\n{passage.text}")
+                if chunk_hash not in known_rows:
+                    to_embed[chunk_hash] = f"{passage.section} {passage.text}"
+                chunks.append({"hash": chunk_hash, "passage": list(passage)})
+            files[relpath] = {"hash": file_hash, "chunks": chunks}
+        stats["files_removed"] = len(set(old_files) - set(files))
+        if manifest and not stats["files_changed"] and not stats["files_removed"]:
+            return self.load(), stats
+
+        new_vectors = {}
+        pending = list(to_embed.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            for (chunk_hash, _), vector in zip(batch, self.embedder.embed([text for _, text in batch])):
+                new_vectors[chunk_hash] = vector
+        stats["chunks_embedded"] = len(new_vectors)
+
+        rows = []
+        for entry in files.values():
+            for chunk in entry["chunks"]:
+                if chunk["hash"] in new_vectors:
+                    rows.append(new_vectors[chunk["hash"]])
+                else:
+                    rows.append(old_vectors[known_rows[chunk["hash"]]])
+                    stats["chunks_reused"] += 1
+                chunk["row"] = len(rows) - 1
+
+        vectors = np.asarray(rows, dtype=np.float32).reshape(len(rows), self.embedder.dim)
+        self._write(manifest, files, vectors)
+        return self.load(), stats
+
+    def _write(self, old_manifest: Optional[Dict[Text, Any]], files: Dict[Text, Any], vectors: np.ndarray) -> None:
+        os.makedirs(self.index_dir, exist_ok=True)
+        generation = (old_manifest["generation"] + 1) if old_manifest else 1
+        vectors_name = f"vectors-{generation}.npy"
+        np.save(os.path.join(self.index_dir, vectors_name), vectors)
+        manifest = {
+            "generation": generation,
+            "embedder": self.embedder.name,
+            "max_words": self.max_words,
+            "vectors": vectors_name,
+            "files": files,
+        }
+        # Readers go through the manifest, so swapping it last makes the new
+        # generation visible atomically
+        tmp_path = os.path.join(self.index_dir, MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self.index_dir, MANIFEST))
+        if old_manifest and old_manifest["vectors"] != vectors_name:
+            try:
+                os.remove(os.path.join(self.index_dir, old_manifest["vectors"]))
+            except OSError:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incrementally (re)build the docs vector index.")
+    parser.add_argument("--docs", default=DOCS_DIR)
+    parser.add_argument("--index", default=INDEX_DIR)
+    args = parser.parse_args()
+    index, stats = IncrementalIndexer(args.docs, args.index).update()
+    print(f"{len(index.passages)} passages indexed: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
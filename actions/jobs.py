@@ -0,0 +1,113 @@
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Text
+import re
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+FACET_FIELDS = ("department", "location")
+
+
+def normalize(text: Text) -> List[Text]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+class JobSearchResult(NamedTuple):
+    jobs: List[Dict[Text, Any]]
+    total: int
+    facets: Dict[Text, Dict[Text, int]]
+
+
+class FieldIndex:
+    """Token -> job-id posting sets for one job field, plus a sorted vocabulary for prefix lookups."""
+
+    def __init__(self):
+        self.postings: Dict[Text, Set[int]] = {}
+        self.vocabulary: List[Text] = []
+
+    def add(self, job_id: int, value: Text) -> None:
+        for token in normalize(value):
+            self.postings.setdefault(token, set()).add(job_id)
+
+    def freeze(self) -> None:
+        self.vocabulary = sorted(self.postings)
+
+    def _prefix_terms(self, prefix: Text) -> List[Text]:
+        terms = []
+        for i in range(bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+            term = self.vocabulary[i]
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def match(self, query: Text, fuzzy: bool = False) -> Set[int]:
+        """Jobs where every query word starts some word of the field.
+
+        With `fuzzy`, a query word that prefixes nothing falls back to the
+        closest vocabulary words (typos such as "enginer").
+        """
+        result: Optional[Set[int]] = None
+        for token in normalize(query):
+            terms = self._prefix_terms(token)
+            if not terms and fuzzy:
+                # difflib is slow to import and only needed for typos
+                import difflib
+
+                terms = difflib.get_close_matches(token, self.vocabulary, n=3, cutoff=0.75)
+            matched: Set[int] = set()
+            for term in terms:
+                matched |= self.postings[term]
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result if result is not None else set()
+
+
+class JobIndex:
+    """Secondary indexes over job openings for filtered, faceted, paged search.
+
+    Built once from the openings list; `HRDatabase` rebuilds it whenever the
+    list changes.
+    """
+
+    def __init__(self, jobs: List[Dict[Text, Any]]):
+        self.jobs = list(jobs)
+        self.fields = {name: FieldIndex() for name in ("title", "department", "location")}
+        for job_id, job in enumerate(self.jobs):
+            for name, index in self.fields.items():
+                index.add(job_id, job.get(name, ""))
+        for index in self.fields.values():
+            index.freeze()
+        self.all_facets = self._facets(range(len(self.jobs)))
+
+    def _facets(self, job_ids) -> Dict[Text, Dict[Text, int]]:
+        return {
+            name: dict(Counter(self.jobs[job_id].get(name, "") for job_id in job_ids).most_common())
+            for name in FACET_FIELDS
+        }
+
+    def search(self, title: Optional[Text] = None, department: Optional[Text] = None,
+               location: Optional[Text] = None, offset: int = 0, limit: Optional[int] = None) -> JobSearchResult:
+        filters = [
+            (self.fields["title"], title, True),
+            (self.fields["department"], department, False),
+            (self.fields["location"], location, False),
+        ]
+        postings = [index.match(value, fuzzy) for index, value, fuzzy in filters if value]
+        if not postings:
+            job_ids = range(len(self.jobs))
+            facets = self.all_facets
+        else:
+            # Intersect smallest-first so the work is bounded by the most
+            # selective filter
+            postings.sort(key=len)
+            matched = set(postings[0])
+            for posting in postings[1:]:
+                matched &= posting
+                if not matched:
+                    break
+            job_ids = sorted(matched)
+            facets = self._facets(job_ids)
+        end = None if limit is None else offset + limit
+        return JobSearchResult([self.jobs[job_id] for job_id in job_ids[offset:end]], len(job_ids), facets)
@@ -0,0 +1,60 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Text
+import json
+import os
+import threading
+
+
+class JsonLinesLog:
+    """Append-only log of JSON records, one per line, shared by the durable stores.
+
+    `replay` feeds every complete record to a callback and cuts off a torn
+    tail left by a crash mid-write. The file is then opened for appending.
+    `write` appends a pre-encoded batch under a lock, so concurrent batches
+    stay whole, and fsyncs it unless `fsync` is off.
+    """
+
+    def __init__(self, path: Text, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._file = None
+        self._lock = threading.Lock()
+
+    def replay(self, apply: Callable[[Dict[Text, Any]], None]) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        valid_length = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            apply(record)
+            valid_length += len(line)
+        if valid_length < len(data):
+            # Drop a torn tail left by a crash mid-write
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_length)
+        self._file = open(self.path, "ab")
+
+    @staticmethod
+    def encode(records: Iterable[Dict[Text, Any]], default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        return b"".join(
+            json.dumps(record, default=default, separators=(",", ":")).encode("utf-8") + b"\n" for record in records
+        )
+
+    def write(self, payload: bytes) -> None:
+        with self._lock:
+            self._file.write(payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
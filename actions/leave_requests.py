@@ -0,0 +1,142 @@
+from typing import Any, Dict, List, Optional, Text, Tuple
+import asyncio
+import datetime
+import hashlib
+import secrets
+import threading
+import time
+
+from .jsonlog import JsonLinesLog
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+class MonotonicULID:
+    """ULID generator (48-bit ms timestamp + 80 random bits, Crockford base32).
+
+    IDs made within the same millisecond increment the random part instead
+    of drawing a new one, so they stay strictly increasing and sortable by
+    creation time within the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self) -> Text:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms <= self._last_ms:
+                now_ms = self._last_ms
+                self._last_random = (self._last_random + 1) & ((1 << 80) - 1)
+                if self._last_random == 0:
+                    now_ms += 1
+            else:
+                self._last_random = secrets.randbits(80)
+            self._last_ms = now_ms
+            value = (now_ms << 80) | self._last_random
+        return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+def leave_days(start_date: Text, end_date: Text) -> Optional[int]:
+    """Inclusive number of days between two ISO dates, or None if they don't parse."""
+    try:
+        start = datetime.date.fromisoformat(str(start_date))
+        end = datetime.date.fromisoformat(str(end_date))
+    except ValueError:
+        return None
+    return (end - start).days + 1 if end >= start else None
+
+
+def idempotency_key(*parts: Any) -> Text:
+    """Stable key for a submission: same sender and slot values, same key."""
+    normalized = "\x1f".join("" if part is None else str(part).strip().lower() for part in parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class LeaveRequestStore:
+    """Leave requests with idempotent submission and a group-committed write-ahead log.
+
+    Every accepted request is appended to the log as one JSON line before
+    `submit` returns. Submissions that arrive while a flush is in progress
+    are written together by the next flush, so a burst costs one `fsync`
+    per batch. Replaying the log on start-up restores both the requests and
+    the idempotency index, so a retried submission is recognised after a
+    restart too. Without a `path` the store is memory-only.
+    """
+
+    def __init__(self, path: Optional[Text] = None, fsync: bool = True):
+        self.path = path
+        self.requests: Dict[Text, Dict[Text, Any]] = {}
+        self.by_key: Dict[Text, Text] = {}
+        self.ids = MonotonicULID()
+        self.flushes = 0
+        self._pending: List[Tuple[Dict[Text, Any], asyncio.Future]] = []
+        self._inflight: Dict[Text, asyncio.Future] = {}
+        self._flushing = False
+        self._log = None
+        if path:
+            self._log = JsonLinesLog(path, fsync)
+            self._log.replay(self._apply)
+
+    def _apply(self, record: Dict[Text, Any]) -> None:
+        self.requests[record["leave_id"]] = record
+        self.by_key[record["idempotency_key"]] = record["leave_id"]
+
+    def get(self, leave_id: Text) -> Optional[Dict[Text, Any]]:
+        return self.requests.get(leave_id)
+
+    async def submit(self, key: Text, **fields: Any) -> Tuple[Dict[Text, Any], bool]:
+        """Store a request unless `key` was seen before; returns the record and whether it was new."""
+        leave_id = self.by_key.get(key)
+        if leave_id is not None:
+            return self.requests[leave_id], False
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight), False
+
+        record = {
+            "leave_id": f"LR{self.ids.new()}",
+            "idempotency_key": key,
+            "status": "submitted",
+            "approval_status": "pending",
+            "submitted_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            **fields,
+        }
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._pending.append((record, future))
+        if not self._flushing:
+            self._flushing = True
+            asyncio.get_running_loop().create_task(self._flush())
+        return await asyncio.shield(future), True
+
+    async def _flush(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    if self._log is not None:
+                        payload = JsonLinesLog.encode(record for record, _ in batch)
+                        await loop.run_in_executor(None, self._log.write, payload)
+                    self.flushes += 1
+                except Exception as exc:
+                    for record, future in batch:
+                        self._inflight.pop(record["idempotency_key"], None)
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+                for record, future in batch:
+                    self._apply(record)
+                    self._inflight.pop(record["idempotency_key"], None)
+                    if not future.done():
+                        future.set_result(record)
+        finally:
+            self._flushing = False
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -0,0 +1,408 @@
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Text, Tuple
+import asyncio
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+
+class Histogram:
+    """Prometheus-style histogram; counts are kept per bucket and cumulated on render."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[Text, int]]:
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets.append((repr(float(bound)), total))
+        buckets.append(("+Inf", total + self.counts[-1]))
+        return buckets
+
+
+class ActionStats:
+    __slots__ = ("latency", "errors", "slot_reads", "events")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.errors = 0
+        self.slot_reads = Histogram(SIZE_BUCKETS)
+        self.events = Histogram(SIZE_BUCKETS)
+
+
+class MethodStats:
+    __slots__ = ("latency", "errors")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.errors = 0
+
+
+class Registry:
+    def __init__(self):
+        self.actions: Dict[Text, ActionStats] = {}
+        self.methods: Dict[Text, MethodStats] = {}
+        # Cache name -> callable returning its stats() dict, or None if not built yet
+        self.caches: Dict[Text, Callable[[], Optional[Dict[Text, Any]]]] = {}
+
+    def register_cache(self, name: Text, stats: Callable[[], Optional[Dict[Text, Any]]]) -> None:
+        self.caches[name] = stats
+
+    def action(self, name: Text) -> ActionStats:
+        stats = self.actions.get(name)
+        if stats is None:
+            stats = self.actions[name] = ActionStats()
+        return stats
+
+    def method(self, name: Text) -> MethodStats:
+        stats = self.methods.get(name)
+        if stats is None:
+            stats = self.methods[name] = MethodStats()
+        return stats
+
+    def reset(self) -> None:
+        self.actions.clear()
+        self.methods.clear()
+
+    def render(self) -> Text:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def histogram(metric, help_text, label, series):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for value, hist in series:
+                for le, count in hist.cumulative():
+                    lines.append(f'{metric}_bucket{{{label}="{value}",le="{le}"}} {count}')
+                lines.append(f'{metric}_sum{{{label}="{value}"}} {hist.sum}')
+                lines.append(f'{metric}_count{{{label}="{value}"}} {hist.count}')
+
+        def counter(metric, help_text, label, series):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for value, count in series:
+                lines.append(f'{metric}{{{label}="{value}"}} {count}')
+
+        actions = sorted(self.actions.items())
+        methods = sorted(self.methods.items())
+        histogram("hr_action_duration_seconds", "Custom action run() latency.", "action",
+                  [(name, stats.latency) for name, stats in actions])
+        counter("hr_action_calls_total", "Custom action calls.", "action",
+                [(name, stats.latency.count) for name, stats in actions])
+        counter("hr_action_errors_total", "Custom action calls that raised.", "action",
+                [(name, stats.errors) for name, stats in actions])
+        histogram("hr_action_slot_reads", "Slots read per action call.", "action",
+                  [(name, stats.slot_reads) for name, stats in actions])
+        histogram("hr_action_events", "Events returned per action call.", "action",
+                  [(name, stats.events) for name, stats in actions])
+        histogram("hr_db_duration_seconds", "HRDatabase method latency.", "method",
+                  [(name, stats.latency) for name, stats in methods])
+        counter("hr_db_calls_total", "HRDatabase method calls.", "method",
+                [(name, stats.latency.count) for name, stats in methods])
+        counter("hr_db_errors_total", "HRDatabase method calls that raised.", "method",
+                [(name, stats.errors) for name, stats in methods])
+        caches = [(name, stats) for name, stats in sorted((name, get()) for name, get in self.caches.items()) if stats]
+        for field in ("hits", "misses", "evictions", "invalidations"):
+            counter(f"hr_cache_{field}_total", f"Cache {field}.", "cache",
+                    [(name, stats[field]) for name, stats in caches])
+        lines.append("# HELP hr_cache_entries Entries currently cached.")
+        lines.append("# TYPE hr_cache_entries gauge")
+        lines.extend(f'hr_cache_entries{{cache="{name}"}} {stats["size"]}' for name, stats in caches)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class SlowCallProfiler:
+    """Sampling profiler that keeps stacks only for the slowest `slowest_pct` percent of calls.
+
+    A daemon thread samples the stacks of threads that are inside an
+    instrumented call every `interval` seconds. When a call finishes, its
+    samples are kept if its latency is above the running percentile of
+    recent calls, and written as folded stacks (`frame;frame;frame count`)
+    that flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, path: Text, slowest_pct: float = 1.0, interval: float = 0.001, window: int = 1000):
+        self.path = path
+        self.slowest_pct = slowest_pct
+        self.interval = interval
+        self.recent = deque(maxlen=window)
+        self.threshold = 0.0
+        self.calls = 0
+        self.folded: Dict[Text, int] = {}
+        self._active: Dict[int, Dict[Text, int]] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name="hr-profiler", daemon=True)
+        self._thread.start()
+
+    def begin(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            call_id = self._next_id
+            self._active[call_id] = {}
+        return call_id
+
+    def end(self, call_id: int, latency: float) -> None:
+        with self._lock:
+            samples = self._active.pop(call_id, {})
+            self.recent.append(latency)
+            self.calls += 1
+            if self.calls % 100 == 0 or not self.threshold:
+                ordered = sorted(self.recent)
+                self.threshold = ordered[min(len(ordered) - 1, int(len(ordered) * (1 - self.slowest_pct / 100)))]
+            if latency >= self.threshold:
+                for stack, count in samples.items():
+                    self.folded[stack] = self.folded.get(stack, 0) + count
+
+    def _sample_loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if not self._active:
+                continue
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == threading.get_ident():
+                    continue
+                stack = []
+                call_id = None
+                while frame is not None:
+                    code = frame.f_code
+                    if call_id is None and code in _WRAPPER_CODES:
+                        call_id = frame.f_locals.get("profile_call")
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if call_id is None:
+                    continue
+                folded = ";".join(reversed(stack))
+                with self._lock:
+                    samples = self._active.get(call_id)
+                    if samples is not None:
+                        samples[folded] = samples.get(folded, 0) + 1
+
+    def dump(self) -> None:
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in sorted(self.folded.items())]
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + ("\n" if lines else ""))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.dump()
+
+
+profiler: Optional[SlowCallProfiler] = None
+
+# Code objects of the action wrappers; the profiler finds the call a stack
+# sample belongs to by looking for these frames
+_WRAPPER_CODES = set()
+
+
+class _SlotCounter:
+    """Stands in for `tracker.get_slot` during a call to count slot reads.
+
+    `attach` shadows the tracker's method with an instance attribute and
+    `detach` puts back whatever was there before, so a tracker handed to
+    several actions (or one action calling another) is left as it was and
+    each call counts only the reads made while it runs.
+    """
+
+    __slots__ = ("get_slot", "reads", "_tracker", "_previous")
+
+    def __init__(self, tracker):
+        self.get_slot = tracker.get_slot
+        self.reads = 0
+        self._tracker = tracker
+        self._previous = vars(tracker).get("get_slot")
+
+    def __call__(self, key):
+        self.reads += 1
+        return self.get_slot(key)
+
+    def attach(self) -> "_SlotCounter":
+        self._tracker.get_slot = self
+        return self
+
+    def detach(self) -> None:
+        if self._previous is None:
+            del self._tracker.get_slot
+        else:
+            self._tracker.get_slot = self._previous
+
+
+def _record_action(stats: ActionStats, start: float, counter: _SlotCounter, events, failed: bool) -> float:
+    latency = time.perf_counter() - start
+    stats.latency.observe(latency)
+    stats.slot_reads.observe(counter.reads)
+    if failed:
+        stats.errors += 1
+    else:
+        stats.events.observe(len(events) if events else 0)
+    return latency
+
+
+def instrument_action(cls: type) -> type:
+    """Wrap `cls.run` (sync or async) to record latency, errors, slot reads and events per action name."""
+    run = cls.run
+
+    if asyncio.iscoroutinefunction(run):
+        @functools.wraps(run)
+        async def wrapper(self, dispatcher, tracker, domain):
+            stats = registry.action(self.name())
+            counter = _SlotCounter(tracker).attach()
+            profile_call = profiler.begin() if profiler else None
+            start = time.perf_counter()
+            events = None
+            failed = True
+            try:
+                events = await run(self, dispatcher, tracker, domain)
+                failed = False
+                return events
+            finally:
+                counter.detach()
+                latency = _record_action(stats, start, counter, events, failed)
+                if profile_call is not None:
+                    profiler.end(profile_call, latency)
+    else:
+        @functools.wraps(run)
+        def wrapper(self, dispatcher, tracker, domain):
+            stats = registry.action(self.name())
+            counter = _SlotCounter(tracker).attach()
+            profile_call = profiler.begin() if profiler else None
+            start = time.perf_counter()
+            events = None
+            failed = True
+            try:
+                events = run(self, dispatcher, tracker, domain)
+                failed = False
+                return events
+            finally:
+                counter.detach()
+                latency = _record_action(stats, start, counter, events, failed)
+                if profile_call is not None:
+                    profiler.end(profile_call, latency)
+
+    _WRAPPER_CODES.add(wrapper.__code__)
+    wrapper._instrumented = True
+    cls.run = wrapper
+    return cls
+
+
+def instrument_actions(classes: Iterable[type]) -> None:
+    for cls in classes:
+        if "run" in vars(cls) and not getattr(cls.run, "_instrumented", False):
+            instrument_action(cls)
+
+
+def _wrap_method(name: Text, fn: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            stats = registry.method(name)
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                stats.latency.observe(time.perf_counter() - start)
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = registry.method(name)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                stats.latency.observe(time.perf_counter() - start)
+    return wrapper
+
+
+def instrument_methods(cls: type) -> type:
+    """Class decorator recording latency and errors for every public method defined on `cls`."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(value) or isinstance(value, (staticmethod, classmethod, type)):
+            continue
+        setattr(cls, attr, _wrap_method(attr, value))
+    return cls
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_exporter(port: int, host: Text = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve `/metrics` from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="hr-metrics", daemon=True).start()
+    return server
+
+
+def write_textfile(path: Text) -> None:
+    """Write the metrics atomically, e.g. for node_exporter's textfile collector."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def start_file_exporter(path: Text, interval: float = 15.0) -> None:
+    def loop():
+        while True:
+            time.sleep(interval)
+            write_textfile(path)
+
+    threading.Thread(target=loop, name="hr-metrics-file", daemon=True).start()
+    atexit.register(write_textfile, path)
+
+
+def configure_from_env() -> None:
+    """Start the exporters and profiler selected by `HR_METRICS_*` / `HR_PROFILE_*` environment variables."""
+    global profiler
+    port = os.environ.get("HR_METRICS_PORT")
+    if port:
+        start_http_exporter(int(port), os.environ.get("HR_METRICS_HOST", "127.0.0.1"))
+    path = os.environ.get("HR_METRICS_FILE")
+    if path:
+        start_file_exporter(path, float(os.environ.get("HR_METRICS_INTERVAL_S", "15")))
+    slowest_pct = os.environ.get("HR_PROFILE_SLOWEST_PCT")
+    if slowest_pct and profiler is None:
+        profiler = SlowCallProfiler(os.environ.get("HR_PROFILE_FILE", "action_stacks.folded"), float(slowest_pct))
+        atexit.register(profiler.stop)
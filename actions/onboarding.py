@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Text
+import threading
+
+ALL_TASKS_COMPLETED = "All tasks completed"
+
+
+class OnboardingSummary(NamedTuple):
+    version: int
+    progress_text: Text
+    next_task: Text
+    has_pending: bool
+
+
+class OnboardingChecklist:
+    """One employee's onboarding tasks as two insertion-ordered sets.
+
+    Completing a task is an O(1) move from `pending` to `progress` under the
+    checklist's own lock, so concurrent updates for the same employee can't
+    both succeed or interleave. Every change bumps `version`, which also
+    invalidates the pre-rendered summary.
+
+    Indexing with "progress"/"pending" returns plain lists, matching the
+    dict shape the onboarding data has always had.
+    """
+
+    __slots__ = ("_progress", "_pending", "_lock", "version", "_summary")
+
+    def __init__(self, progress: Iterable[Text] = (), pending: Iterable[Text] = ()):
+        self._progress: Dict[Text, None] = dict.fromkeys(progress)
+        self._pending: Dict[Text, None] = dict.fromkeys(task for task in pending if task not in self._progress)
+        self._lock = threading.Lock()
+        self.version = 0
+        self._summary: Optional[OnboardingSummary] = None
+
+    @classmethod
+    def coerce(cls, onboarding) -> "OnboardingChecklist":
+        if isinstance(onboarding, cls):
+            return onboarding
+        return cls(onboarding.get("progress", ()), onboarding.get("pending", ()))
+
+    def __getitem__(self, key: Text) -> List[Text]:
+        if key == "progress":
+            return list(self._progress)
+        if key == "pending":
+            return list(self._pending)
+        raise KeyError(key)
+
+    def get(self, key: Text, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def is_pending(self, task: Text) -> bool:
+        return task in self._pending
+
+    def complete(self, task: Text, expected_version: Optional[int] = None) -> bool:
+        """Mark `task` done; fails if it isn't pending or the checklist changed since `expected_version`."""
+        with self._lock:
+            if expected_version is not None and expected_version != self.version:
+                return False
+            if task not in self._pending:
+                return False
+            del self._pending[task]
+            self._progress[task] = None
+            self.version += 1
+            self._summary = None
+            return True
+
+    def summary(self) -> OnboardingSummary:
+        summary = self._summary
+        if summary is not None and summary.version == self.version:
+            return summary
+        with self._lock:
+            completed = ", ".join(self._progress)
+            if self._pending:
+                next_task = next(iter(self._pending))
+                pending = ", ".join(self._pending)
+                progress_text = f"Completed tasks: {completed}\nPending tasks: {pending}\nNext task to focus on: {next_task}"
+            else:
+                next_task = ALL_TASKS_COMPLETED
+                progress_text = f"Congratulations! You have completed all onboarding tasks: {completed}"
+            summary = self._summary = OnboardingSummary(self.version, progress_text, next_task, bool(self._pending))
+        return summary
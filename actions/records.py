@@ -0,0 +1,137 @@
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple
+import sys
+import threading
+
+import numpy as np
+
+from .accrual import LEAVE_TYPES, AccrualEngine, LeaveBalanceView
+from .onboarding import OnboardingChecklist
+
+
+class StringPool:
+    """Interned strings behind small integer codes (departments, managers, task names)."""
+
+    def __init__(self):
+        self.values: List[Text] = []
+        self.codes: Dict[Text, int] = {}
+
+    def code(self, value: Optional[Text]) -> int:
+        value = "" if value is None else value
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+
+class EmployeeTable:
+    """All employees stored column-wise instead of as one dict of dicts each.
+
+    Names are kept in a list. Departments and managers are codes into
+    interned string pools. Leave balances are the `AccrualEngine` columns.
+    Onboarding is a pair of task-ID tuples per employee, and identical tuples
+    are shared. An employee's `OnboardingChecklist` is only materialized the
+    first time their onboarding is read or changed; most employees finished
+    onboarding long ago and never need one.
+    """
+
+    def __init__(self, employees: Dict[Text, Dict[Text, Any]]):
+        employee_ids = list(employees)
+        leave_types = list(LEAVE_TYPES)
+        for employee in employees.values():
+            for leave_type in employee.get("leave_balance", {}):
+                if leave_type not in leave_types:
+                    leave_types.append(leave_type)
+
+        self.departments = StringPool()
+        self.managers = StringPool()
+        self.tasks = StringPool()
+        self._task_tuples: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        self.names: List[Text] = []
+        self.department_codes = array("H")
+        self.manager_codes = array("I")
+        self.progress: List[Tuple[int, ...]] = []
+        self.pending: List[Tuple[int, ...]] = []
+        self.checklists: Dict[int, OnboardingChecklist] = {}
+        self._lock = threading.Lock()
+
+        for employee in employees.values():
+            self.names.append(employee["name"])
+            self.department_codes.append(self.departments.code(employee.get("department")))
+            self.manager_codes.append(self.managers.code(employee.get("manager")))
+            onboarding = employee.get("onboarding") or {}
+            self.progress.append(self._task_tuple(onboarding.get("progress", ())))
+            self.pending.append(self._task_tuple(onboarding.get("pending", ())))
+
+        self.leave = AccrualEngine(employee_ids, {
+            leave_type: np.fromiter(
+                (float(employee.get("leave_balance", {}).get(leave_type, 0)) for employee in employees.values()),
+                dtype=np.float64, count=len(employee_ids),
+            )
+            for leave_type in leave_types
+        })
+        self.rows = self.leave.rows
+
+    def _task_tuple(self, tasks: Iterable[Text]) -> Tuple[int, ...]:
+        ids = tuple(self.tasks.code(task) for task in tasks)
+        return self._task_tuples.setdefault(ids, ids)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, employee_id: Text) -> bool:
+        return employee_id in self.rows
+
+    def view(self, employee_id: Text) -> Optional["EmployeeView"]:
+        row = self.rows.get(employee_id)
+        return EmployeeView(self, row) if row is not None else None
+
+    def checklist(self, row: int) -> OnboardingChecklist:
+        checklist = self.checklists.get(row)
+        if checklist is None:
+            with self._lock:
+                checklist = self.checklists.get(row)
+                if checklist is None:
+                    tasks = self.tasks.values
+                    checklist = self.checklists[row] = OnboardingChecklist(
+                        [tasks[task] for task in self.progress[row]],
+                        [tasks[task] for task in self.pending[row]],
+                    )
+        return checklist
+
+
+class EmployeeView(Mapping):
+    """Read-only, dict-like view of one employee row in an `EmployeeTable`."""
+
+    __slots__ = ("_table", "_row")
+
+    _KEYS = ("name", "department", "manager", "leave_balance", "onboarding")
+
+    def __init__(self, table: EmployeeTable, row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: Text):
+        table, row = self._table, self._row
+        if key == "name":
+            return table.names[row]
+        if key == "department":
+            return table.departments.values[table.department_codes[row]]
+        if key == "manager":
+            return table.managers.values[table.manager_codes[row]]
+        if key == "leave_balance":
+            return LeaveBalanceView(table.leave, row)
+        if key == "onboarding":
+            return table.checklist(row)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return f"EmployeeView({self['name']!r}, department={self['department']!r}, manager={self['manager']!r})"
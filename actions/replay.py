@@ -0,0 +1,306 @@
+"""Record action traffic and replay it offline to catch behaviour and latency regressions.
+
+Recording: with `HR_RECORD_TURNS=/path/turns.jsonl` set, every custom action
+call is appended as one JSON line. The line holds the conversation, the
+action, the slots and `latest_message` it saw, and the events and messages
+it produced.
+
+Replay: rebuilds a `Tracker` per recorded turn and runs the same action in
+process. No Rasa server, LLM or network is involved. Conversations run
+concurrently and each one's turns run in order, either as fast as possible
+or at the recorded pace scaled by `--speed`. Each turn sees the time it was
+recorded at as "now", so dates the actions generate (a payslip's month, an
+expense's default date) come out the same on any day. Emitted events and
+messages are diffed against the recording after masking generated IDs,
+ticket numbers and timestamps. Per-action latency percentiles are written as JSON, so CI can
+compare them with a baseline from another commit:
+
+    python -m actions.replay turns.jsonl --repeat 20 --output replay.json
+    python -m actions.replay turns.jsonl --repeat 20 --baseline main.json --max-regression 0.25
+"""
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple
+import argparse
+import asyncio
+import datetime
+import functools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from rasa_sdk import Tracker
+from rasa_sdk.executor import CollectingDispatcher
+
+from .base import action_clock
+
+# Generated values that legitimately differ between the recording and a replay
+_VOLATILE = (
+    (re.compile(r"\b(LR|EX)[0-9A-HJKMNP-TV-Z]{26}\b"), r"\1<ID>"),
+    (re.compile(r"\bIT-\d{5}\b"), "IT-<N>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:\d{2})?\b"), "<TIMESTAMP>"),
+)
+
+
+def _jsonable(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+class TurnRecorder:
+    """Appends one JSON line per action call; safe to share between threads."""
+
+    def __init__(self, path: Text):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, action: Text, tracker: Tracker, events: Any, messages: List[Dict[Text, Any]], latency: float) -> None:
+        line = json.dumps({
+            "ts": time.time(),
+            "conversation_id": tracker.sender_id,
+            "action": action,
+            "slots": tracker.current_slot_values(),
+            "latest_message": tracker.latest_message,
+            "active_loop": tracker.active_loop,
+            "events": events or [],
+            "messages": messages,
+            "latency_ms": round(latency * 1000, 3),
+        }, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def record_actions(classes: Iterable[type], recorder: TurnRecorder) -> None:
+    """Wrap each class's async `run` so its calls are written to `recorder`."""
+    for cls in classes:
+        run = vars(cls).get("run")
+        if run is None or getattr(run, "_recorded", False) or not asyncio.iscoroutinefunction(run):
+            continue
+
+        def wrap(run):
+            @functools.wraps(run)
+            async def wrapper(self, dispatcher, tracker, domain):
+                start = time.perf_counter()
+                events = await run(self, dispatcher, tracker, domain)
+                recorder.write(self.name(), tracker, events, dispatcher.messages, time.perf_counter() - start)
+                return events
+
+            wrapper._recorded = True
+            return wrapper
+
+        cls.run = wrap(run)
+
+
+def load_turns(path: Text) -> List[Dict[Text, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def normalize(value: Any) -> Any:
+    """`value` with volatile IDs, ticket numbers and timestamps masked."""
+    if isinstance(value, str):
+        for pattern, replacement in _VOLATILE:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items() if key != "timestamp"}
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    return value
+
+
+def make_tracker(turn: Dict[Text, Any]) -> Tracker:
+    return Tracker(
+        sender_id=turn.get("conversation_id", "replay"),
+        slots=dict(turn.get("slots") or {}),
+        latest_message=turn.get("latest_message") or {"text": "", "intent": {}, "entities": []},
+        events=[],
+        paused=False,
+        followup_action=None,
+        active_loop=turn.get("active_loop") or {},
+        latest_action_name=None,
+    )
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Replayer:
+    def __init__(self, actions: Dict[Text, Any], speed: float = 0.0, concurrency: int = 64):
+        self.actions = actions
+        self.speed = speed
+        self.concurrency = concurrency
+        self.latencies: Dict[Text, List[float]] = {}
+        self.mismatches: Dict[Text, int] = {}
+        self.diffs: List[Dict[Text, Any]] = []
+        self.unknown: Dict[Text, int] = {}
+
+    async def _turn(self, turn: Dict[Text, Any], check: bool, measure: bool) -> None:
+        name = turn["action"]
+        action = self.actions.get(name)
+        if action is None:
+            self.unknown[name] = self.unknown.get(name, 0) + 1
+            return
+        dispatcher = CollectingDispatcher()
+        tracker = make_tracker(turn)
+        if "ts" in turn:
+            # Each conversation runs in its own task, so this only affects its turns
+            recorded_at = datetime.datetime.fromtimestamp(turn["ts"])
+            action_clock.set(lambda: recorded_at)
+        start = time.perf_counter()
+        events = await action.run(dispatcher, tracker, {})
+        if measure:
+            self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        if not check:
+            return
+        expected = normalize({"events": turn.get("events", []), "messages": turn.get("messages", [])})
+        actual = normalize(_jsonable({"events": events or [], "messages": dispatcher.messages}))
+        self.mismatches.setdefault(name, 0)
+        if actual != expected:
+            self.mismatches[name] += 1
+            self.diffs.append({"conversation_id": turn.get("conversation_id"), "action": name,
+                               "expected": expected, "actual": actual})
+
+    async def _conversation(self, turns: List[Dict[Text, Any]], started: float, first_ts: float,
+                            semaphore: asyncio.Semaphore, check: bool, measure: bool) -> None:
+        async with semaphore:
+            for turn in turns:
+                if self.speed > 0 and "ts" in turn:
+                    delay = (turn["ts"] - first_ts) / self.speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await self._turn(turn, check, measure)
+
+    async def run(self, turns: List[Dict[Text, Any]], repeat: int = 1, warmup: int = 0) -> None:
+        """Replay all conversations `warmup` + `repeat` times, timing only the last `repeat` passes.
+
+        Only the first pass is diffed against the recording, since state
+        (submitted requests, completed tasks) carries over between passes.
+        """
+        conversations: Dict[Text, List[Dict[Text, Any]]] = {}
+        for turn in turns:
+            conversations.setdefault(turn.get("conversation_id", "replay"), []).append(turn)
+        first_ts = min((turn["ts"] for turn in turns if "ts" in turn), default=0.0)
+        for replay_pass in range(warmup + repeat):
+            semaphore = asyncio.Semaphore(self.speed > 0 and len(conversations) or self.concurrency)
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                self._conversation(conversation, started, first_ts, semaphore, replay_pass == 0, replay_pass >= warmup)
+                for conversation in conversations.values()
+            ))
+
+    def report(self) -> Dict[Text, Any]:
+        actions = {}
+        for name in sorted(self.latencies):
+            ordered = sorted(self.latencies[name])
+            actions[name] = {
+                "calls": len(ordered),
+                "mismatches": self.mismatches.get(name, 0),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+                "max_ms": round(ordered[-1] * 1000, 4),
+            }
+        return {"commit": _git_commit(), "speed": self.speed, "unknown_actions": self.unknown, "actions": actions}
+
+
+def _git_commit() -> Optional[Text]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[Text, Any], baseline: Dict[Text, Any], metric: Text = "p95_ms",
+            max_regression: float = 0.25, min_delta_ms: float = 0.5) -> List[Tuple[Text, float, float]]:
+    """Actions whose `metric` grew by more than `max_regression` (and `min_delta_ms`) over the baseline."""
+    regressions = []
+    for name, stats in report["actions"].items():
+        before = baseline.get("actions", {}).get(name)
+        if before is None:
+            continue
+        old, new = before[metric], stats[metric]
+        if new > old * (1 + max_regression) and new - old > min_delta_ms:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def load_actions() -> Dict[Text, Any]:
+    """Every custom action in `actions.actions`, keyed by its name."""
+    from rasa_sdk import Action
+
+    from . import actions as module
+
+    instances = {}
+    for obj in vars(module).values():
+        if isinstance(obj, type) and issubclass(obj, Action) and obj.__module__ == module.__name__:
+            action = obj()
+            instances[action.name()] = action
+    return instances
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="JSONL file of recorded turns")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="1 replays at the recorded pace, 10 ten times faster; 0 (default) as fast as possible")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the recording this many times for stabler percentiles")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="untimed passes first, so lazily built indexes and imports don't skew latencies")
+    parser.add_argument("--concurrency", type=int, default=64, help="conversations in flight when --speed is 0")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report from another commit to compare against")
+    parser.add_argument("--metric", default="p95_ms", choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed relative increase of --metric")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore increases smaller than this")
+    parser.add_argument("--fail-on-diff", action="store_true", help="exit non-zero if any output differs from the recording")
+    parser.add_argument("--show-diffs", type=int, default=3, help="print this many differing turns")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    replayer = Replayer(load_actions(), speed=args.speed, concurrency=args.concurrency)
+    asyncio.run(replayer.run(load_turns(args.recording), args.repeat, args.warmup))
+    report = replayer.report()
+
+    print(f"{'action':<34}{'calls':>7}{'diffs':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stats in report["actions"].items():
+        print(f"{name:<34}{stats['calls']:>7}{stats['mismatches']:>7}{stats['p50_ms']:>9.3f}"
+              f"{stats['p95_ms']:>9.3f}{stats['p99_ms']:>9.3f}{stats['max_ms']:>9.3f}")
+    for name, count in report["unknown_actions"].items():
+        print(f"skipped {count} turns of unknown action '{name}'")
+    for diff in replayer.diffs[:args.show_diffs]:
+        print(f"\n{diff['action']} ({diff['conversation_id']}) differs:\n  expected {json.dumps(diff['expected'])}"
+              f"\n  actual   {json.dumps(diff['actual'])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.metric, args.max_regression, args.min_delta_ms)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {args.metric} {old:.3f} -> {new:.3f} (baseline {baseline.get('commit')})")
+        failed = bool(regressions)
+    if args.fail_on_diff and replayer.diffs:
+        print(f"{len(replayer.diffs)} turns differ from the recording")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
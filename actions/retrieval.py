@@ -0,0 +1,183 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Text, Tuple
+import glob
+import math
+import os
+import re
+
+import numpy as np
+
+DOCS_DIR = os.environ.get(
+    "HR_POLICY_DOCS", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docs")
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+_NUMBERED_HEADING = re.compile(r"^\d+\.\s+(.*)$")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from get have how i if in into is it its my "
+    "of on or our should so than that the their them there these they this to up us was "
+    "we what when where which who will with you your".split()
+)
+
+
+def tokenize(text: Text) -> List[Text]:
+    """Lowercase word tokens with stopwords dropped and plurals folded."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        token = token.split("'")[0]
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class Passage(NamedTuple):
+    source: Text
+    section: Text
+    text: Text
+
+
+class SearchResult(NamedTuple):
+    score: float
+    passage: Passage
+
+
+def chunk_document(source: Text, text: Text, max_words: int = 80) -> List[Passage]:
+    """Split a policy document into passages along headings and paragraphs.
+
+    Paragraphs under the same heading are merged until `max_words`; the
+    heading is kept on every passage so it still contributes to the score.
+    """
+    passages = []
+    section = ""
+    paragraph: List[Text] = []
+    buffer: List[Text] = []
+
+    def flush_buffer():
+        if buffer:
+            passages.append(Passage(source, section, " ".join(buffer)))
+            buffer.clear()
+
+    def flush_paragraph():
+        if not paragraph:
+            return
+        words = " ".join(paragraph).split()
+        paragraph.clear()
+        if len(buffer) + len(words) > max_words:
+            flush_buffer()
+        for start in range(0, len(words), max_words):
+            buffer.extend(words[start:start + max_words])
+            if len(buffer) >= max_words:
+                flush_buffer()
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = _MARKDOWN_HEADING.match(stripped) or _NUMBERED_HEADING.match(stripped)
+        if heading:
+            flush_paragraph()
+            flush_buffer()
+            section = heading.group(1).strip()
+        elif not stripped:
+            flush_paragraph()
+        else:
+            paragraph.append(stripped)
+    flush_paragraph()
+    flush_buffer()
+    return passages
+
+
+class PolicyIndex:
+    """In-memory BM25 index over policy passages.
+
+    Query terms are only ever matched once, so each posting list stores its
+    final BM25 weights at build time as a pair of arrays. A query is then a
+    handful of vectorized adds into a score array plus a partial sort.
+    """
+
+    def __init__(self, passages: Iterable[Passage], k1: float = 1.2, b: float = 0.75):
+        self.passages: List[Passage] = list(passages)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[Text, Tuple[np.ndarray, np.ndarray]] = {}
+        self._build()
+
+    def _build(self) -> None:
+        term_freqs = []
+        lengths = []
+        for passage in self.passages:
+            tokens = tokenize(f"{passage.section} {passage.text}")
+            counts: Dict[Text, int] = defaultdict(int)
+            for token in tokens:
+                counts[token] += 1
+            term_freqs.append(counts)
+            lengths.append(len(tokens))
+
+        n = len(self.passages)
+        avg_length = (sum(lengths) / n) if n else 0.0
+        doc_freq: Dict[Text, int] = defaultdict(int)
+        for counts in term_freqs:
+            for term in counts:
+                doc_freq[term] += 1
+
+        postings: Dict[Text, List[Tuple[int, float]]] = defaultdict(list)
+        for doc_id, counts in enumerate(term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_id] / avg_length) if avg_length else self.k1
+            for term, tf in counts.items():
+                idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                postings[term].append((doc_id, idf * tf * (self.k1 + 1) / (tf + norm)))
+        self.postings = {
+            term: (np.fromiter((doc_id for doc_id, _ in entries), dtype=np.int32, count=len(entries)),
+                   np.fromiter((weight for _, weight in entries), dtype=np.float32, count=len(entries)))
+            for term, entries in postings.items()
+        }
+
+    @classmethod
+    def from_directory(cls, path: Text = DOCS_DIR, max_words: int = 80) -> "PolicyIndex":
+        passages = []
+        for pattern in ("**/*.txt", "**/*.md"):
+            for file_path in sorted(glob.glob(os.path.join(path, pattern), recursive=True)):
+                with open(file_path, encoding="utf-8") as f:
+                    text = f.read()
+                passages.extend(chunk_document(os.path.relpath(file_path, path), text, max_words))
+        return cls(passages)
+
+    def search(self, query: Text, k: int = 3, min_terms: int = 1) -> List[SearchResult]:
+        """Top `k` passages, keeping only those that contain at least `min_terms`
+        distinct query terms (or all of them, for a shorter query)."""
+        terms = set(tokenize(query))
+        matched = [self.postings[term] for term in terms if term in self.postings]
+        required = min(min_terms, len(terms))
+        if not matched or len(matched) < required:
+            return []
+        if len(matched) == 1:
+            doc_ids, scores = matched[0]
+        else:
+            # Doc IDs are unique within a posting list, so plain fancy-index
+            # adds are safe
+            scores = np.zeros(len(self.passages), dtype=np.float32)
+            hits = np.zeros(len(self.passages), dtype=np.int32)
+            for term_doc_ids, weights in matched:
+                scores[term_doc_ids] += weights
+                hits[term_doc_ids] += 1
+            doc_ids = np.flatnonzero(hits >= max(required, 1))
+            scores = scores[doc_ids]
+            if not len(doc_ids):
+                return []
+        if len(scores) > k:
+            top = np.argpartition(scores, -k)[-k:]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [SearchResult(float(scores[i]), self.passages[doc_ids[i]]) for i in top]
+
+    def best_passage(self, query: Text, min_score: float = 0.0) -> Optional[SearchResult]:
+        results = self.search(query, k=1)
+        if results and results[0].score > min_score:
+            return results[0]
+        return None
@@ -0,0 +1,149 @@
+"""Keyword routing compiled into an Aho-Corasick automaton.
+
+A router finds every keyword of every topic in one left-to-right pass over
+the message, so its cost grows with the message length rather than with
+keywords x message length. The tables live in `keyword_routes.yml` (or the
+file named by `HR_KEYWORD_ROUTES`) and are compiled once per process.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Text, Tuple
+import functools
+import os
+
+ROUTES_PATH = os.environ.get(
+    "HR_KEYWORD_ROUTES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "keyword_routes.yml")
+)
+
+
+class KeywordMatch(NamedTuple):
+    topic: Text
+    keyword: Text
+    start: int
+    end: int
+    priority: int
+
+
+def _is_word_char(char: Text) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _plural_end(text: Text, end: int) -> Optional[int]:
+    """End of `text[:end]` plus a plural "s"/"es" that finishes the word, if there is one."""
+    for suffix in ("s", "es"):
+        stop = end + len(suffix)
+        if text[end:stop].lower() == suffix and (stop == len(text) or not _is_word_char(text[stop])):
+            return stop
+    return None
+
+
+class KeywordRouter:
+    """Matches all topics' keywords at once, respecting word boundaries.
+
+    `routes` maps a topic to `(priority, keywords)`. A keyword also matches
+    its plural ("emails" for "email"). Spans are offsets into the original
+    message, so `text[match.start:match.end]` is what matched.
+    """
+
+    def __init__(self, routes: Dict[Text, Tuple[int, Iterable[Text]]]):
+        # Trie as a list of transition dicts; node 0 is the root
+        self._goto: List[Dict[Text, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Keywords ending at each node, including those reached via fail links
+        self._outputs: List[List[Tuple[Text, Text, int, int]]] = [[]]
+        for topic, (priority, keywords) in routes.items():
+            for keyword in keywords:
+                pattern = " ".join(keyword.lower().split())
+                if pattern:
+                    self._add(pattern, (topic, keyword, len(pattern), priority))
+        self._link()
+
+    def _add(self, pattern: Text, output: Tuple[Text, Text, int, int]) -> None:
+        node = 0
+        for char in pattern:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = child
+        self._outputs[node].append(output)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
+
+    @classmethod
+    def from_table(cls, table: Dict[Text, Dict[Text, object]]) -> "KeywordRouter":
+        return cls({
+            topic: (int(route.get("priority", 0)), route.get("keywords", ()))
+            for topic, route in table.items()
+        })
+
+    def find_all(self, text: Text) -> List[KeywordMatch]:
+        """Every whole-word keyword occurrence in `text`, in order of where it ends."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        # Original index of each character fed to the automaton; lowercasing
+        # can expand a character and runs of whitespace collapse to one space
+        positions: List[int] = []
+        node = 0
+        previous_space = False
+        for index, original in enumerate(text):
+            if original.isspace():
+                if previous_space:
+                    continue
+                previous_space = True
+                lowered = " "
+            else:
+                previous_space = False
+                lowered = original.lower()
+            for char in lowered:
+                positions.append(index)
+                while node and char not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(char, 0)
+                for topic, keyword, length, priority in outputs[node]:
+                    start = positions[len(positions) - length]
+                    end = index + 1
+                    if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                        continue
+                    if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                        end = _plural_end(text, end)
+                        if end is None:
+                            continue
+                    matches.append(KeywordMatch(topic, keyword, start, end, priority))
+        return matches
+
+    def route(self, text: Text) -> Optional[KeywordMatch]:
+        """The winning match: highest priority, then longest, then earliest."""
+        best = None
+        for match in self.find_all(text):
+            if best is None or (match.priority, match.end - match.start, -match.start) > (
+                best.priority, best.end - best.start, -best.start
+            ):
+                best = match
+        return best
+
+
+@functools.lru_cache(maxsize=None)
+def _load_tables(path: Text) -> Dict[Text, Dict[Text, Dict[Text, object]]]:
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+@functools.lru_cache(maxsize=None)
+def router(table: Text, path: Text = ROUTES_PATH) -> KeywordRouter:
+    """The compiled router for one table of the routes file, built on first use."""
+    return KeywordRouter.from_table(_load_tables(path)[table])
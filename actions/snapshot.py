@@ -0,0 +1,424 @@
+"""Immutable, memory-mapped snapshot of the HR data shared by all action-server workers.
+
+The snapshot is one file of fixed-width NumPy record arrays plus a string
+table, all at offsets listed in a small header. Workers `mmap` it read-only
+and index straight into the mapped pages, so every worker shares one copy
+through the page cache and nothing is parsed at start-up. Put the snapshot
+directory on /dev/shm to keep it RAM-backed.
+
+Updates are published as a new generation file. The `CURRENT` pointer is
+then swapped atomically, and workers pick it up on their next check:
+
+    python -m actions.snapshot publish --dir /dev/shm/hr-snapshot
+"""
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .accrual import LEAVE_TYPES
+from .onboarding import OnboardingChecklist
+from .storage import StorageBackend, StorageError
+
+MAGIC = b"HRSNAP01"
+ALIGN = 64
+CURRENT = "CURRENT"
+
+STRING_ID = np.dtype("<u4")
+POLICY_DTYPE = np.dtype([("key", "<u4"), ("text", "<u4")])
+JOB_FIELDS = ("title", "department", "location", "requirements", "deadline")
+JOB_DTYPE = np.dtype([(field, "<u4") for field in JOB_FIELDS])
+DOCUMENT_DTYPE = np.dtype([("role", "<u4"), ("country", "<u4"), ("start", "<u4"), ("count", "<u4")])
+
+
+def employee_dtype(id_width: int, leave_type_count: int) -> np.dtype:
+    return np.dtype([
+        ("id", f"S{id_width}"),
+        ("name", "<u4"),
+        ("department", "<u4"),
+        ("manager", "<u4"),
+        ("balances", "<f8", (leave_type_count,)),
+        ("progress", "<u4"),
+        ("progress_count", "<u2"),
+        ("pending", "<u4"),
+        ("pending_count", "<u2"),
+    ])
+
+
+class _StringTableBuilder:
+    def __init__(self):
+        self.ids: Dict[Text, int] = {}
+        self.encoded: List[bytes] = []
+
+    def add(self, value: Optional[Text]) -> int:
+        value = "" if value is None else value
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.encoded)
+            self.encoded.append(value.encode("utf-8"))
+        return string_id
+
+    def build(self) -> Tuple[np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(self.encoded) + 1, dtype="<u8")
+        np.cumsum([len(data) for data in self.encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(self.encoded), dtype=np.uint8)
+
+
+def write_snapshot(path: Text, employees: Dict[Text, Any], policies: Dict[Text, Text],
+                   job_openings: Iterable[Dict[Text, Any]],
+                   required_documents: Dict[Text, Dict[Text, List[Text]]], generation: int = 1) -> None:
+    """Serialize the HR data into the snapshot layout and atomically move it to `path`."""
+    strings = _StringTableBuilder()
+    leave_types = list(LEAVE_TYPES)
+    for employee in employees.values():
+        for leave_type in employee.get("leave_balance", {}):
+            if leave_type not in leave_types:
+                leave_types.append(leave_type)
+    leave_type_ids = [strings.add(leave_type) for leave_type in leave_types]
+
+    # Sorted by ID so workers can binary-search the mapped array directly
+    employee_ids = sorted(employees)
+    id_width = max((len(employee_id.encode("utf-8")) for employee_id in employee_ids), default=1)
+    records = np.zeros(len(employee_ids), dtype=employee_dtype(id_width, len(leave_types)))
+    task_lists: List[int] = []
+    for row, employee_id in enumerate(employee_ids):
+        employee = employees[employee_id]
+        record = records[row]
+        record["id"] = employee_id.encode("utf-8")
+        record["name"] = strings.add(employee["name"])
+        record["department"] = strings.add(employee.get("department"))
+        record["manager"] = strings.add(employee.get("manager"))
+        balance = employee.get("leave_balance", {})
+        record["balances"] = [float(balance.get(leave_type, 0)) for leave_type in leave_types]
+        onboarding = employee.get("onboarding") or {}
+        for field in ("progress", "pending"):
+            tasks = onboarding.get(field) or []
+            record[field] = len(task_lists)
+            record[f"{field}_count"] = len(tasks)
+            task_lists.extend(strings.add(task) for task in tasks)
+
+    policy_records = np.array([(strings.add(key), strings.add(text)) for key, text in policies.items()], dtype=POLICY_DTYPE)
+    job_records = np.array(
+        [tuple(strings.add(job.get(field)) for field in JOB_FIELDS) for job in job_openings], dtype=JOB_DTYPE
+    )
+    document_lists: List[int] = []
+    document_records = []
+    for role, countries in required_documents.items():
+        for country, documents in countries.items():
+            document_records.append((strings.add(role), strings.add(country), len(document_lists), len(documents)))
+            document_lists.extend(strings.add(document) for document in documents)
+    document_records = np.array(document_records, dtype=DOCUMENT_DTYPE)
+
+    string_offsets, string_blob = strings.build()
+    sections = {
+        "string_offsets": string_offsets,
+        "string_blob": string_blob,
+        "leave_types": np.array(leave_type_ids, dtype=STRING_ID),
+        "employees": records,
+        "task_lists": np.array(task_lists, dtype=STRING_ID),
+        "policies": policy_records,
+        "jobs": job_records,
+        "documents": document_records,
+        "document_lists": np.array(document_lists, dtype=STRING_ID),
+    }
+
+    layout = {}
+    offset = 0
+    for name, array in sections.items():
+        layout[name] = [offset, len(array)]
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header = json.dumps({
+        "generation": generation,
+        "id_width": id_width,
+        "leave_type_count": len(leave_types),
+        "sections": layout,
+    }).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, array in sections.items():
+            f.seek(data_start + layout[name][0])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Snapshot:
+    """A read-only mapping of one snapshot file; arrays are views into the mapped pages."""
+
+    def __init__(self, path: Text):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an HR snapshot")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header = json.loads(self._mmap[len(MAGIC) + 8:len(MAGIC) + 8 + header_length])
+        data_start = -(-(len(MAGIC) + 8 + header_length) // ALIGN) * ALIGN
+        self.generation = header["generation"]
+
+        dtypes = {
+            "string_offsets": np.dtype("<u8"),
+            "string_blob": np.dtype(np.uint8),
+            "leave_types": STRING_ID,
+            "employees": employee_dtype(header["id_width"], header["leave_type_count"]),
+            "task_lists": STRING_ID,
+            "policies": POLICY_DTYPE,
+            "jobs": JOB_DTYPE,
+            "documents": DOCUMENT_DTYPE,
+            "document_lists": STRING_ID,
+        }
+        arrays = {
+            name: np.frombuffer(self._mmap, dtype=dtypes[name], count=count, offset=data_start + offset)
+            for name, (offset, count) in header["sections"].items()
+        }
+        self._string_offsets = arrays["string_offsets"]
+        self._string_blob = arrays["string_blob"]
+        self.employees = arrays["employees"]
+        self._employee_ids = self.employees["id"]
+        self._task_lists = arrays["task_lists"]
+        self._policies = arrays["policies"]
+        self._jobs = arrays["jobs"]
+        self._documents = arrays["documents"]
+        self._document_lists = arrays["document_lists"]
+        self.leave_types = tuple(self.string(string_id) for string_id in arrays["leave_types"])
+
+    def string(self, string_id) -> Text:
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return self._string_blob[start:end].tobytes().decode("utf-8")
+
+    def strings(self, start, count) -> List[Text]:
+        return [self.string(string_id) for string_id in self._task_lists[start:start + count]]
+
+    def __len__(self) -> int:
+        return len(self.employees)
+
+    def find(self, employee_id: Text) -> Optional[int]:
+        key = employee_id.encode("utf-8")
+        row = int(np.searchsorted(self._employee_ids, key))
+        if row < len(self._employee_ids) and self._employee_ids[row] == key:
+            return row
+        return None
+
+    @property
+    def policies(self) -> Dict[Text, Text]:
+        return {self.string(record["key"]): self.string(record["text"]) for record in self._policies}
+
+    @property
+    def job_openings(self) -> "SnapshotJobs":
+        return SnapshotJobs(self)
+
+    @property
+    def required_documents(self) -> Dict[Text, Dict[Text, List[Text]]]:
+        documents: Dict[Text, Dict[Text, List[Text]]] = {}
+        for record in self._documents:
+            documents.setdefault(self.string(record["role"]), {})[self.string(record["country"])] = [
+                self.string(string_id)
+                for string_id in self._document_lists[record["start"]:record["start"] + record["count"]]
+            ]
+        return documents
+
+    def close(self) -> None:
+        # Arrays handed out keep the mapping alive; it is released once
+        # they're gone
+        self.employees = self._employee_ids = None
+
+
+class SnapshotJobs(Sequence):
+    """The snapshot's job openings as a sequence of read-only dict-like records."""
+
+    def __init__(self, snapshot: Snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot._jobs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        record = self._snapshot._jobs[index]
+        return {field: self._snapshot.string(record[field]) for field in JOB_FIELDS}
+
+
+class SnapshotEmployee(Mapping):
+    """Read-only, dict-like view of one employee row in a mapped snapshot."""
+
+    __slots__ = ("_backend", "_snapshot", "_row", "_employee_id")
+
+    _KEYS = ("name", "department", "manager", "leave_balance", "onboarding")
+
+    def __init__(self, backend: "SnapshotBackend", snapshot: Snapshot, row: int, employee_id: Text):
+        self._backend = backend
+        self._snapshot = snapshot
+        self._row = row
+        self._employee_id = employee_id
+
+    def __getitem__(self, key: Text):
+        snapshot = self._snapshot
+        record = snapshot.employees[self._row]
+        if key in ("name", "department", "manager"):
+            return snapshot.string(record[key])
+        if key == "leave_balance":
+            return {
+                leave_type: int(value) if float(value).is_integer() else round(float(value), 2)
+                for leave_type, value in zip(snapshot.leave_types, record["balances"])
+            }
+        if key == "onboarding":
+            return self._backend.checklist(self._employee_id, snapshot, record)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+
+class SnapshotHandle:
+    """Follows the `CURRENT` generation in a snapshot directory.
+
+    `current` re-checks the pointer at most every `check_interval` seconds
+    and swaps in the new mapping with a single reference assignment, so
+    readers always see one complete generation.
+    """
+
+    def __init__(self, directory: Text, check_interval: float = 1.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._pointer: Optional[Text] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _read_pointer(self) -> Text:
+        try:
+            with open(os.path.join(self.directory, CURRENT), encoding="utf-8") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            if self._snapshot is None:
+                raise StorageError(
+                    f"no snapshot published in {self.directory}; run `python -m actions.snapshot publish` first"
+                )
+            raise
+
+    def refresh(self) -> Snapshot:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            pointer = self._read_pointer()
+            if pointer != self._pointer:
+                self._snapshot = Snapshot(os.path.join(self.directory, pointer))
+                self._pointer = pointer
+        return self._snapshot
+
+    @property
+    def current(self) -> Snapshot:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            try:
+                return self.refresh()
+            except OSError:
+                pass
+        return self._snapshot
+
+
+def publish(directory: Text, employees, policies, job_openings, required_documents, keep: int = 2) -> Text:
+    """Write the next generation into `directory` and point `CURRENT` at it."""
+    os.makedirs(directory, exist_ok=True)
+    try:
+        with open(os.path.join(directory, CURRENT), encoding="utf-8") as f:
+            generation = int(f.read().strip().split("-")[1].split(".")[0]) + 1
+    except (OSError, IndexError, ValueError):
+        generation = 1
+    name = f"snapshot-{generation:08d}.hrsnap"
+    write_snapshot(os.path.join(directory, name), employees, policies, job_openings, required_documents, generation)
+    tmp_pointer = os.path.join(directory, CURRENT + ".tmp")
+    with open(tmp_pointer, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp_pointer, os.path.join(directory, CURRENT))
+    # Workers that still map an older generation keep it readable after the
+    # unlink; only its directory entry goes away
+    old = sorted(entry for entry in os.listdir(directory) if entry.startswith("snapshot-") and entry.endswith(".hrsnap"))
+    for entry in old[:-keep]:
+        os.remove(os.path.join(directory, entry))
+    return name
+
+
+class SnapshotBackend(StorageBackend):
+    """Read-mostly backend served from a shared, memory-mapped snapshot.
+
+    Onboarding updates are applied to per-process checklists layered over
+    the snapshot; publish a new generation (or use the SQLite backend) for
+    changes every worker must see. The overlay belongs to one generation,
+    so a newly published one starts from its own checklists.
+    """
+
+    in_process = True
+
+    def __init__(self, handle: SnapshotHandle):
+        self.handle = handle
+        self._checklists: Dict[Tuple[int, Text], OnboardingChecklist] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def checklist(self, employee_id: Text, snapshot: Snapshot, record) -> OnboardingChecklist:
+        key = (snapshot.generation, employee_id)
+        checklist = self._checklists.get(key)
+        if checklist is None:
+            with self._lock:
+                if snapshot.generation > self._generation:
+                    # Drop the overlays of generations that have been replaced
+                    self._generation = snapshot.generation
+                    self._checklists = {k: v for k, v in self._checklists.items() if k[0] >= snapshot.generation}
+                checklist = self._checklists.get(key)
+                if checklist is None:
+                    checklist = self._checklists[key] = OnboardingChecklist(
+                        snapshot.strings(record["progress"], record["progress_count"]),
+                        snapshot.strings(record["pending"], record["pending_count"]),
+                    )
+        return checklist
+
+    def _view(self, snapshot: Snapshot, employee_id: Text) -> Optional[SnapshotEmployee]:
+        row = snapshot.find(employee_id)
+        return SnapshotEmployee(self, snapshot, row, employee_id) if row is not None else None
+
+    async def get_employee(self, employee_id):
+        return self._view(self.handle.current, employee_id)
+
+    async def get_employees(self, employee_ids):
+        snapshot = self.handle.current
+        views = {employee_id: self._view(snapshot, employee_id) for employee_id in employee_ids}
+        return {employee_id: view for employee_id, view in views.items() if view is not None}
+
+    async def update_onboarding_task(self, employee_id, task):
+        employee = await self.get_employee(employee_id)
+        if employee is None:
+            return False
+        return employee["onboarding"].complete(task)
+
+
+def main(argv: Optional[List[Text]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Publish a new HR data snapshot generation.")
+    parser.add_argument("command", choices=["publish"])
+    parser.add_argument("--dir", default=os.environ.get("HR_SNAPSHOT_DIR", "/dev/shm/hr-snapshot"))
+    args = parser.parse_args(argv)
+
+    from .actions import HRDatabase
+
+    seed = HRDatabase(backend=StorageBackend())
+    name = publish(args.dir, seed.employees, seed.policies, seed.job_openings, seed.required_documents)
+    print(f"Published {os.path.join(args.dir, name)}")
+
+
+if __name__ == "__main__":
+    main()
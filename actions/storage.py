@@ -0,0 +1,323 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Text
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+
+from .onboarding import OnboardingChecklist
+
+
+class StorageError(Exception):
+    """Raised when the storage backend cannot serve a request."""
+
+
+class StorageBackend:
+    """Async interface behind `HRDatabase` for employee, balance and onboarding state.
+
+    Records are read like the dicts in `HRDatabase.employees` (name,
+    department, manager, leave_balance, onboarding), so actions don't care
+    which backend is configured.
+    """
+
+    # True when lookups are answered from this process's memory with no
+    # round trip; HRDatabase then calls the backend directly instead of
+    # holding lookups back for a batch window
+    in_process = False
+
+    async def get_employee(self, employee_id: Text) -> Optional[Dict[Text, Any]]:
+        raise NotImplementedError
+
+    async def get_employees(self, employee_ids: List[Text]) -> Dict[Text, Dict[Text, Any]]:
+        """Bulk lookup; unknown IDs are left out of the result."""
+        records = await asyncio.gather(*(self.get_employee(employee_id) for employee_id in employee_ids))
+        return {employee_id: record for employee_id, record in zip(employee_ids, records) if record is not None}
+
+    async def get_leave_balance(self, employee_id: Text) -> Optional[Dict[Text, Any]]:
+        employee = await self.get_employee(employee_id)
+        return employee["leave_balance"] if employee else None
+
+    async def get_onboarding_status(self, employee_id: Text) -> Optional[OnboardingChecklist]:
+        employee = await self.get_employee(employee_id)
+        return employee["onboarding"] if employee else None
+
+    async def update_onboarding_task(self, employee_id: Text, task: Text) -> bool:
+        raise NotImplementedError
+
+    def load_employees(self, employees: Dict[Text, Dict[Text, Any]]) -> None:
+        """Replace every employee with `employees` in one go."""
+        raise StorageError(f"{type(self).__name__} doesn't support bulk replacement")
+
+    def accrual_engine(self):
+        """The columnar leave balances bulk accrual runs on."""
+        raise StorageError(f"{type(self).__name__} doesn't support bulk accrual")
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryBackend(StorageBackend):
+    """Backend over an in-process `EmployeeTable`; the default.
+
+    Records come back as read-only `EmployeeView`s over the table's columns
+    rather than as one dict per employee.
+    """
+
+    in_process = True
+
+    def __init__(self, employees: Dict[Text, Dict[Text, Any]]):
+        self.load_employees(employees)
+
+    def load_employees(self, employees):
+        # Imported here so NumPy is only loaded once a backend is built
+        from .records import EmployeeTable
+
+        self.table = EmployeeTable(employees)
+
+    def accrual_engine(self):
+        return self.table.leave
+
+    async def get_employee(self, employee_id):
+        return self.table.view(employee_id)
+
+    async def get_employees(self, employee_ids):
+        table = self.table
+        return {employee_id: table.view(employee_id) for employee_id in employee_ids if employee_id in table}
+
+    async def update_onboarding_task(self, employee_id, task):
+        row = self.table.rows.get(employee_id)
+        if row is None:
+            return False
+        return self.table.checklist(row).complete(task)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections.
+
+    Connections are opened lazily up to `size`; once all of them are checked
+    out, `connection()` blocks for up to `timeout` seconds before giving up.
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int = 4, timeout: float = 5.0):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.timeout = timeout
+        self._connect = connect
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self):
+        if self._closed:
+            raise StorageError("Connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise StorageError(f"No connection available after {self.timeout}s (pool size {self.size})")
+
+    def _release(self, conn) -> None:
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# Stay below SQLite's default host-parameter limit for `IN (...)` queries
+_MAX_QUERY_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    employee_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    department TEXT,
+    manager TEXT
+);
+CREATE TABLE IF NOT EXISTS leave_balances (
+    employee_id TEXT NOT NULL REFERENCES employees(employee_id),
+    leave_type TEXT NOT NULL,
+    days NUMERIC NOT NULL,
+    PRIMARY KEY (employee_id, leave_type)
+);
+CREATE TABLE IF NOT EXISTS onboarding_tasks (
+    employee_id TEXT NOT NULL REFERENCES employees(employee_id),
+    task TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (employee_id, task)
+);
+"""
+
+
+class SQLiteBackend(StorageBackend):
+    """Reference SQL backend; several action-server processes can share one file.
+
+    Queries run on a small thread pool sized to the connection pool, so the
+    event loop never blocks on disk I/O and never waits for a connection.
+    """
+
+    def __init__(self, path: Text, pool_size: int = 4, seed: Optional[Dict[Text, Dict[Text, Any]]] = None):
+        self.path = path
+        self.pool = ConnectionPool(self._connect, size=pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="hr-sqlite")
+        with self.pool.connection() as conn:
+            conn.executescript(_SCHEMA)
+            if seed:
+                self._seed(conn, seed)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _seed(conn: sqlite3.Connection, employees: Dict[Text, Dict[Text, Any]]) -> None:
+        # Only rows that don't exist yet are inserted, so restarting a worker
+        # never overwrites state another process has already changed.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for employee_id, employee in employees.items():
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO employees VALUES (?, ?, ?, ?)",
+                    (employee_id, employee["name"], employee.get("department"), employee.get("manager")),
+                )
+                if cur.rowcount == 0:
+                    continue
+                conn.executemany(
+                    "INSERT INTO leave_balances VALUES (?, ?, ?)",
+                    [(employee_id, leave_type, days) for leave_type, days in employee.get("leave_balance", {}).items()],
+                )
+                onboarding = employee.get("onboarding", {})
+                tasks = [(task, 1) for task in onboarding.get("progress", [])]
+                tasks += [(task, 0) for task in onboarding.get("pending", [])]
+                conn.executemany(
+                    "INSERT OR IGNORE INTO onboarding_tasks VALUES (?, ?, ?, ?)",
+                    [(employee_id, task, done, seq) for seq, (task, done) in enumerate(tasks)],
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args)
+
+    def _call(self, fn, args):
+        with self.pool.connection() as conn:
+            return fn(conn, *args)
+
+    @staticmethod
+    def _select_employees(conn: sqlite3.Connection, employee_ids: List[Text]) -> Dict[Text, Dict[Text, Any]]:
+        employees = {}
+        for start in range(0, len(employee_ids), _MAX_QUERY_PARAMS):
+            chunk = employee_ids[start:start + _MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            for employee_id, name, department, manager in conn.execute(
+                f"SELECT employee_id, name, department, manager FROM employees WHERE employee_id IN ({placeholders})",
+                chunk,
+            ):
+                employees[employee_id] = {
+                    "name": name,
+                    "department": department,
+                    "manager": manager,
+                    "leave_balance": {},
+                    "onboarding": {"progress": [], "pending": []},
+                }
+            for employee_id, leave_type, days in conn.execute(
+                f"SELECT employee_id, leave_type, days FROM leave_balances WHERE employee_id IN ({placeholders})",
+                chunk,
+            ):
+                employees[employee_id]["leave_balance"][leave_type] = days
+            for employee_id, task, done in conn.execute(
+                f"SELECT employee_id, task, done FROM onboarding_tasks WHERE employee_id IN ({placeholders}) "
+                "ORDER BY employee_id, seq",
+                chunk,
+            ):
+                employees[employee_id]["onboarding"]["progress" if done else "pending"].append(task)
+        for employee in employees.values():
+            employee["onboarding"] = OnboardingChecklist.coerce(employee["onboarding"])
+        return employees
+
+    @staticmethod
+    def _select_leave_balance(conn: sqlite3.Connection, employee_id: Text) -> Optional[Dict[Text, Any]]:
+        balances = conn.execute(
+            "SELECT leave_type, days FROM leave_balances WHERE employee_id = ?", (employee_id,)
+        ).fetchall()
+        return dict(balances) if balances else None
+
+    @staticmethod
+    def _complete_task(conn: sqlite3.Connection, employee_id: Text, task: Text) -> bool:
+        # A single conditional UPDATE, so two workers completing the same
+        # task can't both succeed. Completed tasks move to the end of `seq`
+        # to keep `progress` in completion order.
+        cur = conn.execute(
+            "UPDATE onboarding_tasks SET done = 1, "
+            "seq = (SELECT MAX(seq) + 1 FROM onboarding_tasks WHERE employee_id = ?) "
+            "WHERE employee_id = ? AND task = ? AND done = 0",
+            (employee_id, employee_id, task),
+        )
+        return cur.rowcount == 1
+
+    async def get_employee(self, employee_id):
+        employees = await self._run(self._select_employees, [employee_id])
+        return employees.get(employee_id)
+
+    async def get_employees(self, employee_ids):
+        return await self._run(self._select_employees, list(employee_ids))
+
+    async def get_leave_balance(self, employee_id):
+        return await self._run(self._select_leave_balance, employee_id)
+
+    async def update_onboarding_task(self, employee_id, task):
+        return await self._run(self._complete_task, employee_id, task)
+
+    async def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+
+def backend_from_env(seed: Dict[Text, Dict[Text, Any]]) -> StorageBackend:
+    """Pick the backend from `HR_SNAPSHOT_DIR`, `HR_DB_PATH` / `HR_DB_POOL_SIZE`, falling back to in-memory."""
+    snapshot_dir = os.environ.get("HR_SNAPSHOT_DIR")
+    if snapshot_dir:
+        from .snapshot import SnapshotBackend, SnapshotHandle
+
+        return SnapshotBackend(SnapshotHandle(snapshot_dir, float(os.environ.get("HR_SNAPSHOT_CHECK_S", "1"))))
+    path = os.environ.get("HR_DB_PATH")
+    if not path:
+        return InMemoryBackend(seed)
+    pool_size = int(os.environ.get("HR_DB_POOL_SIZE", "4"))
+    return SQLiteBackend(path, pool_size=pool_size, seed=seed)
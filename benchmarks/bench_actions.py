@@ -0,0 +1,172 @@
+"""Drive the custom actions offline at a given concurrency and report latency, throughput and allocations.
+
+No Rasa server or LLM is involved: each call gets a synthetic `Tracker` and a
+fresh `CollectingDispatcher`, exactly as the action server would pass them.
+
+    python benchmarks/bench_actions.py --employees 40000 --jobs 5000 --concurrency 64 --calls 2000
+    python benchmarks/bench_actions.py --actions job_search policy --calls 500
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rasa_sdk import Tracker  # noqa: E402
+from rasa_sdk.executor import CollectingDispatcher  # noqa: E402
+
+from actions import actions  # noqa: E402
+from synthetic import DEPARTMENTS, LOCATIONS, ONBOARDING_TASKS, ROLES, employee_id, populate  # noqa: E402
+
+POLICY_QUESTIONS = [
+    "How many sick days do I get?",
+    "Can I work from home on Fridays?",
+    "What is the parental leave policy for adoption?",
+    "Do I need a receipt for a $30 lunch?",
+    "How much annual leave can I carry over?",
+    "When do I become eligible for PTO?",
+]
+IT_QUESTIONS = [
+    "How do I set up my email?",
+    "I can't connect to the VPN",
+    "Where do I get the authenticator app?",
+    "My laptop screen is flickering",
+]
+
+
+def make_tracker(slots, text=""):
+    return Tracker(
+        sender_id="bench",
+        slots=slots,
+        latest_message={"text": text, "intent": {}, "entities": []},
+        events=[],
+        paused=False,
+        followup_action=None,
+        active_loop={},
+        latest_action_name=None,
+    )
+
+
+def scenarios(n_employees):
+    """Action plus a function building its tracker for one synthetic call."""
+
+    def some_employee(rng):
+        return employee_id(rng.randrange(n_employees))
+
+    return {
+        "leave_balance": (actions.ActionGetLeaveBalance(), lambda rng: make_tracker({"employee_id": some_employee(rng)})),
+        "leave_submit": (actions.ActionSubmitLeaveRequest(), lambda rng: make_tracker({
+            "employee_id": some_employee(rng),
+            "leave_type": rng.choice(["annual", "sick", "personal"]),
+            "leave_start_date": "2025-04-01",
+            "leave_end_date": "2025-04-03",
+            "leave_reason": "Family trip",
+        })),
+        "policy": (actions.ActionGetPolicyInformation(),
+                   lambda rng: make_tracker({}, text=rng.choice(POLICY_QUESTIONS))),
+        "benefits": (actions.ActionGetBenefitsInformation(), lambda rng: make_tracker({
+            "selected_benefit": rng.choice(["health insurance", "401k", "life insurance", "wellness program", None]),
+        })),
+        "it_support": (actions.ActionITSupport(),
+                       lambda rng: make_tracker({}, text=rng.choice(IT_QUESTIONS))),
+        "job_search": (actions.ActionSearchJobs(), lambda rng: make_tracker({
+            "job_title": rng.choice(ROLES).split()[0],
+            "job_location": rng.choice(LOCATIONS + [None]),
+            "job_department": rng.choice(DEPARTMENTS + [None, None]),
+        })),
+        "onboarding_update": (actions.ActionUpdateOnboardingTask(), lambda rng: make_tracker({
+            "employee_id": some_employee(rng),
+            "onboarding_next_task": rng.choice(ONBOARDING_TASKS),
+        })),
+        "expense_submit": (actions.ActionSubmitExpense(), lambda rng: make_tracker({
+            "employee_id": some_employee(rng),
+            "expense_amount": round(rng.uniform(5, 400), 2),
+            "expense_category": rng.choice(["travel", "meals", "software"]),
+        })),
+    }
+
+
+async def call(action, tracker):
+    dispatcher = CollectingDispatcher()
+    result = action.run(dispatcher, tracker, {})
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(action, make, calls, concurrency, seed):
+    rng = random.Random(seed)
+    trackers = [make(rng) for _ in range(calls)]
+    latencies = []
+    remaining = iter(trackers)
+
+    async def worker():
+        for tracker in remaining:
+            start = time.perf_counter()
+            await call(action, tracker)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+async def measure_allocations(action, make, calls, seed):
+    """Average bytes allocated (traced peak above baseline) and net blocks retained per call."""
+    rng = random.Random(seed)
+    trackers = [make(rng) for _ in range(calls)]
+    tracemalloc.start()
+    peak_total = 0
+    blocks_before = sys.getallocatedblocks()
+    for tracker in trackers:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await call(action, tracker)
+        peak_total += tracemalloc.get_traced_memory()[1] - baseline
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+    return peak_total / calls, (blocks_after - blocks_before) / calls
+
+
+async def main_async(args):
+    populate(actions.hr_db, employees=args.employees, jobs=args.jobs, seed=args.seed)
+    available = scenarios(args.employees)
+    names = args.actions or list(available)
+
+    print(f"{args.employees} employees, {args.jobs} job openings, concurrency {args.concurrency}, {args.calls} calls")
+    print(f"{'action':<20}{'calls/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'alloc B/call':>14}{'blocks/call':>13}")
+    for name in names:
+        action, make = available[name]
+        # Warm caches and lazily built indexes so they don't skew the first percentiles
+        await run_load(action, make, min(args.calls, 50), 1, args.seed + 1)
+        elapsed, latencies = await run_load(action, make, args.calls, args.concurrency, args.seed)
+        alloc_bytes, blocks = await measure_allocations(action, make, args.alloc_calls, args.seed)
+        print(f"{name:<20}{len(latencies) / elapsed:>10.0f}"
+              f"{percentile(latencies, 50) * 1000:>9.3f}{percentile(latencies, 95) * 1000:>9.3f}"
+              f"{percentile(latencies, 99) * 1000:>9.3f}{alloc_bytes:>14.0f}{blocks:>13.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--alloc-calls", type=int, default=200, help="calls traced for allocation stats")
+    parser.add_argument("--actions", nargs="*", choices=sorted(scenarios(1)), help="subset of actions to run")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Backend queries and lookup latency with and without employee lookup batching.
+
+Simulates a payday spike: `--conversations` lookups arrive over `--spread-ms`
+against a backend with a fixed round-trip time and a bounded connection pool.
+
+    python benchmarks/bench_batching.py --conversations 2000 --window-ms 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from actions.batching import BatchLoader  # noqa: E402
+from actions.storage import StorageBackend  # noqa: E402
+
+
+class SimulatedBackend(StorageBackend):
+    def __init__(self, employees, rtt, per_row, pool_size):
+        self.employees = employees
+        self.rtt = rtt
+        self.per_row = per_row
+        self.pool = asyncio.Semaphore(pool_size)
+        self.queries = 0
+
+    async def _query(self, rows):
+        async with self.pool:
+            self.queries += 1
+            await asyncio.sleep(self.rtt + self.per_row * rows)
+
+    async def get_employee(self, employee_id):
+        await self._query(1)
+        return self.employees.get(employee_id)
+
+    async def get_employees(self, employee_ids):
+        await self._query(len(employee_ids))
+        return {employee_id: self.employees[employee_id] for employee_id in employee_ids if employee_id in self.employees}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args, batched):
+    employees = {f"EMP{i:06d}": {"name": f"Employee {i}"} for i in range(args.employees)}
+    backend = SimulatedBackend(employees, args.rtt_ms / 1000, args.per_row_us / 1e6, args.pool_size)
+    loader = BatchLoader(backend.get_employees, window=args.window_ms / 1000)
+    lookup = loader.load if batched else backend.get_employee
+    rng = random.Random(42)
+    # Skewed IDs: a few people look themselves up repeatedly
+    ids = [f"EMP{min(int(rng.paretovariate(1.2)) - 1, args.employees - 1):06d}" for _ in range(args.conversations)]
+    latencies = []
+
+    async def conversation(employee_id, delay):
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        await lookup(employee_id)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        conversation(employee_id, rng.uniform(0, args.spread_ms / 1000)) for employee_id in ids
+    ))
+    elapsed = time.perf_counter() - start
+    return {
+        "queries": backend.queries,
+        "qps": backend.queries / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--employees", type=int, default=40000)
+    parser.add_argument("--spread-ms", type=float, default=200, help="window the lookups arrive in")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="backend round trip per query")
+    parser.add_argument("--per-row-us", type=float, default=5.0, help="extra backend cost per returned row")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--window-ms", type=float, default=2.0, help="batching window")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'queries':>10}{'backend qps':>14}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, batched in (("direct", False), ("batched", True)):
+        result = asyncio.run(run(args, batched))
+        print(f"{mode:<10}{result['queries']:>10}{result['qps']:>14.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
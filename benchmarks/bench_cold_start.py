@@ -0,0 +1,111 @@
+"""Cold start: import time of the actions package and time to the first action response.
+
+Every sample is a fresh interpreter, as when a new action server pod starts.
+`rasa_sdk` is imported (and timed) first because the action server has
+always loaded it before it imports the actions package.
+
+    python benchmarks/bench_cold_start.py --runs 5
+    python benchmarks/bench_cold_start.py --employees 100000 --modes default snapshot
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ("default", "warm_up", "snapshot")
+
+
+def child(employee_id):
+    start = time.perf_counter()
+    import rasa_sdk.executor  # noqa: F401
+    rasa_done = time.perf_counter()
+    from actions import actions
+    import_done = time.perf_counter()
+
+    import asyncio
+    from bench_actions import make_tracker
+    from rasa_sdk.executor import CollectingDispatcher
+
+    if os.environ.get("HR_WARM_UP"):
+        # Give the warm-up thread the time a server would spend binding its port
+        time.sleep(0.05)
+    ready = time.perf_counter()
+
+    async def respond():
+        return await actions.ActionGetLeaveBalance().run(
+            CollectingDispatcher(), make_tracker({"employee_id": employee_id}), {}
+        )
+
+    asyncio.run(respond())
+    first = time.perf_counter() - ready
+    second_start = time.perf_counter()
+    asyncio.run(respond())
+    second = time.perf_counter() - second_start
+    print(json.dumps({
+        "rasa_sdk": rasa_done - start,
+        "import": import_done - rasa_done,
+        "first": first,
+        "second": second,
+    }))
+
+
+def sample(mode, employee_id, snapshot_dir, runs):
+    env = {key: value for key, value in os.environ.items() if not key.startswith("HR_")}
+    if mode == "warm_up":
+        env["HR_WARM_UP"] = "1"
+    elif mode == "snapshot":
+        env["HR_SNAPSHOT_DIR"] = snapshot_dir
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", employee_id],
+            env=env, cwd=ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--employees", type=int, default=0,
+                        help="publish this many synthetic employees for the snapshot mode instead of the sample data")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    snapshot_dir = tempfile.mkdtemp(prefix="hr-snapshot-")
+    employee_id = "EMP001"
+    if "snapshot" in args.modes:
+        from actions.actions import HRDatabase
+        from actions.snapshot import publish
+        from actions.storage import StorageBackend
+        from synthetic import employee_id as synthetic_id, generate_employees
+
+        seed = HRDatabase(backend=StorageBackend())
+        employees = seed.employees
+        if args.employees:
+            employees = generate_employees(args.employees)
+            employee_id = synthetic_id(0)
+        publish(snapshot_dir, employees, seed.policies, seed.job_openings, seed.required_documents)
+
+    print(f"{'mode':>10}{'rasa_sdk ms':>13}{'import ms':>11}{'first ms':>10}{'second ms':>11}")
+    for mode in args.modes:
+        result = sample(mode, employee_id if mode == "snapshot" else "EMP001", snapshot_dir, args.runs)
+        print(f"{mode:>10}{result['rasa_sdk'] * 1000:>13.1f}{result['import'] * 1000:>11.1f}"
+              f"{result['first'] * 1000:>10.2f}{result['second'] * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
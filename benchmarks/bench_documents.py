@@ -0,0 +1,91 @@
+"""Onboarding-wave document verification: throughput and memory.
+
+Writes synthetic uploads for `--hires` new hires (a few documents each, up
+to `--max-mb` in size), verifies them all in one `refresh`, then prints
+throughput, the main process's peak traced memory and how many hires have
+complete documents.
+
+    python benchmarks/bench_documents.py --hires 300 --max-mb 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from actions.actions import HRDatabase  # noqa: E402
+from actions.documents import DocumentPipeline  # noqa: E402
+from actions.storage import StorageBackend  # noqa: E402
+from synthetic import employee_id  # noqa: E402
+
+FORMATS = {
+    "pdf": (b"%PDF-1.7\n", b"\n%%EOF\n"),
+    "jpg": (b"\xff\xd8\xff\xe0", b"\xff\xd9"),
+    "png": (b"\x89PNG\r\n\x1a\n", b"IEND\xaeB`\x82"),
+}
+
+
+def write_uploads(root, hires, required_documents, max_bytes, seed=0):
+    rng = random.Random(seed)
+    wave = []
+    total = 0
+    for i in range(hires):
+        hire = employee_id(i)
+        role = rng.choice(list(required_documents))
+        country = rng.choice(list(required_documents[role]))
+        wave.append((hire, role, country))
+        folder = os.path.join(root, hire)
+        os.makedirs(folder)
+        for document in required_documents[role][country]:
+            if rng.random() < 0.1:
+                continue  # not uploaded yet
+            extension = rng.choice(list(FORMATS))
+            head, trailer = FORMATS[extension]
+            size = int(rng.triangular(20_000, max_bytes, 200_000))
+            with open(os.path.join(folder, f"{document.split(' (')[0]}.{extension}"), "wb") as f:
+                f.write(head)
+                f.write(os.urandom(size))
+                if rng.random() > 0.03:
+                    f.write(trailer)  # the rest are truncated uploads
+            total += size
+    return wave, total
+
+
+async def run(args):
+    required_documents = HRDatabase(backend=StorageBackend()).required_documents
+    root = tempfile.mkdtemp(prefix="hr-uploads-")
+    try:
+        wave, total = write_uploads(root, args.hires, required_documents, int(args.max_mb * 1024 * 1024))
+        pipeline = DocumentPipeline(required_documents, uploads_dir=root)
+        tracemalloc.start()
+        start = time.perf_counter()
+        records = await pipeline.refresh(hire for hire, _, _ in wave)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rejected = sum(not record.accepted for record in records)
+        complete = sum(pipeline.completeness(hire, role, country).complete for hire, role, country in wave)
+        print(f"{len(records)} uploads ({total / 2**20:.0f} MiB) from {args.hires} hires in {elapsed:.2f}s "
+              f"({total / 2**20 / elapsed:.0f} MiB/s), {rejected} rejected")
+        print(f"peak traced memory in the event-loop process: {peak / 2**20:.1f} MiB")
+        print(f"{complete}/{args.hires} hires have every required document")
+    finally:
+        shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hires", type=int, default=300)
+    parser.add_argument("--max-mb", type=float, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Bulk expense ingest throughput and manager queue reads.
+
+Streams a synthetic card feed through `HRDatabase.ingest_expenses`, then
+times reading every manager's pending list and total.
+
+    python benchmarks/bench_expenses.py --employees 20000 --claims 200000
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from actions.actions import HRDatabase  # noqa: E402
+from actions.storage import InMemoryBackend  # noqa: E402
+from synthetic import employee_id, generate_employees  # noqa: E402
+
+CATEGORIES = ["travel", "meals", "software", "office supplies", "training"]
+
+
+def card_feed(n, n_employees, today, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "external_id": f"TXN{i:08d}",
+            "employee_id": employee_id(rng.randrange(n_employees)),
+            "amount": f"{rng.lognormvariate(3.5, 1.0):.2f}",
+            "category": rng.choice(CATEGORIES),
+            "date": (today - datetime.timedelta(days=rng.randint(0, 35))).isoformat(),
+            "receipt": rng.random() < 0.9,
+        }
+
+
+async def run(args):
+    hr_db = HRDatabase(backend=InMemoryBackend(generate_employees(args.employees)))
+    today = datetime.date.today()
+
+    start = time.perf_counter()
+    report = await hr_db.ingest_expenses(card_feed(args.claims, args.employees, today), today)
+    elapsed = time.perf_counter() - start
+    print(f"ingested {args.claims} claims in {elapsed:.2f}s ({args.claims / elapsed:,.0f} claims/s): "
+          f"{report.accepted} accepted, {len(report.rejected)} rejected, ${report.total:,} accepted total")
+
+    start = time.perf_counter()
+    again = await hr_db.ingest_expenses(card_feed(args.claims, args.employees, today), today)
+    print(f"re-import of the same feed: {again.duplicates} duplicates skipped in {time.perf_counter() - start:.2f}s")
+
+    managers = list(hr_db.expenses.queues)
+    start = time.perf_counter()
+    for manager in managers:
+        pending, (count, total) = hr_db.pending_expenses(manager)
+    per_read = (time.perf_counter() - start) / len(managers)
+    pending = sum(len(queue) for queue in hr_db.expenses.queues.values())
+    print(f"{len(managers)} manager queues, {pending} pending claims, {per_read * 1e6:.2f} us per pending list + total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--claims", type=int, default=200000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Bytes per employee: nested dict records vs. the column-wise `EmployeeTable`.
+
+    python benchmarks/bench_memory.py --sizes 10000 100000 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from actions.records import EmployeeTable  # noqa: E402
+from synthetic import generate_employees  # noqa: E402
+
+
+def measure(n):
+    gc.collect()
+    tracemalloc.start()
+    employees = generate_employees(n)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    table = EmployeeTable(employees)
+    del employees
+    gc.collect()
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(table) == n
+    return dict_bytes / n, table_bytes / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'employees':>10}{'dict B/emp':>12}{'table B/emp':>13}{'saving':>9}")
+    for n in args.sizes:
+        before, after = measure(n)
+        print(f"{n:>10}{before:>12.0f}{after:>13.0f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
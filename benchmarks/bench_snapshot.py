@@ -0,0 +1,86 @@
+"""Per-worker memory: building the employee table in every process vs. attaching a shared snapshot.
+
+Each worker process loads the data, serves random lookups, and reports its
+private (unshared) memory from /proc/self/smaps_rollup, so this is Linux only.
+
+    python benchmarks/bench_snapshot.py --employees 200000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from actions.records import EmployeeTable  # noqa: E402
+from actions.snapshot import SnapshotHandle, publish  # noqa: E402
+from synthetic import employee_id, generate_employees  # noqa: E402
+
+
+def private_kib():
+    with open("/proc/self/smaps_rollup") as f:
+        return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean", "Private_Dirty")))
+
+
+def lookups(get, n, count=20000):
+    rng = random.Random(os.getpid())
+    for _ in range(count):
+        assert get(employee_id(rng.randrange(n)))["name"]
+
+
+def table_worker(n, results):
+    before = private_kib()
+    start = time.perf_counter()
+    table = EmployeeTable(generate_employees(n))
+    ready = time.perf_counter() - start
+    lookups(table.view, n)
+    results.put((ready, private_kib() - before))
+
+
+def snapshot_worker(directory, n, results):
+    before = private_kib()
+    start = time.perf_counter()
+    snapshot = SnapshotHandle(directory).current
+    ready = time.perf_counter() - start
+    lookups(lambda key: {"name": snapshot.string(snapshot.employees[snapshot.find(key)]["name"])}, n)
+    results.put((ready, private_kib() - before))
+
+
+def run(target, args, workers):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=target, args=args + (results,)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return max(ready for ready, _ in samples), sum(kib for _, kib in samples) / len(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("fork")
+    directory = tempfile.mkdtemp(prefix="hr-snapshot-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    start = time.perf_counter()
+    publish(directory, generate_employees(args.employees), {}, [], {})
+    print(f"published {args.employees} employees in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'mode':>10}{'startup s':>11}{'private MiB/worker':>20}")
+    for mode, target, target_args in (
+        ("table", table_worker, (args.employees,)),
+        ("snapshot", snapshot_worker, (directory, args.employees)),
+    ):
+        ready, kib = run(target, target_args, args.workers)
+        print(f"{mode:>10}{ready:>11.3f}{kib / 1024:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
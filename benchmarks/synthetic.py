@@ -0,0 +1,64 @@
+"""Synthetic HR data for scaling `HRDatabase` beyond the two sample employees."""
+import random
+
+DEPARTMENTS = ["Engineering", "Marketing", "Human Resources", "Finance", "Sales", "Operations", "Legal", "Support"]
+LOCATIONS = ["New York", "Chicago", "Remote", "San Francisco", "Austin", "London", "Bangalore", "Berlin"]
+FIRST_NAMES = ["Sarah", "Michael", "Priya", "James", "Aisha", "Wei", "Carlos", "Emma", "Noah", "Fatima", "Liam", "Yuki"]
+LAST_NAMES = ["Johnson", "Brown", "Patel", "Smith", "Khan", "Chen", "Garcia", "Muller", "Lee", "Okafor", "Rossi", "Sato"]
+SENIORITY = ["Junior", "", "Senior", "Staff", "Principal", "Lead"]
+ROLES = ["Software Engineer", "Data Analyst", "Marketing Specialist", "HR Coordinator", "Account Executive",
+         "Product Manager", "Designer", "Support Engineer", "Financial Analyst", "Recruiter"]
+ONBOARDING_TASKS = ["Welcome email received", "IT accounts created", "Complete tax forms", "Enroll in benefits",
+                    "Complete security training", "Meet your buddy", "Set up payroll", "Read the handbook"]
+
+
+def employee_id(i):
+    return f"EMP{i + 1:06d}"
+
+
+def make_employee(rng, managers):
+    done = rng.randint(0, len(ONBOARDING_TASKS))
+    return {
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "department": rng.choice(DEPARTMENTS),
+        "manager": rng.choice(managers),
+        "leave_balance": {
+            "annual": rng.randint(0, 30),
+            "sick": rng.randint(0, 10),
+            "personal": rng.randint(0, 5),
+        },
+        "onboarding": {
+            "progress": ONBOARDING_TASKS[:done],
+            "pending": ONBOARDING_TASKS[done:],
+        },
+    }
+
+
+def make_job(rng, i):
+    title = " ".join(part for part in (rng.choice(SENIORITY), rng.choice(ROLES)) if part)
+    return {
+        "title": title,
+        "department": rng.choice(DEPARTMENTS),
+        "location": rng.choice(LOCATIONS),
+        "requirements": f"{rng.randint(1, 10)}+ years of relevant experience",
+        "deadline": f"May {rng.randint(1, 28)}, 2025",
+        "requisition_id": f"REQ{i + 1:06d}",
+    }
+
+
+def generate_employees(n, seed=0):
+    rng = random.Random(seed)
+    managers = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(max(1, n // 8))]
+    return {employee_id(i): make_employee(rng, managers) for i in range(n)}
+
+
+def generate_jobs(m, seed=0):
+    rng = random.Random(seed + 1)
+    return [make_job(rng, i) for i in range(m)]
+
+
+def populate(hr_db, employees=1000, jobs=100, seed=0):
+    """Replace the sample data in an `HRDatabase` with `employees`/`jobs` synthetic records."""
+    hr_db.load_employees(generate_employees(employees, seed))
+    hr_db.load_job_openings(generate_jobs(jobs, seed))
+    return hr_db
@@ -0,0 +1,182 @@
+import asyncio
+import os
+
+import pytest
+
+from actions.answer_cache import AnswerCache, AnswerGenerator, DocVersions, query_signature
+from actions.retrieval import PolicyIndex
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubGenerator(AnswerGenerator):
+    """Stands in for an LLM: records the questions it was asked."""
+
+    def __init__(self):
+        self.questions = []
+
+    async def generate(self, question, results):
+        self.questions.append(question)
+        return f"answer {len(self.questions)} from {results[0].passage.source}"
+
+
+@pytest.fixture
+def docs(tmp_path):
+    (tmp_path / "leave.txt").write_text("Leave\n\nSick leave is 10 days per year.", encoding="utf-8")
+    (tmp_path / "expenses.txt").write_text("Expenses\n\nReceipts are required over 25 dollars.", encoding="utf-8")
+    return tmp_path
+
+
+def make_cache(docs, clock, **kwargs):
+    return AnswerCache(versions=DocVersions(str(docs), check_interval=1.0, clock=clock), **kwargs)
+
+
+def touch(path, text):
+    path.write_text(text, encoding="utf-8")
+    # Make the edit visible even on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_signature_ignores_case_punctuation_stopwords_and_order():
+    assert query_signature("How many SICK days do I get?") == query_signature("sick days: how many get")
+    assert query_signature("the of and") == frozenset()
+
+
+def test_hit_near_hit_and_miss(docs):
+    cache = make_cache(docs, Clock(), similarity=0.6)
+    cache.set("how many sick days do I get", "ten", ["leave.txt"])
+
+    assert cache.get("Sick days - how many do I get?") == "ten"
+    assert cache.get("how many sick days do I get each year") == "ten"
+    assert cache.get("receipt needed for lunch") is None
+    assert (cache.hits, cache.near_hits, cache.misses) == (2, 1, 1)
+
+
+def test_stopword_only_questions_are_not_cached(docs):
+    cache = make_cache(docs, Clock())
+    assert cache.set("what is it?", "anything", ["leave.txt"]) is False
+    assert len(cache) == 0
+
+
+def test_lru_eviction(docs):
+    cache = make_cache(docs, Clock(), maxsize=2, similarity=1.0)
+    cache.set("sick days", "a", ["leave.txt"])
+    cache.set("receipt rules", "b", ["expenses.txt"])
+    cache.get("sick days")
+    cache.set("remote work", "c", ["leave.txt"])
+
+    assert cache.get("receipt rules") is None
+    assert cache.get("sick days") == "a"
+    assert cache.evictions == 1
+
+
+def test_editing_a_document_drops_only_its_answers(docs):
+    clock = Clock()
+    changed = []
+    cache = make_cache(docs, clock, similarity=1.0, on_docs_changed=lambda: changed.append(True))
+    cache.set("sick days", "ten", ["leave.txt"])
+    cache.set("receipt rules", "over 25", ["expenses.txt"])
+
+    touch(docs / "leave.txt", "Leave\n\nSick leave is 12 days per year.")
+    # Not re-scanned until the check interval has passed
+    assert cache.get("sick days") == "ten"
+    clock.now = 2.0
+
+    assert cache.get("sick days") is None
+    assert cache.get("receipt rules") == "over 25"
+    assert cache.invalidations == 1
+    assert changed == [True]
+
+
+def test_removing_a_document_drops_its_answers(docs):
+    clock = Clock()
+    cache = make_cache(docs, clock, similarity=1.0)
+    cache.set("receipt rules", "over 25", ["expenses.txt"])
+    cache.set("sick days", "ten", ["leave.txt"])
+
+    (docs / "expenses.txt").unlink()
+    clock.now = 2.0
+    assert cache.get("receipt rules") is None
+    assert cache.get("sick days") == "ten"
+
+
+def test_adding_a_document_clears_everything(docs):
+    clock = Clock()
+    cache = make_cache(docs, clock, similarity=1.0)
+    cache.set("sick days", "ten", ["leave.txt"])
+
+    (docs / "new.md").write_text("Sick days\n\nNew sick day policy.", encoding="utf-8")
+    clock.now = 2.0
+    assert cache.get("sick days") is None
+    assert len(cache) == 0
+
+
+def test_answer_shared_by_two_documents_is_dropped_when_either_changes(docs):
+    clock = Clock()
+    cache = make_cache(docs, clock, similarity=1.0)
+    cache.set("sick receipts", "both", ["leave.txt", "expenses.txt"])
+
+    touch(docs / "expenses.txt", "Expenses\n\nReceipts are required over 30 dollars.")
+    clock.now = 2.0
+    assert cache.get("sick receipts") is None
+    # Both indexes forget the entry, so a new answer can be stored cleanly
+    assert cache.invalidate_source("leave.txt") == 0
+
+
+def test_generator_runs_once_per_distinct_question(docs):
+    cache = make_cache(docs, Clock(), similarity=1.0)
+    generator = StubGenerator()
+    index = PolicyIndex.from_directory(str(docs))
+
+    def answer(question):
+        cached = cache.get(question)
+        if cached is not None:
+            return cached
+        results = index.search(question)
+        text = asyncio.run(generator.generate(question, results))
+        cache.set(question, text, {result.passage.source for result in results})
+        return text
+
+    assert answer("How many sick leave days?") == "answer 1 from leave.txt"
+    assert answer("sick leave days, how many") == "answer 1 from leave.txt"
+    assert generator.questions == ["How many sick leave days?"]
+
+
+def test_slow_generator_does_not_block_other_turns(monkeypatch):
+    from actions.actions import HRDatabase
+
+    class SlowGenerator(AnswerGenerator):
+        async def generate(self, question, results):
+            await asyncio.sleep(0.05)
+            return "generated"
+
+    monkeypatch.delenv("HR_SNAPSHOT_DIR", raising=False)
+    db = HRDatabase()
+    db.answer_generator = SlowGenerator()
+
+    async def run():
+        ticks = 0
+
+        async def other_turn():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(other_turn())
+        answer = await db.get_policy("how many sick days roll over to the following year")
+        ticker.cancel()
+        # Served from the cache the second time, without generating again
+        assert await db.get_policy("sick days roll over following year how many") == answer
+        return answer, ticks
+
+    answer, ticks = asyncio.run(run())
+    assert answer == "generated"
+    assert ticks >= 5
@@ -0,0 +1,151 @@
+import os
+
+import pytest
+import yaml
+
+from actions.content import CONTENT_PATH, ContentError, ContentRegistry, Template, load_content, parse_content
+
+
+@pytest.fixture
+def raw():
+    with open(CONTENT_PATH, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write(path, raw, mtime):
+    path.write_text(yaml.safe_dump(raw), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_shipped_content_is_valid():
+    content = load_content(CONTENT_PATH)
+    assert content.template("it_ticket").render(ticket=1234).endswith("IT-1234.")
+    assert content.benefit("401K") == content.benefits["401k"]
+    assert content.policy("Remote Work").startswith("Employees may work remotely")
+    assert content.policy("leave") == content.policies["sick leave"]
+    assert content.benefit(None) is None
+
+
+def test_constant_template_returns_the_same_string():
+    template = Template("job_apply", "Apply online.")
+    assert template.render() is template.render_map({}) is template.text
+
+
+def test_braces_can_be_escaped():
+    assert Template("t", "{{literal}} {name}").render(name="x") == "{literal} x"
+
+
+def test_missing_section(raw):
+    del raw["it_support"]
+    with pytest.raises(ContentError, match="it_support"):
+        parse_content(raw)
+
+
+def test_missing_template(raw):
+    del raw["templates"]["job_none"]
+    with pytest.raises(ContentError, match="missing template 'job_none'"):
+        parse_content(raw)
+
+
+def test_unknown_field(raw):
+    raw["templates"]["it_ticket"] = "Ticket {ticket} for {employee}"
+    with pytest.raises(ContentError, match="unknown field.*employee"):
+        parse_content(raw)
+
+
+@pytest.mark.parametrize("text", ["{0}", "{}", "{user.name}", "{items[0]}", "unclosed {brace"])
+def test_malformed_placeholders(text):
+    with pytest.raises(ContentError):
+        Template("t", text)
+
+
+def test_values_must_be_text(raw):
+    raw["benefits"]["401k"] = 4
+    with pytest.raises(ContentError, match="401k"):
+        parse_content(raw)
+    with pytest.raises(ContentError):
+        parse_content(["not", "a", "mapping"])
+
+
+def test_content_is_read_only(raw):
+    content = parse_content(raw)
+    with pytest.raises(TypeError):
+        content.benefits["new"] = "text"
+
+
+def test_invalid_yaml(tmp_path):
+    path = tmp_path / "content.yml"
+    path.write_text("benefits: [unclosed\n", encoding="utf-8")
+    with pytest.raises(ContentError, match="not valid YAML"):
+        load_content(str(path))
+
+
+def test_registry_swaps_in_edits_after_the_interval(tmp_path, raw):
+    path = tmp_path / "content.yml"
+    write(path, raw, 1000)
+    clock = Clock()
+    registry = ContentRegistry(str(path), check_interval=1.0, clock=clock)
+    first = registry.current
+    assert registry.reloads == 1
+
+    raw["benefits"]["401k"] = "Updated."
+    write(path, raw, 2000)
+    clock.now = 0.5
+    assert registry.current is first
+
+    clock.now = 1.0
+    second = registry.current
+    assert second is not first
+    assert second.benefit("401k") == "Updated."
+    assert registry.reloads == 2
+
+    # An unchanged file is not reloaded
+    clock.now = 5.0
+    assert registry.current is second
+    assert registry.reloads == 2
+
+
+def test_registry_keeps_previous_content_on_a_bad_edit(tmp_path, raw):
+    path = tmp_path / "content.yml"
+    write(path, raw, 1000)
+    clock = Clock()
+    registry = ContentRegistry(str(path), check_interval=1.0, clock=clock)
+    good = registry.current
+
+    del raw["templates"]["job_none"]
+    write(path, raw, 2000)
+    clock.now = 1.0
+    assert registry.current is good
+    assert registry.failed_reloads == 1
+    # The bad version is reported once, not re-parsed on every check
+    clock.now = 2.0
+    assert registry.current is good
+    assert registry.failed_reloads == 1
+
+    path.unlink()
+    clock.now = 3.0
+    assert registry.current is good
+
+
+def test_registry_first_load_raises(tmp_path, raw):
+    path = tmp_path / "content.yml"
+    registry = ContentRegistry(str(path), check_interval=1.0, clock=Clock())
+    with pytest.raises(OSError):
+        registry.current
+
+    del raw["policies"]
+    write(path, raw, 1000)
+    with pytest.raises(ContentError):
+        registry.current
+
+    raw["policies"] = {}
+    write(path, raw, 2000)
+    assert registry.current.policies == {}
@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+
+from actions import documents
+from actions.documents import DocumentPipeline, inspect_file, match_requirement
+
+PDF = b"%PDF-1.7\n" + b"x" * 1000 + b"\n%%EOF\n"
+PNG = b"\x89PNG\r\n\x1a\n" + b"y" * 100 + b"IEND\xaeB`\x82"
+REQUIRED = {"Software Engineer": {"India": ["ID proof (Aadhaar or passport)", "Degree certificate", "Resume"]}}
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return DocumentPipeline(REQUIRED, uploads_dir=str(tmp_path), inline_limit=1 << 30)
+
+
+def upload(tmp_path, employee_id, name, data):
+    folder = tmp_path / employee_id
+    folder.mkdir(exist_ok=True)
+    path = folder / name
+    path.write_bytes(data)
+    return path
+
+
+def test_inspect_file_reads_in_chunks(tmp_path):
+    path = upload(tmp_path, "EMP001", "Resume.pdf", PDF)
+    check = inspect_file(str(path), chunk_bytes=64)
+    assert (check.format, check.problems, check.readable) == ("pdf", (), True)
+    assert check.sha256 == inspect_file(str(path)).sha256
+
+
+@pytest.mark.parametrize("data, problem", [
+    (b"", "file is empty"),
+    (b"plain text", "not a PDF, JPG or PNG file"),
+    (PDF[:-8], "PDF file is truncated or corrupted"),
+    (PNG[:-2], "PNG file is truncated or corrupted"),
+])
+def test_inspect_file_problems(tmp_path, data, problem):
+    path = upload(tmp_path, "EMP001", "doc.bin", data)
+    assert inspect_file(str(path)).problems == (problem,)
+
+
+def test_oversized_files_are_rejected_unread(tmp_path):
+    path = upload(tmp_path, "EMP001", "big.pdf", PDF)
+    check = inspect_file(str(path), max_bytes=10)
+    assert check.sha256 is None
+    assert check.problems
+
+
+def test_match_requirement():
+    required = REQUIRED["Software Engineer"]["India"]
+    assert match_requirement("passport", required) == "ID proof (Aadhaar or passport)"
+    assert match_requirement("Degree certificates", required) == "Degree certificate"
+    assert match_requirement("selfie", required) is None
+
+
+def test_refresh_checks_only_new_or_changed_files(tmp_path, pipeline):
+    async def run():
+        upload(tmp_path, "EMP001", "Resume.pdf", PDF)
+        upload(tmp_path, "EMP001", "passport.png", PNG)
+        assert len(await pipeline.refresh(["EMP001", "EMP404"])) == 2
+        assert await pipeline.refresh(["EMP001"]) == []
+        assert pipeline.pending_uploads("EMP001") == []
+
+        upload(tmp_path, "EMP001", "Resume.pdf", PDF + b"\n")
+        records = await pipeline.refresh(["EMP001"])
+        assert [record.document_type for record in records] == ["Resume"]
+
+    asyncio.run(run())
+
+
+def test_unreadable_files_are_retried(tmp_path, pipeline, monkeypatch):
+    path = upload(tmp_path, "EMP001", "Resume.pdf", PDF)
+
+    def unreadable(path, *args):
+        raise PermissionError(13, "Permission denied", path)
+
+    async def run():
+        monkeypatch.setattr(documents, "inspect_file", unreadable)
+        (record,) = await pipeline.refresh(["EMP001"])
+        assert not record.check.readable
+        assert record.check.problems == ("file could not be read (Permission denied)",)
+        assert pipeline.pending_uploads("EMP001") == [("EMP001", "Resume", str(path))]
+
+        monkeypatch.setattr(documents, "inspect_file", inspect_file)
+        (record,) = await pipeline.refresh(["EMP001"])
+        assert record.accepted
+        assert await pipeline.refresh(["EMP001"]) == []
+
+    asyncio.run(run())
+
+
+def test_pending_uploads_does_not_mark_files_seen(tmp_path, pipeline):
+    upload(tmp_path, "EMP001", "Resume.pdf", PDF)
+    assert len(pipeline.pending_uploads("EMP001")) == 1
+    assert len(pipeline.pending_uploads("EMP001")) == 1
+
+
+def test_duplicates_and_completeness(tmp_path, pipeline):
+    async def run():
+        upload(tmp_path, "EMP001", "passport.pdf", PDF)
+        upload(tmp_path, "EMP001", "Resume.png", PNG)
+        await pipeline.refresh(["EMP001"])
+        # The same file uploaded again as another document is a duplicate
+        upload(tmp_path, "EMP001", "Degree certificate.pdf", PDF)
+        (record,) = await pipeline.refresh(["EMP001"])
+        assert record.duplicate_of == "EMP001/passport"
+
+        report = pipeline.completeness("EMP001", "Software Engineer", "India")
+        assert sorted(report.received) == ["ID proof (Aadhaar or passport)", "Resume"]
+        assert report.rejected == {"Degree certificate": ("duplicate of EMP001/passport",)}
+        assert report.missing == ["Degree certificate"]
+        assert not report.complete
+        assert pipeline.completeness("EMP001", "Software Engineer", "Mars") is None
+        assert pipeline.find("EMP001", "ID proof", "Software Engineer", "India").document_type == "passport"
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("employee_id", ["../EMP002", "EMP001/../EMP002", "..", ".", "", "/etc", "C:\\uploads", "EMP\x00"])
+def test_scan_rejects_ids_outside_the_uploads_dir(pipeline, employee_id):
+    with pytest.raises(ValueError, match="invalid employee ID"):
+        pipeline.pending_uploads(employee_id)
+
+
+def test_replaced_file_no_longer_owns_its_old_content(tmp_path, pipeline):
+    async def run():
+        upload(tmp_path, "EMP001", "passport.pdf", PDF)
+        await pipeline.refresh(["EMP001"])
+        # The hire replaces the passport, then uploads the old file as their degree
+        upload(tmp_path, "EMP001", "passport.pdf", PDF + b"\n")
+        await pipeline.refresh(["EMP001"])
+        upload(tmp_path, "EMP001", "Degree certificate.pdf", PDF)
+        (record,) = await pipeline.refresh(["EMP001"])
+        assert record.duplicate_of is None
+        assert pipeline.by_hash[record.check.sha256] == "EMP001/Degree certificate"
+
+    asyncio.run(run())
+
+
+def test_verify_action_only_checks_known_employees(tmp_path, monkeypatch):
+    from actions import actions
+    from actions.actions import ActionVerifyDocuments
+    from rasa_sdk import Tracker
+    from rasa_sdk.executor import CollectingDispatcher
+
+    monkeypatch.delenv("HR_SNAPSHOT_DIR", raising=False)
+    db = actions.HRDatabase()
+    db._documents = DocumentPipeline(REQUIRED, uploads_dir=str(tmp_path / "uploads"), inline_limit=1 << 30)
+    monkeypatch.setattr(actions, "hr_db", db)
+    upload(tmp_path, "EMP002", "passport.pdf", PDF)
+    (tmp_path / "uploads").mkdir()
+
+    async def verify(employee_id):
+        dispatcher = CollectingDispatcher()
+        tracker = Tracker("c1", {"employee_id": employee_id, "document_type": "passport"}, {}, [], False, None, {}, None)
+        events = await ActionVerifyDocuments().run(dispatcher, tracker, {})
+        return events[0]["value"], dispatcher.messages[0]["text"]
+
+    status, text = asyncio.run(verify("../EMP002"))
+    assert status is None
+    assert "couldn't find your employee record" in text
+    assert db.documents.documents == {}
+    assert asyncio.run(verify("EMP001"))[0] == "not_received"
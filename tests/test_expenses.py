@@ -0,0 +1,119 @@
+import asyncio
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from actions.expenses import ExpenseError, ExpenseLedger, parse_amount, parse_expense_date, validate_claim
+
+# A Wednesday
+TODAY = datetime.date(2025, 3, 12)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-03-01", datetime.date(2025, 3, 1)),
+    ("today", TODAY),
+    ("Yesterday", datetime.date(2025, 3, 11)),
+    ("the day before yesterday", datetime.date(2025, 3, 10)),
+    ("3 days ago", datetime.date(2025, 3, 9)),
+    ("a week ago", datetime.date(2025, 3, 5)),
+    ("two weeks ago", datetime.date(2025, 2, 26)),
+    ("wednesday", TODAY),
+    ("last wednesday", datetime.date(2025, 3, 5)),
+    ("on Friday", datetime.date(2025, 3, 7)),
+    ("last fri", datetime.date(2025, 3, 7)),
+    ("March 3", datetime.date(2025, 3, 3)),
+    ("Mar 3rd", datetime.date(2025, 3, 3)),
+    ("3rd of March 2024", datetime.date(2024, 3, 3)),
+    ("December 30", datetime.date(2024, 12, 30)),
+    ("3/3", datetime.date(2025, 3, 3)),
+    ("2/28/25", datetime.date(2025, 2, 28)),
+])
+def test_parse_expense_date(text, expected):
+    assert parse_expense_date(text, TODAY) == expected
+
+
+@pytest.mark.parametrize("text", ["soon", "March 32", "13/1", "2025-02-30", "Smarch 3"])
+def test_unrecognised_dates_are_rejected(text):
+    with pytest.raises(ExpenseError, match="isn't one I recognise"):
+        parse_expense_date(text, TODAY)
+
+
+def test_parse_amount():
+    assert parse_amount("$1,234.565") == Decimal("1234.57")
+    assert parse_amount(0.1) == Decimal("0.10")
+    for value in ("free", "-5", "0", "nan", "inf"):
+        with pytest.raises(ExpenseError):
+            parse_amount(value)
+
+
+def test_validate_claim_policy():
+    claim = {"employee_id": "EMP001", "amount": "40", "date": "yesterday"}
+    fields = validate_claim(claim, TODAY)
+    assert fields["date"] == "2025-03-11"
+    assert fields["receipt_required"]
+    with pytest.raises(ExpenseError, match="receipt"):
+        validate_claim({**claim, "receipt": False}, TODAY)
+    with pytest.raises(ExpenseError, match="30 days"):
+        validate_claim({**claim, "date": "2025-02-01"}, TODAY)
+    with pytest.raises(ExpenseError, match="future"):
+        validate_claim({**claim, "date": "2025-03-13"}, TODAY)
+
+
+def test_claims_over_the_approval_limit_wait_for_the_manager():
+    async def run():
+        ledger = ExpenseLedger()
+        small, _ = await ledger.submit({"employee_id": "EMP001", "amount": "20"}, "Alex Chen", today=TODAY)
+        large, _ = await ledger.submit({"employee_id": "EMP001", "amount": "150.50"}, "Alex Chen", today=TODAY)
+        assert small["status"] == "approved"
+        assert ledger.pending_summary("Alex Chen") == (1, Decimal("150.50"))
+        assert await ledger.decide(large["expense_id"], True, "Alex Chen")
+        assert not await ledger.decide(large["expense_id"], False, "Alex Chen")
+        assert ledger.pending_summary("Alex Chen") == (0, Decimal("0.00"))
+
+    asyncio.run(run())
+
+
+def test_concurrent_retries_record_one_claim(tmp_path):
+    path = str(tmp_path / "expenses.jsonl")
+
+    async def run():
+        ledger = ExpenseLedger(path, fsync=False)
+        claim = {"employee_id": "EMP001", "amount": "150"}
+        results = await asyncio.gather(*(ledger.submit(claim, "Alex Chen", key="k1", today=TODAY) for _ in range(3)))
+        assert len({record["expense_id"] for record, _ in results}) == 1
+        assert [new for _, new in results].count(True) == 1
+        ledger.close()
+
+    asyncio.run(run())
+    ledger = ExpenseLedger(path, fsync=False)
+    assert len(ledger.claims) == 1
+    assert ledger.pending_summary("Alex Chen") == (1, Decimal("150.00"))
+    ledger.close()
+
+
+def test_ingest_batches_and_skips_duplicates():
+    lookups = []
+
+    async def get_managers(employee_ids):
+        lookups.append(sorted(employee_ids))
+        return {employee_id: "Alex Chen" for employee_id in employee_ids if employee_id != "EMP404"}
+
+    rows = [
+        {"external_id": 1, "employee_id": "EMP001", "amount": "10", "date": "2025-03-10"},
+        {"external_id": 1, "employee_id": "EMP001", "amount": "10", "date": "2025-03-10"},
+        {"external_id": 2, "employee_id": "EMP404", "amount": "10"},
+        {"external_id": 3, "employee_id": "EMP002", "amount": "oops"},
+        {"external_id": 4, "employee_id": "EMP002", "amount": "5.25"},
+    ]
+
+    async def run():
+        ledger = ExpenseLedger()
+        report = await ledger.ingest(iter(rows), get_managers, today=TODAY, batch_size=2)
+        assert (report.accepted, report.duplicates, report.total) == (2, 1, Decimal("15.25"))
+        assert [position for position, _ in report.rejected] == [2, 3]
+        assert lookups == [["EMP001", "EMP404"], ["EMP002"]]
+        again = await ledger.ingest(iter(rows), get_managers, today=TODAY)
+        assert (again.accepted, again.duplicates) == (0, 3)
+
+    asyncio.run(run())
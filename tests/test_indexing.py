@@ -0,0 +1,92 @@
+import numpy as np
+
+from actions.indexing import HashingEmbedder, IncrementalIndexer
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def make_indexer(docs, index_dir):
+    return IncrementalIndexer(str(docs), str(index_dir), embedder=HashingEmbedder(dim=64), max_words=20)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    first = HashingEmbedder(dim=64).embed(["paid sick leave", ""])
+    second = HashingEmbedder(dim=64).embed(["paid sick leave", ""])
+    np.testing.assert_array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+    assert not first[1].any()
+
+
+def test_first_build_embeds_every_chunk(tmp_path):
+    docs = tmp_path / "docs"
+    write(docs / "leave.txt", "Leave\n\nEmployees receive 15 days of annual leave.")
+    write(docs / "expenses.md", "Expenses\n\nSubmit receipts within 30 days.")
+    index, stats = make_indexer(docs, tmp_path / "index").update()
+
+    assert stats["files_changed"] == 2
+    assert stats["chunks_reused"] == 0
+    assert stats["chunks_embedded"] == len(index.passages) == index.vectors.shape[0]
+
+
+def test_unchanged_docs_embed_nothing(tmp_path):
+    docs = tmp_path / "docs"
+    write(docs / "leave.txt", "Leave\n\nEmployees receive 15 days of annual leave.")
+    make_indexer(docs, tmp_path / "index").update()
+
+    indexer = make_indexer(docs, tmp_path / "index")
+    index, stats = indexer.update()
+    assert stats["files_unchanged"] == 1
+    assert stats["chunks_embedded"] == 0
+    assert indexer.embedder.calls == 0
+    assert len(index.passages) == 1
+
+
+def test_edit_reembeds_only_new_chunks(tmp_path):
+    docs = tmp_path / "docs"
+    write(docs / "leave.txt", "Leave\n\nEmployees receive 15 days of annual leave.\n\nSick leave is 10 days.")
+    write(docs / "expenses.txt", "Expenses\n\nSubmit receipts within 30 days.")
+    _, first = make_indexer(docs, tmp_path / "index").update()
+
+    write(docs / "leave.txt", "Leave\n\nEmployees receive 15 days of annual leave.\n\nSick leave is 12 days.")
+    indexer = make_indexer(docs, tmp_path / "index")
+    index, stats = indexer.update()
+
+    assert stats["files_changed"] == 1
+    assert stats["files_unchanged"] == 1
+    assert stats["chunks_embedded"] == 1
+    assert stats["chunks_reused"] == first["chunks_embedded"] - 1
+    assert indexer.embedder.texts_embedded == 1
+    assert any("12 days" in passage.text for passage in index.passages)
+    assert not any("10 days" in passage.text for passage in index.passages)
+
+
+def test_removed_file_drops_its_passages_and_old_vectors(tmp_path):
+    docs, index_dir = tmp_path / "docs", tmp_path / "index"
+    write(docs / "leave.txt", "Leave\n\nEmployees receive 15 days of annual leave.")
+    write(docs / "expenses.txt", "Expenses\n\nSubmit receipts within 30 days.")
+    make_indexer(docs, index_dir).update()
+
+    (docs / "expenses.txt").unlink()
+    index, stats = make_indexer(docs, index_dir).update()
+
+    assert stats["files_removed"] == 1
+    assert stats["chunks_embedded"] == 0
+    assert {passage.source for passage in index.passages} == {"leave.txt"}
+    assert index.vectors.shape[0] == len(index.passages)
+    assert sorted(path.name for path in index_dir.glob("vectors-*.npy")) == ["vectors-2.npy"]
+
+
+def test_reused_vectors_match_a_fresh_build(tmp_path):
+    docs = tmp_path / "docs"
+    write(docs / "a.txt", "A\n\nRemote work up to 3 days per week.")
+    make_indexer(docs, tmp_path / "incremental").update()
+    write(docs / "b.txt", "B\n\nHealth insurance enrollment within 30 days.")
+    incremental, _ = make_indexer(docs, tmp_path / "incremental").update()
+    fresh, _ = make_indexer(docs, tmp_path / "fresh").update()
+
+    assert incremental.passages == fresh.passages
+    np.testing.assert_array_equal(np.asarray(incremental.vectors), np.asarray(fresh.vectors))
+    assert incremental.search("remote work", k=1)[0].passage.source == "a.txt"
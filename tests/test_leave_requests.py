@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from actions.jsonlog import JsonLinesLog
+from actions.leave_requests import LeaveRequestStore, MonotonicULID, idempotency_key, leave_days
+
+
+def submit_all(store, keys):
+    async def run():
+        return await asyncio.gather(*(store.submit(key, employee_id="EMP001", leave_type="annual") for key in keys))
+
+    return asyncio.run(run())
+
+
+def test_ulids_are_strictly_increasing():
+    ids = MonotonicULID()
+    generated = [ids.new() for _ in range(1000)]
+    assert generated == sorted(generated)
+    assert len(set(generated)) == len(generated)
+    assert all(len(value) == 26 for value in generated)
+
+
+def test_idempotency_key_normalizes_case_and_whitespace():
+    assert idempotency_key("s1", " EMP001 ", "Annual") == idempotency_key("s1", "emp001", "annual")
+    assert idempotency_key("s1", None) != idempotency_key("s1", "None ")
+
+
+def test_leave_days_is_inclusive():
+    assert leave_days("2025-04-01", "2025-04-03") == 3
+    assert leave_days("2025-04-03", "2025-04-01") is None
+    assert leave_days("next monday", "2025-04-01") is None
+
+
+def test_burst_is_group_committed_and_deduplicated(tmp_path):
+    store = LeaveRequestStore(str(tmp_path / "leave.wal"), fsync=False)
+    results = submit_all(store, ["a", "b", "a", "c", "b"])
+    store.close()
+
+    assert [created for _, created in results] == [True, True, False, True, False]
+    assert results[0][0] is results[2][0]
+    # All five arrived before the first write, so one flush wrote them
+    assert store.flushes == 1
+    lines = (tmp_path / "leave.wal").read_bytes().splitlines()
+    assert [json.loads(line)["idempotency_key"] for line in lines] == ["a", "b", "c"]
+
+
+def test_replay_restores_requests_and_idempotency(tmp_path):
+    path = str(tmp_path / "leave.wal")
+    store = LeaveRequestStore(path, fsync=False)
+    (first, _), = submit_all(store, ["a"])
+    store.close()
+
+    reopened = LeaveRequestStore(path, fsync=False)
+    (again, created), = submit_all(reopened, ["a"])
+    assert not created
+    assert again["leave_id"] == first["leave_id"]
+    assert reopened.get(first["leave_id"])["employee_id"] == "EMP001"
+
+
+def test_torn_tail_is_truncated_on_replay(tmp_path):
+    path = tmp_path / "leave.wal"
+    store = LeaveRequestStore(str(path), fsync=False)
+    submit_all(store, ["a", "b"])
+    store.close()
+    intact = path.read_bytes()
+    path.write_bytes(intact + b'{"leave_id": "LR-torn", "idempot')
+
+    reopened = LeaveRequestStore(str(path), fsync=False)
+    assert len(reopened.requests) == 2
+    assert path.read_bytes() == intact
+    # New writes start on a clean line
+    submit_all(reopened, ["c"])
+    reopened.close()
+    assert len(LeaveRequestStore(str(path), fsync=False).requests) == 3
+
+
+def test_corrupt_line_stops_replay_there(tmp_path):
+    path = tmp_path / "events.log"
+    path.write_bytes(b'{"n": 1}\nnot json\n{"n": 3}\n')
+    seen = []
+    log = JsonLinesLog(str(path), fsync=False)
+    log.replay(seen.append)
+    log.close()
+
+    assert seen == [{"n": 1}]
+    assert path.read_bytes() == b'{"n": 1}\n'
+
+
+def test_memory_only_store_needs_no_file():
+    store = LeaveRequestStore()
+    (record, created), = submit_all(store, ["a"])
+    assert created and record["leave_id"].startswith("LR")
@@ -0,0 +1,71 @@
+import asyncio
+
+from rasa_sdk import Action, Tracker
+
+from actions.metrics import Registry, instrument_action
+from actions import metrics
+
+
+def make_tracker():
+    return Tracker("c1", {"employee_id": "EMP001", "leave_type": "annual"}, {}, [], False, None, {}, None)
+
+
+def make_action(name, slots, inner=None):
+    class Reader(Action):
+        def name(self):
+            return name
+
+        async def run(self, dispatcher, tracker, domain):
+            for slot in slots:
+                tracker.get_slot(slot)
+            if inner is not None:
+                await inner.run(dispatcher, tracker, domain)
+            return []
+
+    return instrument_action(Reader)()
+
+
+def test_slot_reads_are_counted_per_call_and_the_tracker_is_restored(monkeypatch):
+    monkeypatch.setattr(metrics, "registry", Registry())
+    tracker = make_tracker()
+    first = make_action("first", ["employee_id", "leave_type"])
+    second = make_action("second", ["employee_id"])
+
+    async def run():
+        for _ in range(3):
+            await first.run(None, tracker, {})
+            await second.run(None, tracker, {})
+
+    asyncio.run(run())
+    assert "get_slot" not in vars(tracker)
+    assert tracker.get_slot("employee_id") == "EMP001"
+    assert metrics.registry.actions["first"].slot_reads.sum == 6
+    assert metrics.registry.actions["second"].slot_reads.sum == 3
+
+
+def test_nested_actions_and_failures_restore_the_tracker(monkeypatch):
+    monkeypatch.setattr(metrics, "registry", Registry())
+    tracker = make_tracker()
+    inner = make_action("inner", ["leave_type"])
+    outer = make_action("outer", ["employee_id"], inner=inner)
+    asyncio.run(outer.run(None, tracker, {}))
+    assert "get_slot" not in vars(tracker)
+    assert metrics.registry.actions["inner"].slot_reads.sum == 1
+    # The outer call's reads include those made by the action it called
+    assert metrics.registry.actions["outer"].slot_reads.sum == 2
+
+    class Failing(Action):
+        def name(self):
+            return "failing"
+
+        def run(self, dispatcher, tracker, domain):
+            tracker.get_slot("employee_id")
+            raise RuntimeError("boom")
+
+    failing = instrument_action(Failing)()
+    try:
+        failing.run(None, tracker, {})
+    except RuntimeError:
+        pass
+    assert "get_slot" not in vars(tracker)
+    assert metrics.registry.actions["failing"].errors == 1
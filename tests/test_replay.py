@@ -0,0 +1,38 @@
+import asyncio
+import datetime
+import os
+
+import pytest
+
+from actions.base import action_clock
+from actions.replay import Replayer, load_actions, load_turns, normalize
+
+RECORDING = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "benchmarks", "recordings", "sample_turns.jsonl")
+
+
+def test_normalize_masks_generated_values():
+    text = "Ticket IT-12345, reference EX01M58B15S95CNKE82FEAQRE38G at 2026-10-18T09:30:00.123+00:00"
+    assert normalize({"text": text, "timestamp": 1.0}) == {"text": "Ticket IT-<N>, reference EX<ID> at <TIMESTAMP>"}
+
+
+@pytest.mark.parametrize("today", [datetime.datetime(2026, 11, 2, 9, 0), datetime.datetime(2030, 2, 28, 23, 59)])
+def test_shipped_recording_replays_on_any_day(monkeypatch, today):
+    for name in ("HR_SNAPSHOT_DIR", "HR_DB_PATH", "HR_LEAVE_WAL", "HR_EXPENSE_LOG"):
+        monkeypatch.delenv(name, raising=False)
+    # A fresh database, so state from other tests or passes doesn't leak in
+    from actions import actions
+
+    monkeypatch.setattr(actions, "hr_db", actions.HRDatabase())
+
+    async def run():
+        # The wall clock the actions would otherwise see
+        action_clock.set(lambda: today)
+        replayer = Replayer(load_actions())
+        await replayer.run(load_turns(RECORDING))
+        return replayer
+
+    replayer = asyncio.run(run())
+    assert not replayer.unknown
+    assert replayer.diffs == []
+    assert sum(replayer.mismatches.values()) == 0
@@ -0,0 +1,57 @@
+import pytest
+
+from actions.retrieval import Passage, PolicyIndex, chunk_document, tokenize
+
+PASSAGES = [
+    Passage("leave.md", "Sick Leave", "Employees receive 10 paid sick days per year."),
+    Passage("leave.md", "Annual Leave", "Annual leave accrues at 1.25 days per month; unused days roll over."),
+    Passage("remote.md", "Remote Work", "Employees may work remotely up to 3 days per week."),
+    Passage("expenses.md", "Expenses", "Receipts are required for expenses over $25."),
+]
+
+
+@pytest.fixture
+def index():
+    return PolicyIndex(PASSAGES)
+
+
+def test_tokenize():
+    assert tokenize("What are the company's policies on Expenses?") == ["company", "policy", "expense"]
+
+
+def test_chunk_document_keeps_headings():
+    text = "# Leave\n\nFirst paragraph.\n\nSecond paragraph.\n\n## Sick Leave\n\nStay home."
+    passages = chunk_document("leave.md", text, max_words=80)
+    assert [(p.section, p.text) for p in passages] == [
+        ("Leave", "First paragraph. Second paragraph."),
+        ("Sick Leave", "Stay home."),
+    ]
+
+
+def test_search_ranks_by_bm25(index):
+    results = index.search("how many sick days do I get", k=2)
+    assert results[0].passage.section == "Sick Leave"
+    assert [r.score for r in results] == sorted((r.score for r in results), reverse=True)
+    assert len(index.search("days", k=10)) == 3
+
+
+def test_min_terms_drops_single_word_coincidences(index):
+    # "weather" never occurs; only "days" matches, in three passages
+    query = "weather days"
+    assert index.search(query)
+    assert index.search(query, min_terms=2) == []
+    assert index.search("sick days", min_terms=2)[0].passage.section == "Sick Leave"
+    # A one-term query only needs its one term
+    assert index.search("receipts", min_terms=2)[0].passage.source == "expenses.md"
+
+
+def test_no_match(index):
+    assert index.search("parking") == []
+    assert index.search("") == []
+    assert index.best_passage("parking") is None
+
+
+def test_shipped_policies_answer_and_refuse():
+    index = PolicyIndex.from_directory()
+    assert index.search("How many sick days can roll over?", min_terms=2)
+    assert index.search("Who won the football game last night?", min_terms=2) == []
@@ -0,0 +1,80 @@
+import pytest
+
+from actions.routing import KeywordRouter, router
+
+
+@pytest.fixture
+def routes():
+    return KeywordRouter({
+        "email": (30, ["email", "e-mail", "mail", "mailbox", "email account"]),
+        "vpn": (20, ["vpn", "remote access"]),
+        "mfa": (10, ["mfa", "authentication"]),
+    })
+
+
+def spans(matches, text):
+    return [(match.topic, text[match.start:match.end]) for match in matches]
+
+
+def test_spans_index_the_original_text(routes):
+    text = "My VPN and my E-Mail both fail"
+    # A hyphen is a word boundary, so "mail" also matches inside "e-mail"
+    assert spans(routes.find_all(text), text) == [("vpn", "VPN"), ("email", "E-Mail"), ("email", "Mail")]
+    assert text[routes.route(text).start:routes.route(text).end] == "E-Mail"
+
+
+def test_whole_words_only(routes):
+    assert routes.find_all("the mailman uses gmailx and hotmail") == []
+    assert routes.find_all("mfax") == []
+    assert routes.route("email_2") is None
+
+
+def test_punctuation_is_a_boundary(routes):
+    text = "(vpn), mfa!"
+    assert spans(routes.find_all(text), text) == [("vpn", "vpn"), ("mfa", "mfa")]
+
+
+def test_whitespace_runs_collapse(routes):
+    text = "I need REMOTE \t\n  access"
+    match = routes.route(text)
+    assert match.topic == "vpn"
+    assert text[match.start:match.end] == "REMOTE \t\n  access"
+
+
+def test_overlapping_keywords_are_all_reported(routes):
+    text = "my email account"
+    assert spans(routes.find_all(text), text) == [("email", "email"), ("email", "email account")]
+
+
+def test_route_prefers_priority_then_length_then_position(routes):
+    assert routes.route("authentication for vpn").topic == "vpn"
+    assert routes.route("vpn and mail").topic == "email"
+    text = "mail then email account then email"
+    match = routes.route(text)
+    assert text[match.start:match.end] == "email account"
+    text = "mail and mail"
+    assert routes.route(text).start == 0
+
+
+@pytest.mark.parametrize("text, matched", [
+    ("my emails bounce", "emails"),
+    ("two e-mails", "e-mails"),
+    ("Mails!", "Mails"),
+    ("shared mailboxes", "mailboxes"),
+])
+def test_plurals(routes, text, matched):
+    match = routes.route(text)
+    assert match.topic == "email"
+    assert text[match.start:match.end] == matched
+
+
+def test_plural_suffix_must_end_the_word(routes):
+    assert routes.route("mailsx") is None
+    assert routes.route("emailess") is None
+
+
+def test_shipped_tables():
+    assert router("it_support").route("How do I set up Outlook?").topic == "email"
+    assert router("it_support").route("my authenticator lost the emails").topic == "email"
+    assert router("policy").route("Can I work from home on Fridays?").topic == "remote work"
+    assert router("policy").route("what's the weather") is None
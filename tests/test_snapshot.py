@@ -0,0 +1,156 @@
+import asyncio
+import json
+import struct
+
+import pytest
+
+from actions.snapshot import (
+    ALIGN, CURRENT, MAGIC, Snapshot, SnapshotBackend, SnapshotHandle, main, publish, write_snapshot,
+)
+from actions.storage import StorageError
+
+EMPLOYEES = {
+    "EMP002": {
+        "name": "Michael Brown",
+        "department": "Marketing",
+        "manager": "Jennifer Lee",
+        "leave_balance": {"annual": 12, "sick": 7.5, "personal": 2},
+        "onboarding": {"progress": ["All tasks completed"], "pending": []},
+    },
+    "EMP001": {
+        "name": "Zoë Ångström",
+        "department": "Engineering",
+        "manager": "Alex Chen",
+        "leave_balance": {"annual": 15, "sick": 10, "personal": 3, "study": 4},
+        "onboarding": {"progress": ["IT accounts created"], "pending": ["Complete tax forms", "Enroll in benefits"]},
+    },
+}
+POLICIES = {"remote work": "Up to 3 days per week."}
+JOBS = [{"title": "HR Coordinator", "department": "Human Resources", "location": "Chicago",
+         "requirements": "2+ years", "deadline": "April 20, 2025"}]
+DOCUMENTS = {"Designer": {"USA": ["Portfolio", "Government-issued ID"]}}
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "hr.hrsnap")
+    write_snapshot(path, EMPLOYEES, POLICIES, JOBS, DOCUMENTS, generation=7)
+    return Snapshot(path)
+
+
+def test_header_and_sections_are_aligned(tmp_path, snapshot):
+    data = (tmp_path / "hr.hrsnap").read_bytes()
+    assert data[:len(MAGIC)] == MAGIC
+    (header_length,) = struct.unpack_from("<Q", data, len(MAGIC))
+    header = json.loads(data[len(MAGIC) + 8:len(MAGIC) + 8 + header_length])
+    assert header["generation"] == 7
+    assert all(offset % ALIGN == 0 for offset, _ in header["sections"].values())
+    assert header["sections"]["employees"][1] == 2
+    assert len(data) % ALIGN == 0
+    assert not (tmp_path / "hr.hrsnap.tmp").exists()
+
+
+def test_round_trip(snapshot):
+    assert snapshot.generation == 7
+    assert len(snapshot) == 2
+    row = snapshot.find("EMP001")
+    record = snapshot.employees[row]
+    assert snapshot.string(record["name"]) == "Zoë Ångström"
+    assert snapshot.strings(record["pending"], record["pending_count"]) == ["Complete tax forms", "Enroll in benefits"]
+    # Leave types outside the defaults get their own column
+    assert "study" in snapshot.leave_types
+    assert snapshot.policies == POLICIES
+    assert list(snapshot.job_openings) == JOBS
+    assert snapshot.required_documents == DOCUMENTS
+
+
+def test_find_binary_searches_sorted_ids(snapshot):
+    assert snapshot.find("EMP001") == 0
+    assert snapshot.find("EMP002") == 1
+    assert snapshot.find("EMP000") is None
+    assert snapshot.find("EMP003") is None
+    assert snapshot.find("EMP00") is None
+
+
+def test_arrays_are_views_into_the_mapping(snapshot):
+    assert not snapshot.employees.flags.owndata
+    assert not snapshot.employees.flags.writeable
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.hrsnap"
+    path.write_bytes(b"x" * 128)
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "empty.hrsnap")
+    write_snapshot(path, {}, {}, [], {})
+    snapshot = Snapshot(path)
+    assert len(snapshot) == 0
+    assert snapshot.find("EMP001") is None
+    assert list(snapshot.job_openings) == []
+
+
+def test_publish_swaps_current_and_keeps_two_generations(tmp_path):
+    names = [publish(str(tmp_path), EMPLOYEES, POLICIES, JOBS, DOCUMENTS) for _ in range(3)]
+    assert names == ["snapshot-00000001.hrsnap", "snapshot-00000002.hrsnap", "snapshot-00000003.hrsnap"]
+    assert (tmp_path / CURRENT).read_text() == names[-1]
+    assert sorted(path.name for path in tmp_path.glob("snapshot-*")) == names[1:]
+
+
+def test_handle_follows_new_generations(tmp_path):
+    publish(str(tmp_path), EMPLOYEES, POLICIES, JOBS, DOCUMENTS)
+    handle = SnapshotHandle(str(tmp_path), check_interval=0)
+    first = handle.current
+    assert handle.current is first
+
+    publish(str(tmp_path), EMPLOYEES, POLICIES, JOBS + JOBS, DOCUMENTS)
+    assert handle.current.generation == 2
+    assert len(handle.current.job_openings) == 2
+    # A reader holding the old generation can still use it
+    assert len(first.job_openings) == 1
+
+
+def test_backend_views_and_onboarding_overlay_per_generation(tmp_path):
+    publish(str(tmp_path), EMPLOYEES, POLICIES, JOBS, DOCUMENTS)
+    backend = SnapshotBackend(SnapshotHandle(str(tmp_path), check_interval=0))
+
+    async def run():
+        employee = await backend.get_employee("EMP002")
+        # Every employee gets a column for every leave type in the snapshot
+        assert employee["leave_balance"] == {"annual": 12, "sick": 7.5, "personal": 2, "study": 0}
+        assert await backend.get_employee("EMP404") is None
+        assert set(await backend.get_employees(["EMP001", "EMP404"])) == {"EMP001"}
+
+        assert await backend.update_onboarding_task("EMP001", "Complete tax forms")
+        assert (await backend.get_onboarding_status("EMP001")).summary().next_task == "Enroll in benefits"
+
+        # The next generation starts from its own published checklists
+        updated = json.loads(json.dumps(EMPLOYEES))
+        updated["EMP001"]["onboarding"]["pending"] = ["Complete security training"]
+        publish(str(tmp_path), updated, POLICIES, JOBS, DOCUMENTS)
+        assert (await backend.get_onboarding_status("EMP001")).summary().next_task == "Complete security training"
+
+    asyncio.run(run())
+
+
+def test_handle_without_a_published_snapshot(tmp_path):
+    with pytest.raises(StorageError, match="no snapshot published"):
+        SnapshotHandle(str(tmp_path))
+
+
+def test_first_publish_with_the_directory_configured(tmp_path, monkeypatch, capsys):
+    from actions.actions import HRDatabase
+
+    directory = tmp_path / "snapshots"
+    monkeypatch.setenv("HR_SNAPSHOT_DIR", str(directory))
+    # What importing the actions does; nothing is published yet
+    db = HRDatabase()
+    main(["publish"])
+    assert "snapshot-00000001.hrsnap" in capsys.readouterr().out
+
+    # The database attaches the snapshot on first use
+    assert asyncio.run(db.get_employee("EMP001"))["name"] == "Sarah Johnson"
+    assert db._snapshot_generation == 1